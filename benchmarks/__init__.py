@@ -0,0 +1,5 @@
+"""Benchmarks for MemSynth's hot paths on synthetic membership lists
+
+Run with `python -m benchmarks.run --help` from the root of the repository.
+
+"""
@@ -0,0 +1,129 @@
+"""Seeded generator of synthetic membership lists
+
+Builds membership lists in the format of `EXPECTED_FORMAT_MEM_LIST` that pass
+every expectation in `tests/params.json`, and then dirties a controllable
+fraction of their cells, so that the benchmarks can run at any scale.
+
+"""
+import numpy as np
+import pandas as pd
+
+from memsynth.config import EXPECTED_FORMAT_MEM_LIST, US_STATES
+
+FIRST_NAMES = [
+    "Matt", "Megan", "Michelle", "Rosa", "Eugene", "Emma", "Karl", "Angela",
+    "Frederick", "Clara", "Bernie", "Alexandria", "Cesar", "Dolores", "Jack",
+]
+LAST_NAMES = [
+    "Someonesson", "Elsesson", "Lilith", "Luxemburg", "Debs", "Goldman",
+    "Zetkin", "Davis", "Chavez", "Huerta", "Harrington", "Thomas", "London",
+]
+STREETS = ["Data Dr", "Fake Way", "Nope Ln", "Noble Ave", "Union St", "Main St"]
+CITIES = ["Orlando", "Winter Park", "Longwood", "Sanford", "Kissimmee", "Apopka"]
+MAIL_PREFERENCES = ["Yes", "No", "Membership card only"]
+MEMBERSHIP_TYPES = ["annual", "monthly"]
+MONTHLY_STATUSES = ["2mo_plus_failed", "active", "canceled_by_admin", "never"]
+
+# What a dirty cell in each column looks like. Every one of these breaks an
+# expectation in `tests/params.json`. Those in 'first_name' and 'Address_Line_2'
+# are soft failures.
+DIRTY_VALUES = {
+    "first_name": "M@tt",
+    "last_name": np.nan,
+    "Address_Line_1": "P.O. Box 7621",
+    "Address_Line_2": "Bldg 9",
+    "City": "0rlando",
+    "State": "ZZ",
+    "Zip": "3280",
+    "Country": "Untied States",
+    "Mobile_Phone": "4074440909",
+    "Home_Phone": "410-5644639, 4105644639",
+    "Work_Phone": "407 721 7359",
+    "Email": "member at example dot org",
+    "Mail_preference": "Maybe",
+    "membership_type": "weekly",
+    "monthly_status": "paused",
+}
+
+
+def _phones(rng, n, null_rate=0.3):
+    digits = rng.integers(200, 1000, size=(n, 2)).astype(str)
+    last = np.char.zfill(rng.integers(0, 10000, size=n).astype(str), 4)
+    phones = np.char.add(np.char.add(np.char.add(digits[:, 0], "-"), digits[:, 1]), "-")
+    phones = np.char.add(phones, last).astype(object)
+    phones[rng.random(n) < null_rate] = np.nan
+    return phones
+
+
+def _sometimes(rng, values, n, null_rate):
+    out = rng.choice(np.asarray(values, dtype=object), size=n)
+    out[rng.random(n) < null_rate] = np.nan
+    return out
+
+
+def generate_roster(n_rows, dirty_rate=0.0, seed=0):
+    """Generates a synthetic membership list
+
+    :param n_rows: (int) Number of members in the list
+    :param dirty_rate: (float, default 0.0) Chance, from 0 to 1, that each
+        dirtyable cell (see `DIRTY_VALUES`) breaks its expectations. An Xdate
+        before the Join_Date is dirtied at the same rate.
+    :param seed: (int, default 0) Seed for the random number generator
+    :return: (`pandas.DataFrame`) Raw membership list, as it would be read from
+        a file before `MemSynther._load`
+    """
+    rng = np.random.default_rng(seed)
+    n = n_rows
+    join_dates = pd.Timestamp("2015-01-01") + pd.to_timedelta(
+        rng.integers(0, 365 * 5, size=n), unit="D"
+    )
+    xdates = join_dates + pd.to_timedelta(rng.integers(1, 365 * 3, size=n), unit="D")
+    dsa_ids = rng.integers(100000, 999999, size=n).astype(float)
+    dsa_ids[rng.random(n) < 0.3] = np.nan
+    zips = np.char.add(
+        np.char.add(rng.integers(10000, 100000, size=n).astype(str), "-"),
+        np.char.zfill(rng.integers(0, 10000, size=n).astype(str), 4)
+    )
+
+    df = pd.DataFrame({
+        "AK_ID": rng.permutation(n) + 1000,
+        "DSA_ID": dsa_ids,
+        "first_name": rng.choice(FIRST_NAMES, size=n),
+        "middle_name": _sometimes(rng, ["Prime", "Q.", "Ann"], n, 0.7),
+        "last_name": rng.choice(LAST_NAMES, size=n),
+        "suffix": _sometimes(rng, ["Jr", "Sr", "III"], n, 0.95),
+        "Family_first_name": _sometimes(rng, ["& Ladymatt"], n, 0.9),
+        "Family_last_name": _sometimes(rng, LAST_NAMES, n, 0.9),
+        "Organization": _sometimes(rng, ["Local 1199", "SEIU"], n, 0.95),
+        "Address_Line_1": np.char.add(
+            np.char.add(rng.integers(1, 9999, size=n).astype(str), " "),
+            rng.choice(STREETS, size=n)
+        ),
+        "Address_Line_2": _sometimes(rng, ["apt 4", "unit 12", "7"], n, 0.8),
+        "City": rng.choice(CITIES, size=n),
+        "State": rng.choice(list(US_STATES), size=n),
+        "Zip": zips,
+        "Country": "United States",
+        "Mobile_Phone": _phones(rng, n),
+        "Home_Phone": _phones(rng, n),
+        "Work_Phone": _phones(rng, n, null_rate=0.8),
+        "Email": np.char.add(
+            np.char.add("member", np.arange(n).astype(str)), "@example.org"
+        ),
+        "Mail_preference": rng.choice(MAIL_PREFERENCES, size=n),
+        "Do_Not_Call": rng.random(n) < 0.1,
+        "Join_Date": join_dates.strftime("%Y-%m-%d"),
+        "Xdate": xdates.strftime("%Y-%m-%d"),
+        "Memb_status": "M",
+        "membership_type": rng.choice(MEMBERSHIP_TYPES, size=n),
+        "monthly_status": rng.choice(MONTHLY_STATUSES, size=n),
+    }, columns=EXPECTED_FORMAT_MEM_LIST["columns"])
+
+    if dirty_rate > 0:
+        for col, value in DIRTY_VALUES.items():
+            dirty = rng.random(n) < dirty_rate
+            df[col] = df[col].astype(object)
+            df.loc[dirty, col] = value
+        dirty = rng.random(n) < dirty_rate
+        df.loc[dirty, "Xdate"] = "2000-01-01"
+    return df
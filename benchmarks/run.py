@@ -0,0 +1,221 @@
+"""Times MemSynth's stages on synthetic membership lists
+
+Generates membership lists with `benchmarks.roster.generate_roster` and
+reports the wall time, rows per second and, optionally, the peak memory of
+each stage of loading and checking them. Results can be saved as a baseline
+and later runs compared against it, so that regressions in the hot paths
+show up.
+
+    python -m benchmarks.run --sizes 1000 10000 --dirty-rate 0.05
+    python -m benchmarks.run --save benchmarks/baseline.json
+    python -m benchmarks.run --compare benchmarks/baseline.json
+
+"""
+import argparse
+import contextlib
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.roster import generate_roster
+from memsynth.config import TEST_DIR
+from memsynth.main import MemSynther
+
+PARAM_JSON_FILE = os.path.join(TEST_DIR, "params.json")
+DEFAULT_SIZES = (1000, 10000, 100000, 1000000)
+# Writing and reading xlsx is too slow to be worth timing on huge lists
+EXCEL_MAX_ROWS = 10000
+
+
+def _memsynther():
+    msy = MemSynther(name="benchmark")
+    msy.load_expectations_from_json(PARAM_JSON_FILE)
+    return msy
+
+
+def _stages(raw, tmpdir, excel):
+    """Makes the stages to benchmark for a raw membership list
+
+    Every stage can be run more than once, so that it can be measured with
+    and without tracing memory.
+
+    :return: (list) Tuples of the stage name and a function running it
+    """
+    csv = os.path.join(tmpdir, "roster.csv")
+    raw.to_csv(csv, index=False)
+    stages = []
+    if excel:
+        xlsx = os.path.join(tmpdir, "roster.xlsx")
+        raw.to_excel(xlsx, index=False)
+        stages.append(("load_from_excel", lambda: _memsynther().load_from_excel(xlsx)))
+    stages.append(("load_from_csv", lambda: _memsynther().load_from_csv(csv)))
+
+    msy = _memsynther()
+    stages.append(("_verify_memlist_format", lambda: msy._verify_memlist_format(raw)))
+    stages.append(("_load", lambda: msy._load(raw.copy())))
+
+    loaded = _memsynther()
+    loaded.load_from_memory(raw.copy())
+    stages.append(("check", loaded.check_membership_list_on_parameters))
+    stages.append(("report_failures", lambda: _discarding_stdout(loaded.report_failures)))
+    return stages
+
+
+def _discarding_stdout(fn):
+    """Runs `fn` with its console output discarded, like MemSynth's logging"""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        return fn()
+
+
+def _measure(fn, memory=False):
+    """Times `fn`, then runs it again under tracemalloc if `memory` is True"""
+    start = time.perf_counter()
+    fn()
+    seconds = time.perf_counter() - start
+    peak_mb = None
+    if memory:
+        tracemalloc.start()
+        try:
+            fn()
+            peak_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        finally:
+            tracemalloc.stop()
+    return seconds, peak_mb
+
+
+def run(sizes=DEFAULT_SIZES, dirty_rate=0.05, seed=0, memory=False,
+        excel_max_rows=EXCEL_MAX_ROWS, out=sys.stdout):
+    """Runs every stage on membership lists of each size
+
+    :param sizes: (iterable of int) Number of rows in each membership list
+    :param dirty_rate: (float, default 0.05) Chance each cell is dirty
+    :param seed: (int, default 0) Seed for generating the membership lists
+    :param memory: (boolean, default False) Also measure peak memory
+    :param excel_max_rows: (int) Largest list to time `load_from_excel` on
+    :param out: (file) Where to print results as they come in
+    :return: (dict) The environment and the results of each stage by size
+    """
+    results = {}
+    for n in sizes:
+        raw = generate_roster(n, dirty_rate=dirty_rate, seed=seed)
+        results[str(n)] = {}
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for stage, fn in _stages(raw, tmpdir, excel=n <= excel_max_rows):
+                seconds, peak_mb = _measure(fn, memory)
+                results[str(n)][stage] = {
+                    "seconds": seconds,
+                    "rows_per_sec": n / seconds if seconds else None,
+                    "peak_mb": peak_mb,
+                }
+                print(
+                    f"{n:>9} {stage:<24} {seconds:10.4f} s {n / seconds:14,.0f} rows/s"
+                    + (f" {peak_mb:10.1f} MB" if peak_mb is not None else ""),
+                    file=out
+                )
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "dirty_rate": dirty_rate,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, tolerance=0.25, min_seconds=0.01, out=sys.stdout):
+    """Compares results to a baseline and reports the stages that regressed
+
+    :param current: (dict) Results from `run`
+    :param baseline: (dict) Results from an earlier `run`
+    :param tolerance: (float, default 0.25) How much slower, as a fraction of
+        the baseline, a stage may get before it counts as a regression
+    :param min_seconds: (float, default 0.01) Slowdowns smaller than this are
+        considered noise
+    :param out: (file) Where to print the comparison, which starts with a
+        note if the baseline was recorded on other versions of Python,
+        pandas or numpy
+    :return: (list) Tuples of size, stage, baseline seconds and current seconds
+        for each regression
+    """
+    environment = current.get("environment", {})
+    recorded = baseline.get("environment", {})
+    differs = [
+        f"{name} {recorded[name]} (now {environment[name]})"
+        for name in ("python", "pandas", "numpy")
+        if name in recorded and name in environment
+        and recorded[name] != environment[name]
+    ]
+    if differs:
+        print(
+            f"The baseline was recorded on {', '.join(differs)}, so the "
+            "comparison also measures the change of versions",
+            file=out
+        )
+    regressions = []
+    for size, stages in current["results"].items():
+        for stage, result in stages.items():
+            base = baseline["results"].get(size, {}).get(stage)
+            if base is None:
+                continue
+            ratio = result["seconds"] / base["seconds"] if base["seconds"] else 1
+            slower = result["seconds"] - base["seconds"] > min_seconds
+            regressed = ratio > 1 + tolerance and slower
+            print(
+                f"{size:>9} {stage:<24} {base['seconds']:10.4f} s -> "
+                f"{result['seconds']:10.4f} s ({ratio:5.2f}x)"
+                f"{'  REGRESSION' if regressed else ''}",
+                file=out
+            )
+            if regressed:
+                regressions.append((size, stage, base["seconds"], result["seconds"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark MemSynth on synthetic membership lists"
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--dirty-rate", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--memory", action="store_true",
+                        help="also measure peak memory with tracemalloc")
+    parser.add_argument("--excel-max-rows", type=int, default=EXCEL_MAX_ROWS)
+    parser.add_argument("--log-level", default="WARNING",
+                        help="level of MemSynth's logging, which is discarded")
+    parser.add_argument("--save", metavar="JSON",
+                        help="save the results as a baseline")
+    parser.add_argument("--compare", metavar="JSON",
+                        help="compare the results to a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=args.log_level.upper(), stream=open(os.devnull, "w")
+    )
+    current = run(
+        args.sizes, args.dirty_rate, args.seed, args.memory, args.excel_max_rows
+    )
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(current, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(current, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
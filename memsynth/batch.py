@@ -0,0 +1,283 @@
+"""Validating the membership lists of many chapters at once
+
+Takes a directory of membership lists, or a manifest naming each chapter's
+list, and checks every list against one set of expectations on a pool of
+worker processes. The expectations are compiled into a single
+`ExpectationPlan` that each worker compiles once and reuses for every list it
+is handed, so a whole state's run takes about as long as its slowest list.
+
+    python -m memsynth.batch rosters/ -e tests/params.json -s summary.csv
+
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from memsynth.instrumentation import Instrumentation
+from memsynth.main import MemSynther
+from memsynth.plan import ExpectationPlan, compile_plan, load_plan
+
+logger = logging.getLogger("Batch")
+
+# Columns of the summary written by `write_summary` as CSV
+SUMMARY_FIELDS = (
+    "chapter", "file", "passed", "rows", "hard_failures", "soft_failures",
+    "failed_columns", "seconds", "error",
+)
+
+
+class ChapterResult:
+    """The outcome of validating one chapter's membership list
+
+    :param chapter: (str) Name of the chapter
+    :param file: (str) File name of the membership list
+    :param passed: (boolean) Whether the list met the expectations. False if
+        the list could not be loaded.
+    :param rows: (int, default None) Number of rows read
+    :param failures: (dict, default None) Maps each column with failures to
+        a dict of its 'hard' and 'soft' failure counts
+    :param seconds: (float, default None) Time taken to load and check
+    :param error: (str, default None) Why the list could not be loaded
+    """
+    def __init__(self, chapter, file, passed, rows=None, failures=None,
+                 seconds=None, error=None):
+        self.chapter = chapter
+        self.file = file
+        self.passed = passed
+        self.rows = rows
+        self.failures = failures if failures is not None else {}
+        self.seconds = seconds
+        self.error = error
+
+    def __repr__(self):
+        return f"<ChapterResult: {self.chapter} - {self.status}>"
+
+    @property
+    def status(self):
+        """(str) 'ERROR', 'PASSED' or 'FAILED'"""
+        return "ERROR" if self.error else "PASSED" if self.passed else "FAILED"
+
+    @property
+    def hard_failures(self):
+        return sum(f["hard"] for f in self.failures.values())
+
+    @property
+    def soft_failures(self):
+        return sum(f["soft"] for f in self.failures.values())
+
+    def to_dict(self):
+        return {
+            "chapter": self.chapter,
+            "file": self.file,
+            "passed": self.passed,
+            "rows": self.rows,
+            "hard_failures": self.hard_failures,
+            "soft_failures": self.soft_failures,
+            "failures": self.failures,
+            "seconds": self.seconds,
+            "error": self.error,
+        }
+
+
+def find_rosters(source):
+    """Finds the membership list of every chapter
+
+    :param source: (str) Either a directory, where every file `MemSynther`
+        can load is a chapter named after the file, or a JSON manifest
+        mapping chapter names to files relative to the manifest
+    :raises: `ValueError` if `source` is neither a directory nor a JSON file
+    :return: (dict) Chapter names to file names, sorted by chapter
+    """
+    if os.path.isdir(source):
+        rosters = {}
+        for fname in os.listdir(source):
+            chapter, ext = os.path.splitext(fname)
+            if ext.lower() in MemSynther.LOADERS:
+                rosters[chapter] = os.path.join(source, fname)
+    elif source.lower().endswith(".json"):
+        with open(source) as f:
+            manifest = json.load(f)
+        base = os.path.dirname(source)
+        rosters = {
+            chapter: os.path.join(base, fname)
+            for chapter, fname in manifest.items()
+        }
+    else:
+        raise ValueError(
+            f"'{source}' is neither a directory nor a JSON manifest"
+        )
+    return dict(sorted(rosters.items()))
+
+
+def validate_chapter(chapter, flist, plan, strict=True, softload=False,
+                     chunksize=None, fail_fast=False):
+    """Loads and checks one chapter's membership list
+
+    Errors loading the list are recorded in the result rather than raised,
+    so that one bad list does not stop a batch.
+
+    :param chapter: (str) Name of the chapter
+    :param flist: (str) File name of the membership list
+    :param plan: (`memsynth.plan.ExpectationPlan`) Expectations to check with
+    :param strict: (boolean, default True) Considers soft failures to be
+        failures if True
+    :param softload: (boolean, default False) If true, extra columns in the
+        membership list are not an error
+    :param chunksize: (int, default None) If given, the list is streamed and
+        checked this many rows at a time by
+        `MemSynther.check_membership_list_in_chunks`
+    :param fail_fast: (boolean, default False) If True, checking stops at the
+        first hard failure, for when all that matters is whether the list
+        passes
+    :return: (`ChapterResult`)
+    """
+    start = time.perf_counter()
+    instrumentation = Instrumentation()
+    msy = MemSynther(name=chapter, instrumentation=instrumentation, quiet=True)
+    msy.load_expectations_from_plan(plan)
+    try:
+        if chunksize:
+            passed = msy.check_membership_list_in_chunks(
+                flist, chunksize, softload, strict, fail_fast
+            )
+        else:
+            msy.load_from_file(flist, softload)
+            passed = msy.check_membership_list_on_parameters(
+                strict=strict, fail_fast=fail_fast
+            )
+    except Exception as e:
+        logger.error(f"Could not validate chapter '{chapter}': {e}")
+        return ChapterResult(
+            chapter, flist, False, seconds=time.perf_counter() - start,
+            error=f"{type(e).__name__}: {e}"
+        )
+    failures = {
+        col: {"hard": exp._fails.total_hard, "soft": exp._fails.total_soft}
+        for col, exp in msy.expectations.items()
+        if exp.is_hard_failure() or exp.is_soft_failure()
+    }
+    read = instrumentation.stages.get("read")
+    return ChapterResult(
+        chapter, flist, passed, rows=read["rows"] if read else None,
+        failures=failures, seconds=time.perf_counter() - start
+    )
+
+
+_worker_plan = None
+
+
+def _init_worker(expectations_json):
+    """Compiles the shared plan once in each worker process"""
+    global _worker_plan
+    _worker_plan = compile_plan(expectations_json)
+
+
+def _validate_in_worker(chapter, flist, strict, softload, chunksize,
+                        fail_fast):
+    return validate_chapter(
+        chapter, flist, _worker_plan, strict, softload, chunksize, fail_fast
+    )
+
+
+def validate_chapters(rosters, expectations, workers=None, strict=True,
+                      softload=False, chunksize=None, fail_fast=False):
+    """Validates the membership lists of many chapters on a process pool
+
+    :param rosters: (dict) Chapter names to file names, see `find_rosters`
+    :param expectations: (str or `memsynth.plan.ExpectationPlan`) Either a
+        JSON file of expectations or an already compiled plan
+    :param workers: (int, default None) Number of worker processes. If None,
+        as many as there are CPUs. If 0, the chapters are validated one after
+        another in this process.
+    :param strict: (boolean, default True) Considers soft failures to be
+        failures if True
+    :param softload: (boolean, default False) If true, extra columns in the
+        membership lists are not an error
+    :param chunksize: (int, default None) If given, each list is streamed
+        and checked this many rows at a time
+    :param fail_fast: (boolean, default False) If True, checking each list
+        stops at its first hard failure
+    :return: (list of `ChapterResult`) In the order of `rosters`
+    """
+    plan = expectations if isinstance(expectations, ExpectationPlan) \
+        else load_plan(expectations)
+    if workers == 0:
+        return [
+            validate_chapter(
+                chapter, flist, plan, strict, softload, chunksize, fail_fast
+            )
+            for chapter, flist in rosters.items()
+        ]
+    logger.info(f"Validating {len(rosters)} chapters")
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(plan.expectations_json,)) as pool:
+        futures = [
+            pool.submit(
+                _validate_in_worker, chapter, flist, strict, softload,
+                chunksize, fail_fast
+            )
+            for chapter, flist in rosters.items()
+        ]
+        return [future.result() for future in futures]
+
+
+def write_summary(results, fname):
+    """Writes a summary of every chapter's results
+
+    :param results: (iterable of `ChapterResult`)
+    :param fname: (str) File to write. If it ends in '.json' every chapter's
+        failures are written column by column, otherwise a CSV with one row
+        per chapter is written.
+    :return: None
+    """
+    if fname.lower().endswith(".json"):
+        with open(fname, "w") as f:
+            json.dump([result.to_dict() for result in results], f, indent=2)
+        return
+    with open(fname, "w", newline="") as f:
+        writer = csv.DictWriter(f, SUMMARY_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for result in results:
+            row = result.to_dict()
+            row["failed_columns"] = " ".join(sorted(result.failures))
+            writer.writerow(row)
+
+
+def main(argv=None):
+    """Validates the chapters found by `find_rosters`
+
+    The lists are checked and reported as `python -m memsynth validate`
+    does, with the same options and exit codes.
+    """
+    from memsynth import cli
+
+    parser = argparse.ArgumentParser(
+        description="Validate the membership lists of many chapters"
+    )
+    parser.add_argument("source",
+                        help="directory of membership lists, or JSON manifest "
+                             "of chapter names to membership lists")
+    parser.add_argument("-e", "--expectations", required=True,
+                        help="JSON file of expectations")
+    parser.add_argument("-f", "--format", choices=("text", "json"),
+                        default="text")
+    parser.add_argument("-s", "--summary",
+                        help="write the summary to this CSV or JSON file")
+    parser.add_argument("-w", "--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--strict", action="store_true",
+                        help="count soft failures as failures")
+    parser.add_argument("--softload", action="store_true",
+                        help="allow extra columns in the membership lists")
+    parser.add_argument("--fail-fast", action="store_true",
+                        help="stop checking a list at its first hard failure")
+    args = parser.parse_args(argv)
+    return cli.validate(args, find_rosters(args.source))
+
+if __name__ == "__main__":
+    sys.exit(main())
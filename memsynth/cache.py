@@ -0,0 +1,142 @@
+"""On-disk cache of membership lists that have already been loaded
+
+Parsing a membership list and converting its columns to the expected dtypes
+is the slowest part of loading it. `RosterCache` keeps the converted
+`pandas.DataFrame` on disk, keyed on the content of the membership file and
+the expectations it was loaded with, so an unchanged list loads straight from
+the cache the next time around.
+
+"""
+import hashlib
+import logging
+import os
+
+from memsynth.config import CACHE_DIR, CACHE_MAX_BYTES
+from memsynth.utils import LazyModule
+
+pd = LazyModule("pandas")
+
+
+class RosterCache:
+    """A size limited, on-disk cache of loaded membership lists
+
+    Entries are a pickled `pandas.DataFrame`, which keeps every dtype exactly
+    as `MemSynther._load` left it, along with the values `_load` could not
+    convert. When the cache grows past `max_bytes` the least recently used
+    entries are removed.
+
+    :param directory: (str, default `CACHE_DIR`) Directory to keep entries in
+    :param max_bytes: (int, default `CACHE_MAX_BYTES`) Largest size the cache
+        may take up on disk
+    """
+    EXTENSION = ".pkl"
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.logger = logging.getLogger(type(self).__name__)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+    def __repr__(self):
+        return f"<RosterCache: {self.directory} - {len(self._entries())} entries>"
+
+    def key(self, flist, expectations, softload=False):
+        """Makes the key for a membership file loaded with some expectations
+
+        :param flist: File name of the membership file
+        :param expectations: (str) The JSON the expectations were loaded from
+        :param softload: (boolean, default False) The `softload` the file was
+            loaded with, since it changes which columns are kept
+        :return: (str) Hex digest identifying the entry
+        """
+        digest = hashlib.sha256()
+        with open(flist, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        digest.update(b'\0' + expectations.encode('utf-8'))
+        digest.update(b'\0softload' if softload else b'\0')
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + self.EXTENSION)
+
+    def _entries(self):
+        return [
+            os.path.join(self.directory, f) for f in os.listdir(self.directory)
+            if f.endswith(self.EXTENSION)
+        ]
+
+    @property
+    def size(self):
+        """(int) Number of bytes the cache takes up on disk"""
+        return sum(os.path.getsize(f) for f in self._entries())
+
+    def get(self, key):
+        """Returns a cached membership list, or None if it is not cached
+
+        :param key: (str) Key made by `key`
+        :return: `pandas.DataFrame` or None
+        """
+        entry = self.get_entry(key)
+        return None if entry is None else entry[0]
+
+    def get_entry(self, key):
+        """Returns a cached membership list with its conversion failures
+
+        :param key: (str) Key made by `key`
+        :return: (tuple) The `pandas.DataFrame` and the
+            `MemSynther.conversion_failures` it was loaded with, which are
+            None for entries cached without them. None if it is not cached.
+        """
+        path = self._path(key)
+        if not os.path.exists(path):
+            self.logger.debug(f"Cache miss on '{key}'")
+            return None
+        self.logger.debug(f"Cache hit on '{key}'")
+        # Mark the entry as recently used for eviction
+        os.utime(path)
+        entry = pd.read_pickle(path)
+        if isinstance(entry, pd.DataFrame):
+            return entry, None
+        return entry["df"], entry["conversion_failures"]
+
+    def put(self, key, df, conversion_failures=None):
+        """Stores a loaded membership list in the cache
+
+        :param key: (str) Key made by `key`
+        :param df: (`pandas.DataFrame`) The loaded membership list
+        :param conversion_failures: (dict, default None) Values that could
+            not be converted, see `MemSynther.conversion_failures`
+        :return: None
+        """
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        pd.to_pickle(
+            {"df": df, "conversion_failures": conversion_failures or {}},
+            tmp_path
+        )
+        os.replace(tmp_path, path)
+        self.logger.debug(f"Cached '{key}'")
+        self.evict()
+
+    def evict(self):
+        """Removes the least recently used entries until under `max_bytes`"""
+        entries = sorted(self._entries(), key=os.path.getmtime)
+        size = sum(os.path.getsize(f) for f in entries)
+        while entries and size > self.max_bytes:
+            oldest = entries.pop(0)
+            size -= os.path.getsize(oldest)
+            self.logger.debug(f"Evicting '{oldest}' from the cache")
+            os.remove(oldest)
+
+    def invalidate(self, key=None):
+        """Removes an entry from the cache, or every entry if `key` is None
+
+        :param key: (str, default None) Key made by `key`
+        :return: None
+        """
+        paths = self._entries() if key is None else [self._path(key)]
+        for path in paths:
+            if os.path.exists(path):
+                self.logger.info(f"Invalidating '{path}'")
+                os.remove(path)
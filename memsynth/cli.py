@@ -0,0 +1,260 @@
+"""MemSynth's command-line interface
+
+    python -m memsynth validate 'rosters/*.csv' -e params.json --workers 8
+    python -m memsynth diff last_month.xlsx this_month.xlsx -e params.json
+    python -m memsynth convert 'rosters/*.xlsx' --to parquet -e params.json
+
+Membership files can be given as paths, glob patterns or directories, and are
+loaded with the loader for their extension. Modules that pull in pandas are
+only imported once a command runs, so that `--help` and bad arguments return
+straight away.
+
+Every command exits with `EXIT_OK` if all went well, `EXIT_FAILED` if a
+membership list failed its checks (or, for `diff`, if the lists differ), and
+`EXIT_ERROR` if a membership list could not be loaded at all.
+
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import sys
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_ERROR = 2
+
+# Writing method of `pandas.DataFrame` for each format `convert` can write
+WRITERS = {
+    "csv": ("to_csv", ".csv", {"index": False}),
+    "parquet": ("to_parquet", ".parquet", {"index": False}),
+    "xlsx": ("to_excel", ".xlsx", {"index": False}),
+    "pickle": ("to_pickle", ".pkl", {}),
+}
+
+logger = logging.getLogger("CLI")
+
+
+def expand_paths(patterns, extensions):
+    """Expands paths, glob patterns and directories into membership files
+
+    :param patterns: (iterable of str) Paths, glob patterns or directories.
+        Only files in a directory with one of `extensions` are kept.
+    :param extensions: (iterable of str) Lowercase extensions, eg. '.csv'
+    :raises: `FileNotFoundError` if a pattern matches nothing
+    :return: (list of str) Files in the order they were given, without
+        repeats
+    """
+    files = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) \
+            else [pattern]
+        if not matches or not os.path.exists(matches[0]):
+            raise FileNotFoundError(f"No membership files match '{pattern}'")
+        for match in matches:
+            if os.path.isdir(match):
+                files.extend(
+                    os.path.join(match, f) for f in sorted(os.listdir(match))
+                    if os.path.splitext(f)[1].lower() in extensions
+                )
+            else:
+                files.append(match)
+    return list(dict.fromkeys(files))
+
+
+def _chapter_names(files):
+    """Names each file after its base name, or its path if that is taken"""
+    stems = [os.path.splitext(os.path.basename(f))[0] for f in files]
+    return {
+        stem if stems.count(stem) == 1 else f: f
+        for stem, f in zip(stems, files)
+    }
+
+
+def _load(flist, expectations, softload=False):
+    from memsynth.main import MemSynther
+
+    msy = MemSynther(quiet=True)
+    msy.load_expectations_from_json(expectations)
+    msy.load_from_file(flist, softload)
+    return msy
+
+
+def validate(args, rosters=None):
+    from memsynth.batch import validate_chapters, write_summary
+    from memsynth.main import MemSynther
+
+    if rosters is None:
+        rosters = _chapter_names(expand_paths(args.paths, MemSynther.LOADERS))
+    workers = args.workers
+    if workers is None and len(rosters) == 1:
+        # Not worth starting a pool of processes for a single list
+        workers = 0
+    results = validate_chapters(
+        rosters, args.expectations, workers, args.strict, args.softload,
+        args.chunk_size, args.fail_fast
+    )
+    if args.format == "json":
+        json.dump([result.to_dict() for result in results], sys.stdout, indent=2)
+        print()
+    else:
+        for result in results:
+            print(
+                f"{result.chapter:<24} {result.status:<7} "
+                f"{result.hard_failures:>7} hard {result.soft_failures:>7} soft"
+            )
+            if result.error:
+                print(f"    {result.error}")
+            for col, counts in sorted(result.failures.items()):
+                print(f"    {col:<20} {counts['hard']:>7} hard "
+                      f"{counts['soft']:>7} soft")
+    if args.summary:
+        write_summary(results, args.summary)
+    if any(result.error for result in results):
+        return EXIT_ERROR
+    return EXIT_OK if all(result.passed for result in results) else EXIT_FAILED
+
+
+def diff(args):
+    from memsynth.config import MEMBER_ID
+    from memsynth.diff import diff_rosters
+
+    old = _load(args.old, args.expectations, args.softload)
+    new = _load(args.new, args.expectations, args.softload)
+    key = args.key or MEMBER_ID
+    roster_diff = diff_rosters(old.df, new.df, key)
+    changes = roster_diff.changes()
+    if args.format == "json":
+        json.dump({
+            "key": key,
+            "added": roster_diff.added.index.tolist(),
+            "removed": roster_diff.removed.index.tolist(),
+            "changed": changes.astype(str).to_dict(orient="records"),
+        }, sys.stdout, indent=2, default=str)
+        print()
+    else:
+        print(f"{len(roster_diff.added)} added, {len(roster_diff.removed)} "
+              f"removed, {len(roster_diff.changed)} changed")
+        for member in roster_diff.added.index:
+            print(f"+ {member}")
+        for member in roster_diff.removed.index:
+            print(f"- {member}")
+        for change in changes.itertuples(index=False):
+            print(f"~ {change[0]} {change.column}: {change.old!r} -> "
+                  f"{change.new!r}")
+    return EXIT_FAILED if roster_diff else EXIT_OK
+
+
+def convert(args):
+    from memsynth.main import MemSynther
+
+    method, ext, kwargs = WRITERS[args.to]
+    status = EXIT_OK
+    for flist in expand_paths(args.paths, MemSynther.LOADERS):
+        outdir = args.output or os.path.dirname(flist)
+        out = os.path.join(
+            outdir, os.path.splitext(os.path.basename(flist))[0] + ext
+        )
+        if os.path.abspath(out) == os.path.abspath(flist):
+            logger.error(f"Not overwriting '{flist}' with itself")
+            status = EXIT_ERROR
+            continue
+        try:
+            msy = _load(flist, args.expectations, args.softload)
+        except Exception as e:
+            logger.error(f"Could not convert '{flist}': {e}")
+            status = EXIT_ERROR
+            continue
+        os.makedirs(outdir or ".", exist_ok=True)
+        getattr(msy.df, method)(out, **kwargs)
+        print(f"{flist} -> {out}")
+    return status
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="memsynth",
+        description="Check, compare and convert membership lists"
+    )
+    parser.add_argument("-v", "--verbose", action="count", default=0,
+                        help="log more, may be repeated")
+    commands = parser.add_subparsers(dest="command", metavar="command")
+    commands.required = True
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("-e", "--expectations", required=True,
+                        help="JSON file of expectations")
+    common.add_argument("--softload", action="store_true",
+                        help="allow extra columns in the membership lists")
+
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument("-f", "--format", choices=("text", "json"),
+                        default="text")
+
+    validate_parser = commands.add_parser(
+        "validate", parents=[common, output],
+        help="check membership lists against the expectations"
+    )
+    validate_parser.add_argument("paths", nargs="+",
+                                 help="membership files, glob patterns or "
+                                      "directories")
+    validate_parser.add_argument("-w", "--workers", type=int, default=None,
+                                 help="worker processes, 0 to check in this "
+                                      "process (default: one per CPU)")
+    validate_parser.add_argument("--chunk-size", type=int, default=None,
+                                 help="stream each CSV or xlsx file this many "
+                                      "rows at a time")
+    validate_parser.add_argument("--strict", action="store_true",
+                                 help="count soft failures as failures")
+    validate_parser.add_argument("--fail-fast", action="store_true",
+                                 help="stop checking a list at its first hard "
+                                      "failure")
+    validate_parser.add_argument("-s", "--summary",
+                                 help="also write a summary to this CSV or "
+                                      "JSON file")
+    validate_parser.set_defaults(run=validate)
+
+    diff_parser = commands.add_parser(
+        "diff", parents=[common, output],
+        help="find the members added, removed and changed between two lists"
+    )
+    diff_parser.add_argument("old", help="the older membership file")
+    diff_parser.add_argument("new", help="the newer membership file")
+    diff_parser.add_argument("-k", "--key", default=None,
+                             help="column identifying each member "
+                                  "(default: AK_ID)")
+    diff_parser.set_defaults(run=diff)
+
+    convert_parser = commands.add_parser(
+        "convert", parents=[common],
+        help="load membership lists and write them in another format"
+    )
+    convert_parser.add_argument("paths", nargs="+",
+                                help="membership files, glob patterns or "
+                                     "directories")
+    convert_parser.add_argument("-t", "--to", choices=tuple(WRITERS),
+                                required=True)
+    convert_parser.add_argument("-o", "--output", default=None,
+                                help="directory to write to (default: next "
+                                     "to each file)")
+    convert_parser.set_defaults(run=convert)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    levels = (logging.ERROR, logging.WARNING, logging.INFO, logging.DEBUG)
+    logging.basicConfig(
+        level=levels[min(args.verbose, len(levels) - 1)],
+        format="%(levelname)s %(name)s: %(message)s", stream=sys.stderr
+    )
+    try:
+        return args.run(args)
+    except Exception as e:
+        from memsynth.exceptions import MemSynthBaseError
+
+        if not isinstance(e, (MemSynthBaseError, OSError, ValueError)):
+            raise
+        logger.error(str(e))
+        return EXIT_ERROR
@@ -4,6 +4,40 @@ import re
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 TEST_DIR = os.path.join(ROOT_DIR, 'tests')
 
+# Column that identifies a member across membership lists
+MEMBER_ID = "AK_ID"
+
+# Number of rows read at a time when streaming a membership list
+CHUNK_SIZE = 10000
+
+# Most failures on a column detailed in the log when they are found
+LOG_FAILURE_SAMPLE = 10
+
+# Where `memsynth.cache.RosterCache` keeps loaded membership lists by default
+CACHE_DIR = os.getenv(
+    'MEMSYNTH_CACHE_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'memsynth')
+)
+CACHE_MAX_BYTES = 1 << 30
+# Where `memsynth.store.MembershipStore` keeps members by default
+STORE_PATH = os.getenv(
+    'MEMSYNTH_STORE',
+    os.path.join(os.path.expanduser('~'), '.local', 'share', 'memsynth',
+                 'members.sqlite3')
+)
+# Number of compiled expectation plans `memsynth.plan` keeps per process
+PLAN_CACHE_SIZE = 16
+# Lowest similarity score, from 0 to 1, for `memsynth.dedupe` to call two rows
+# the same member, and the most rows a blocking key may share to be compared
+DUPLICATE_THRESHOLD = 0.85
+DUPLICATE_MAX_BLOCK = 50
+# Most distinct values whose regex results are remembered per regex parameter
+MATCH_CACHE_SIZE = 4096
+# String columns with at most this many distinct values per row, in lists of
+# at least `CATEGORY_MIN_ROWS` rows, are loaded as categoricals
+CATEGORY_MAX_RATIO = 0.05
+CATEGORY_MIN_ROWS = 1000
+
 # TODO: Delete?
 EXPECTED_FORMAT_MEM_LIST = {
     "columns": [
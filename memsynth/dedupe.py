@@ -0,0 +1,235 @@
+"""Finding members who appear more than once in a membership list
+
+The same person often shows up twice under different `MEMBER_ID`s, after
+re-joining or with a mistyped email. Rather than comparing every pair of
+rows, rows are put into blocks that share a blocking key (last name and zip
+code, email, or phone number), only rows within the same block are scored
+against each other, and pairs that score high enough are clustered into
+groups of duplicates.
+
+"""
+from itertools import combinations
+from difflib import SequenceMatcher
+import logging
+
+from memsynth.config import MEMBER_ID, DUPLICATE_THRESHOLD, DUPLICATE_MAX_BLOCK
+from memsynth.utils import LazyModule
+
+np = LazyModule("numpy")
+pd = LazyModule("pandas")
+
+logger = logging.getLogger("Dedupe")
+
+PHONE_COLUMNS = ("Mobile_Phone", "Home_Phone", "Work_Phone")
+
+# Columns scored when comparing two rows, and how they are compared. 'fuzzy'
+# columns score the similarity of their text, 'exact' ones score 1 or 0.
+SCORED_COLUMNS = {
+    "first_name": "fuzzy",
+    "last_name": "fuzzy",
+    "Email": "exact",
+    "phone": "exact",
+    "Address_Line_1": "fuzzy",
+    "Zip": "exact",
+}
+
+
+def _normalized(df, col):
+    """Lower case letters and digits of a column, with nulls as ''"""
+    if col not in df.columns:
+        return pd.Series("", index=df.index)
+    return df[col].astype(object).where(df[col].notna(), "").astype(str) \
+        .str.lower().str.replace(r"[^a-z0-9]", "", regex=True)
+
+
+def _phone(df):
+    """The last ten digits of the first phone number of each row"""
+    phone = pd.Series("", index=df.index)
+    for col in PHONE_COLUMNS:
+        if col not in df.columns:
+            continue
+        digits = df[col].astype(object).where(df[col].notna(), "").astype(str) \
+            .str.replace(r"\.0$", "", regex=True) \
+            .str.replace(r"\D", "", regex=True).str[-10:]
+        phone = phone.where(phone != "", digits.where(digits.str.len() == 10, ""))
+    return phone
+
+
+def normalize_roster(df):
+    """Normalizes the columns that duplicates are found with
+
+    :param df: (`pandas.DataFrame`) Membership list
+    :return: (`pandas.DataFrame`) With a column for each of `SCORED_COLUMNS`,
+        with a positional index, where missing values are ''
+    """
+    df = df.reset_index(drop=True)
+    normalized = pd.DataFrame({
+        col: _normalized(df, col) for col in SCORED_COLUMNS
+        if col not in ("Email", "phone")
+    })
+    normalized["Email"] = df["Email"].astype(object) \
+        .where(df["Email"].notna(), "").astype(str).str.strip().str.lower() \
+        if "Email" in df.columns else ""
+    normalized["Zip"] = normalized["Zip"].str[:5]
+    normalized["phone"] = _phone(df)
+    return normalized
+
+
+def blocking_keys(normalized):
+    """Builds the blocking keys of every row
+
+    :param normalized: (`pandas.DataFrame`) From `normalize_roster`
+    :return: (dict) Names of blocking keys to a `pandas.Series` of the key
+        of every row, where '' means the row has no such key
+    """
+    has_name_zip = (normalized["last_name"] != "") & (normalized["Zip"] != "")
+    return {
+        "name_zip": (normalized["last_name"] + "|" + normalized["Zip"])
+        .where(has_name_zip, ""),
+        "email": normalized["Email"],
+        "phone": normalized["phone"],
+    }
+
+
+def candidate_pairs(keys, max_block=DUPLICATE_MAX_BLOCK):
+    """Finds the pairs of rows that share at least one blocking key
+
+    :param keys: (dict) From `blocking_keys`
+    :param max_block: (int, default `DUPLICATE_MAX_BLOCK`) Blocks with more
+        rows than this are skipped, since a key that common does not single
+        anyone out and its pairs would grow quadratically
+    :return: (dict) Pairs of row positions, first one lowest, to the set of
+        names of the keys they share
+    """
+    pairs = {}
+    for name, key in keys.items():
+        key = key[key != ""]
+        sizes = key.map(key.value_counts())
+        too_big = sizes > max_block
+        if too_big.any():
+            logger.info(
+                f"Skipping {key[too_big].nunique()} '{name}' blocks of more "
+                f"than {max_block} rows"
+            )
+        key = key[(sizes > 1) & ~too_big]
+        for rows in key.groupby(key, sort=False).indices.values():
+            for pair in combinations(key.index[np.sort(rows)], 2):
+                pairs.setdefault(pair, set()).add(name)
+    return pairs
+
+
+def _similarity(a, b, kind):
+    if a == b:
+        return 1.0
+    if kind == "exact":
+        return 0.0
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def score_pair(normalized, i, j):
+    """Scores how alike two rows are, from 0 to 1
+
+    The score is the mean similarity of the `SCORED_COLUMNS` that neither
+    row is missing.
+
+    :param normalized: (dict) Each of `SCORED_COLUMNS` to an array of its
+        values, as in the `pandas.DataFrame` from `normalize_roster`
+    :param i: (int) Position of a row
+    :param j: (int) Position of another row
+    :return: (float) Or 0 if no column can be compared
+    """
+    scores = []
+    for col, kind in SCORED_COLUMNS.items():
+        a, b = normalized[col][i], normalized[col][j]
+        if a and b:
+            scores.append(_similarity(a, b, kind))
+    return sum(scores) / len(scores) if scores else 0.0
+
+
+def _cluster(pairs, n, lines):
+    """Groups rows joined by pairs with a union-find
+
+    :return: (`np.ndarray`) The lowest row in the group of each of `lines`
+    """
+    parent = np.arange(n)
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in pairs:
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+    return np.array([find(i) for i in lines], dtype=np.int64)
+
+
+class DuplicateReport:
+    """The members that appear more than once in a membership list
+
+    :param pairs: (`pandas.DataFrame`) One row per pair of likely duplicates,
+        with the line and member id of each, their score, and the blocking
+        keys they share
+    :param groups: (`pandas.DataFrame`) One row per line that has duplicates,
+        with its member id and the number of its group of duplicates
+    """
+    def __init__(self, pairs, groups):
+        self.pairs = pairs
+        self.groups = groups
+
+    def __repr__(self):
+        return f"<DuplicateReport: {self.groups['group'].nunique()} groups - " \
+            f"{len(self.groups)} lines>"
+
+    def __bool__(self):
+        return not self.groups.empty
+
+    def __iter__(self):
+        """Yields the lines of each group of duplicates"""
+        for _, group in self.groups.groupby("group", sort=True):
+            yield group["line"].tolist()
+
+
+def find_duplicates(df, threshold=DUPLICATE_THRESHOLD, key=MEMBER_ID,
+                    max_block=DUPLICATE_MAX_BLOCK):
+    """Finds the members who appear more than once in a membership list
+
+    :param df: (`pandas.DataFrame`) Membership list
+    :param threshold: (float, default `DUPLICATE_THRESHOLD`) Lowest score,
+        from `score_pair`, for two rows to be duplicates
+    :param key: (str, default `MEMBER_ID`) Column identifying each member
+    :param max_block: (int, default `DUPLICATE_MAX_BLOCK`) See
+        `candidate_pairs`
+    :return: (`DuplicateReport`)
+    """
+    normalized = normalize_roster(df)
+    candidates = candidate_pairs(blocking_keys(normalized), max_block)
+    logger.debug(f"Scoring {len(candidates)} candidate pairs")
+    columns = {
+        col: normalized[col].to_numpy(dtype=object) for col in SCORED_COLUMNS
+    }
+    matched = []
+    for (i, j), blocks in candidates.items():
+        score = score_pair(columns, i, j)
+        if score >= threshold:
+            matched.append((i, j, score, " ".join(sorted(blocks))))
+
+    ids = df[key].to_numpy(dtype=object) if key in df.columns \
+        else np.full(len(df), None, dtype=object)
+    pairs = pd.DataFrame(
+        matched, columns=["line_a", "line_b", "score", "blocks"]
+    ).astype({"line_a": "int64", "line_b": "int64"})
+    pairs.insert(2, f"{key}_a", ids[pairs["line_a"].to_numpy()])
+    pairs.insert(3, f"{key}_b", ids[pairs["line_b"].to_numpy()])
+
+    lines = np.unique(pairs[["line_a", "line_b"]].to_numpy())
+    groups = pd.DataFrame({
+        "line": lines.astype("int64"),
+        key: ids[lines],
+        "group": _cluster(zip(pairs["line_a"], pairs["line_b"]), len(df), lines),
+    })
+    # Number groups 0, 1, 2... in order of their first line
+    groups["group"] = pd.factorize(groups["group"])[0]
+    return DuplicateReport(pairs, groups)
@@ -0,0 +1,110 @@
+"""Comparing two membership lists
+
+Finds the members that were added, removed or changed between two membership
+lists, such as last month's and this month's lists from National. Members are
+matched on `MEMBER_ID`, and rows and columns are compared by hash rather than
+value by value.
+
+"""
+from memsynth.config import MEMBER_ID
+from memsynth.utils import LazyModule
+
+pd = LazyModule("pandas")
+
+
+class RosterDiff:
+    """The differences between an older and a newer membership list
+
+    :param added: (`pandas.DataFrame`) Rows of members only in the newer list
+    :param removed: (`pandas.DataFrame`) Rows of members only in the older list
+    :param changed: (`pandas.DataFrame`) One row per member whose data changed,
+        with a boolean column for each compared column that is True where
+        that column changed
+    :param old: (`pandas.DataFrame`) The older data of the changed members
+    :param new: (`pandas.DataFrame`) The newer data of the changed members
+    """
+    def __init__(self, added, removed, changed, old, new):
+        self.added = added
+        self.removed = removed
+        self.changed = changed
+        self._old = old
+        self._new = new
+
+    def __repr__(self):
+        return f"<RosterDiff: Added {len(self.added)} - Removed " \
+            f"{len(self.removed)} - Changed {len(self.changed)}>"
+
+    def __bool__(self):
+        return not (self.added.empty and self.removed.empty and self.changed.empty)
+
+    def changes(self, columns=None):
+        """Lists every changed value of the changed members
+
+        :param columns: (str or iterable of str, default None) Only list the
+            changes on these columns. If None, lists changes on every column.
+        :return: (`pandas.DataFrame`) With the member id, the column, and the
+            old and new values, one row per changed value
+        """
+        if columns is None:
+            columns = self.changed.columns
+        elif isinstance(columns, str):
+            columns = [columns]
+        frames = []
+        for col in columns:
+            ids = self.changed.index[self.changed[col].to_numpy()]
+            frames.append(pd.DataFrame({
+                self.changed.index.name: ids,
+                'column': col,
+                'old': self._old.loc[ids, col].to_numpy(dtype=object),
+                'new': self._new.loc[ids, col].to_numpy(dtype=object),
+            }))
+        if not frames:
+            return pd.DataFrame(
+                columns=[self.changed.index.name, 'column', 'old', 'new']
+            )
+        return pd.concat(frames, ignore_index=True)
+
+
+def _hash_columns(df):
+    """Hashes every value of `df`, column by column, into a 2D array"""
+    return pd.DataFrame({
+        col: pd.util.hash_pandas_object(df[col], index=False).to_numpy()
+        for col in df.columns
+    }, index=df.index)
+
+
+def diff_rosters(old, new, key=MEMBER_ID):
+    """Finds the members added, removed and changed between two lists
+
+    Only columns in both membership lists are compared. Two nulls are
+    considered to be the same value.
+
+    :param old: (`pandas.DataFrame`) The older membership list
+    :param new: (`pandas.DataFrame`) The newer membership list
+    :param key: (str, default `MEMBER_ID`) Column identifying each member
+    :raises: `ValueError` if `key` is not unique in either membership list
+    :return: (`RosterDiff`)
+    """
+    for which, df in (("older", old), ("newer", new)):
+        if df[key].duplicated().any():
+            raise ValueError(
+                f"'{key}' is not unique in the {which} membership list"
+            )
+    old = old.set_index(key)
+    new = new.set_index(key)
+
+    added = new.loc[new.index.difference(old.index, sort=False)]
+    removed = old.loc[old.index.difference(new.index, sort=False)]
+
+    common = new.index.intersection(old.index, sort=False)
+    columns = [col for col in new.columns if col in old.columns]
+    old_common = old.loc[common, columns]
+    new_common = new.loc[common, columns]
+
+    # Narrow down to the rows that changed before comparing column by column
+    row_differs = pd.util.hash_pandas_object(old_common, index=False).to_numpy() != \
+        pd.util.hash_pandas_object(new_common, index=False).to_numpy()
+    old_common = old_common[row_differs]
+    new_common = new_common[row_differs]
+    changed = _hash_columns(old_common) != _hash_columns(new_common)
+    return RosterDiff(added, removed, changed, old_common, new_common)
@@ -0,0 +1,155 @@
+"""Writing the failures found on a membership list as data
+
+Each failure is written as one record per failed constraint, with the
+column, the line, the name of the constraint, whether it is soft and the
+value in the failing cell:
+
+    column,line,constraint,soft,value
+    Home_Phone,0,regex,False,"410-5644639, 4105644639"
+
+Records are read straight out of each column's `FailureStore` and written a
+batch at a time, so neither a `Failure` object per cell nor a dict of every
+failure is built on the way, and memory stays flat however many failures
+there are.
+
+"""
+import csv
+import json
+import os
+
+from memsynth.config import CHUNK_SIZE
+from memsynth.utils import LazyModule
+
+np = LazyModule("numpy")
+pd = LazyModule("pandas")
+
+FAILURE_FIELDS = ("column", "line", "constraint", "soft", "value")
+
+
+def _plain(value):
+    """Turns a cell's value into something csv, json and pyarrow can write"""
+    if value is None or value is pd.NaT or value is pd.NA or \
+            (isinstance(value, float) and value != value):
+        return None
+    if isinstance(value, (str, bool, int, float)):
+        return value
+    if hasattr(value, "item") and not hasattr(value, "isoformat"):
+        return value.item()
+    return str(value)
+
+
+def iter_failure_batches(expectations, include_soft=True, batch_size=CHUNK_SIZE):
+    """Reads the failures of every column in batches of records
+
+    Within a column, records are in order of their line, and then of the
+    constraint's position in the expectation.
+
+    :param expectations: (dict) Column names to checked `MemExpectation`s,
+        eg. `MemSynther.expectations`
+    :param include_soft: (boolean, default True) If False, failed soft
+        constraints are left out
+    :param batch_size: (int, default `CHUNK_SIZE`) Most records in a batch
+    :return: yields a dict of `FAILURE_FIELDS` to lists of equal length
+    """
+    for col, exp in expectations.items():
+        store = exp._fails
+        if len(store) == 0:
+            continue
+        lines, masks, _, data = store.arrays()
+        positions, bits = [], []
+        for i, param in enumerate(store.params):
+            if param.soft and not include_soft:
+                continue
+            failed = np.flatnonzero(masks & np.uint64(1 << i))
+            positions.append(failed)
+            bits.append(np.full(len(failed), i, dtype=np.int64))
+        if not positions:
+            continue
+        positions = np.concatenate(positions)
+        bits = np.concatenate(bits)
+        order = np.lexsort((bits, lines[positions]))
+        positions, bits = positions[order], bits[order]
+        for start in range(0, len(positions), batch_size):
+            where = positions[start:start + batch_size]
+            params = [store.params[b] for b in bits[start:start + batch_size]]
+            yield {
+                "column": [col] * len(where),
+                "line": lines[where].tolist(),
+                "constraint": [p.name for p in params],
+                "soft": [bool(p.soft) for p in params],
+                "value": [_plain(v) for v in data[where]],
+            }
+
+
+def _write_csv(batches, fname):
+    with open(fname, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(FAILURE_FIELDS)
+        for batch in batches:
+            writer.writerows(zip(*(batch[field] for field in FAILURE_FIELDS)))
+
+
+def _write_jsonl(batches, fname):
+    with open(fname, "w") as f:
+        for batch in batches:
+            for record in zip(*(batch[field] for field in FAILURE_FIELDS)):
+                f.write(json.dumps(dict(zip(FAILURE_FIELDS, record)), default=str))
+                f.write("\n")
+
+
+def _write_parquet(batches, fname):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("column", pa.string()), ("line", pa.int64()),
+        ("constraint", pa.string()), ("soft", pa.bool_()),
+        ("value", pa.string()),
+    ])
+    with pq.ParquetWriter(fname, schema) as writer:
+        for batch in batches:
+            batch["value"] = [
+                None if v is None else str(v) for v in batch["value"]
+            ]
+            writer.write_table(pa.Table.from_pydict(batch, schema=schema))
+
+
+# Writer for each format `export_failures` can write, and its extensions
+WRITERS = {
+    "csv": (_write_csv, (".csv",)),
+    "jsonl": (_write_jsonl, (".jsonl", ".ndjson")),
+    "parquet": (_write_parquet, (".parquet",)),
+}
+
+
+def export_failures(expectations, fname, format=None, include_soft=True,
+                    batch_size=CHUNK_SIZE):
+    """Streams the failures of every column to a CSV, JSON Lines or Parquet file
+
+    :param expectations: (dict) Column names to checked `MemExpectation`s,
+        eg. `MemSynther.expectations`
+    :param fname: (str) File to write
+    :param format: (str, default None) One of `WRITERS`. If None, the format
+        is chosen by the extension of `fname`.
+    :param include_soft: (boolean, default True) If False, failed soft
+        constraints are left out
+    :param batch_size: (int, default `CHUNK_SIZE`) Records written at a time
+    :raises: `ValueError` if the format is unknown
+    :return: None
+    """
+    if format is None:
+        ext = os.path.splitext(fname)[1].lower()
+        format = next(
+            (name for name, (_, exts) in WRITERS.items() if ext in exts), None
+        )
+        if format is None:
+            raise ValueError(
+                f"Cannot tell the format of '{fname}' from its extension, "
+                f"expected one of {tuple(WRITERS)}"
+            )
+    elif format not in WRITERS:
+        raise ValueError(
+            f"Unknown format '{format}', expected one of {tuple(WRITERS)}"
+        )
+    write, _ = WRITERS[format]
+    write(iter_failure_batches(expectations, include_soft, batch_size), fname)
@@ -0,0 +1,136 @@
+"""Timing and counting the stages of a MemSynth run
+
+A `MemSynther` given an `Instrumentation` records how long reading, verifying,
+loading and checking a membership list take, how many rows each stage went
+through, and how many failures were found. By default a `MemSynther` uses
+`NULL_INSTRUMENTATION`, which records nothing and costs next to nothing.
+
+"""
+from contextlib import contextmanager, nullcontext
+import json
+import threading
+import time
+
+
+class Instrumentation:
+    """Records wall times, rows and counters of named stages
+
+    Stages and counters accumulate across runs until `reset` is called.
+    Stage names are dotted, eg. 'load.AK_ID' or 'check.Email.regex'.
+
+    :param on_stage: (callable, default None) Called with the stage name,
+        seconds and rows (or None) every time a stage finishes
+    :param on_count: (callable, default None) Called with the counter name
+        and the amount every time a counter goes up
+    """
+    enabled = True
+
+    def __init__(self, on_stage=None, on_count=None):
+        self.on_stage = on_stage
+        self.on_count = on_count
+        self._lock = threading.Lock()
+        self.reset()
+
+    def __repr__(self):
+        return f"<Instrumentation: {len(self.stages)} stages - " \
+            f"{len(self.counters)} counters>"
+
+    def reset(self):
+        """Forgets everything recorded so far"""
+        self.stages = {}
+        self.counters = {}
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        """Times the body of a `with` statement as the stage `name`
+
+        :param name: (str) Name of the stage
+        :param rows: (int, default None) Number of rows the stage goes through
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start, rows)
+
+    def record(self, name, seconds, rows=None):
+        """Records that the stage `name` took `seconds` over `rows` rows"""
+        with self._lock:
+            stage = self.stages.setdefault(
+                name, {"calls": 0, "seconds": 0.0, "rows": 0}
+            )
+            stage["calls"] += 1
+            stage["seconds"] += seconds
+            stage["rows"] += rows or 0
+        if self.on_stage is not None:
+            self.on_stage(name, seconds, rows)
+
+    def count(self, name, amount=1):
+        """Adds `amount` to the counter `name`"""
+        if not amount:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+        if self.on_count is not None:
+            self.on_count(name, amount)
+
+    def merge(self, report):
+        """Adds in a `report` made by another `Instrumentation`
+
+        Used to bring home what was recorded in a worker process.
+        """
+        with self._lock:
+            for name, other in report["stages"].items():
+                stage = self.stages.setdefault(
+                    name, {"calls": 0, "seconds": 0.0, "rows": 0}
+                )
+                for key in ("calls", "seconds", "rows"):
+                    stage[key] += other[key]
+            for name, amount in report["counters"].items():
+                self.counters[name] = self.counters.get(name, 0) + amount
+
+    def report(self):
+        """Returns everything recorded as a dict
+
+        :return: (dict) With 'stages', mapping stage names to their calls,
+            seconds, rows and rows_per_sec, and 'counters'
+        """
+        with self._lock:
+            stages = {
+                name: dict(
+                    stage,
+                    rows_per_sec=stage["rows"] / stage["seconds"]
+                    if stage["rows"] and stage["seconds"] else None
+                )
+                for name, stage in self.stages.items()
+            }
+            return {"stages": stages, "counters": dict(self.counters)}
+
+    def to_json(self, **kwargs):
+        """Returns `report` as a JSON string, passing `kwargs` to `json.dumps`"""
+        return json.dumps(self.report(), **kwargs)
+
+
+class NullInstrumentation(Instrumentation):
+    """An `Instrumentation` that records nothing"""
+    enabled = False
+
+    _NULL_STAGE = nullcontext()
+
+    def __init__(self):
+        super().__init__()
+
+    def stage(self, name, rows=None):
+        return self._NULL_STAGE
+
+    def record(self, name, seconds, rows=None):
+        pass
+
+    def count(self, name, amount=1):
+        pass
+
+    def merge(self, report):
+        pass
+
+
+NULL_INSTRUMENTATION = NullInstrumentation()
@@ -3,25 +3,255 @@
 Orlando DSA's membership list updating and maintaince solution.
 
 """
-import json
 import logging
 import os
-import re
+import pickle
 import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
-import pandas as pd
-
-from memsynth.config import uss_regex, EXPECTED_FORMAT_MEM_LIST
+from memsynth.config import (
+    EXPECTED_FORMAT_MEM_LIST, CHUNK_SIZE, MEMBER_ID,
+    LOG_FAILURE_SAMPLE, MATCH_CACHE_SIZE, DUPLICATE_THRESHOLD,
+    CATEGORY_MAX_RATIO, CATEGORY_MIN_ROWS
+)
+from memsynth.dedupe import find_duplicates
+from memsynth.diff import diff_rosters
+from memsynth.export import export_failures
 import memsynth.exceptions as ex
+from memsynth.instrumentation import Instrumentation, NULL_INSTRUMENTATION
 from memsynth.parameters import (
-    Parameter, ACCEPTABLE_PARAMS, UNIQUE_PARAMS, DATATYPE_MAP
+    BOOLEAN_VALUES, INTEGER_WIDTHS, RELATIVE_COMPARISONS, RELATIVE_REQUIREMENTS
 )
-from memsynth.utils import setup_logging
+from memsynth.plan import compile_expectation, load_plan
+from memsynth.shared import SharedRoster
+from memsynth.utils import LazyModule, setup_logging, hash_rows
+
+np = LazyModule("numpy")
+pd = LazyModule("pandas")
+
+
+def _check_expectation(expectation, data, frame=None, instrumented=False,
+                       quiet=False, fail_fast=False, max_failures=None):
+    """Runs `expectation.check` on `data` and returns the failures it found
+
+    This lives at the module level so that it can be sent to the workers of a
+    `ProcessPoolExecutor`, where the expectation is a copy of the original.
+
+    :return: (tuple) The `FailureStore` of the expectation, a report of its
+        `Instrumentation` if `instrumented` is True or else None, and the
+        seconds the check took
+    """
+    instrumentation = Instrumentation() if instrumented else NULL_INSTRUMENTATION
+    start = time.perf_counter()
+    expectation.check(
+        data, frame=frame, instrumentation=instrumentation, quiet=quiet,
+        fail_fast=fail_fast, max_failures=max_failures
+    )
+    return (
+        expectation._fails, instrumentation.report() if instrumented else None,
+        time.perf_counter() - start
+    )
+
+
+def _check_shared_expectation(expectation, roster, instrumented=False,
+                              quiet=False, fail_fast=False, max_failures=None):
+    """Runs `_check_expectation` on columns read from a `SharedRoster`
+
+    Only the expectation's column and the ones its `relative_to` refers to
+    are read by the worker, rather than pickled to it.
+    """
+    related = [col for col in expectation.related_columns if col in roster.dtypes]
+    frame = roster.read(list(dict.fromkeys([expectation.col] + related)))
+    return _check_expectation(
+        expectation, frame[expectation.col], frame[related], instrumented, quiet,
+        fail_fast, max_failures
+    )
+
+
+def _matches(matcher, strs):
+    """Evaluates a `memsynth.plan.RegexMatcher` on every string in a list
+
+    :return: (`np.ndarray` of bool) True where a string matches
+    """
+    kind, value = matcher
+    if kind == "in":
+        result = (s in value for s in strs)
+    elif kind == "in_upper":
+        result = (s.upper() in value for s in strs)
+    elif kind == "prefix":
+        result = (s.startswith(value) for s in strs)
+    else:
+        match = value.match
+        result = (match(s) is not None for s in strs)
+    return np.fromiter(result, dtype=bool, count=len(strs))
+
+
+def _category_values(series):
+    """A categorical `series` without nulls as the values of its categories
+
+    Categoricals only compare with categoricals of the same categories, so
+    they are compared by value instead.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.astype(series.cat.categories.dtype)
+    return series
+
+
+def _nullable_int(dtype):
+    """The nullable integer dtype of the width of an integer `dtype`"""
+    width = dtype.lower()[len("int"):]
+    return f"Int{width}" if f"Int{width}" in INTEGER_WIDTHS else "Int64"
+
+
+class MatchCache:
+    """A least recently used cache of which strings a regex matches
+
+    One cache is kept per `memsynth.plan.RegexMatcher` for the life of the
+    process (see `match_cache`), so a value seen in one chunk or one run is
+    not matched again in the next. Columns with more distinct values than
+    the cache holds are matched directly, since they would only churn it.
+
+    :param maxsize: (int, default `MATCH_CACHE_SIZE`) Most strings remembered
+    """
+    def __init__(self, maxsize=MATCH_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"<MatchCache: {len(self._results)} strings - Hits " \
+            f"{self.hits} - Misses {self.misses}>"
+
+    def __len__(self):
+        return len(self._results)
+
+    def matches(self, matcher, strs):
+        """Like `_matches`, but only matches strings it has not seen before
+
+        :param matcher: (`memsynth.plan.RegexMatcher`) The matcher this cache
+            belongs to
+        :param strs: (list of str) Distinct strings to match
+        :return: (`np.ndarray` of bool) True where a string matches
+        """
+        if len(strs) > self.maxsize:
+            return _matches(matcher, strs)
+        with self._lock:
+            results = self._results
+            missing = [s for s in strs if s not in results]
+            if missing:
+                for s, result in zip(missing, _matches(matcher, missing)):
+                    results[s] = bool(result)
+            self.misses += len(missing)
+            self.hits += len(strs) - len(missing)
+            for s in strs:
+                results.move_to_end(s)
+            while len(results) > self.maxsize:
+                results.popitem(last=False)
+            return np.fromiter(
+                (results[s] for s in strs), dtype=bool, count=len(strs)
+            )
+
+
+_match_caches = {}
+
+
+def match_cache(matcher):
+    """Returns the process-wide `MatchCache` of a regex matcher"""
+    cache = _match_caches.get(matcher)
+    if cache is None:
+        cache = _match_caches.setdefault(matcher, MatchCache())
+    return cache
+
+
+def clear_match_caches():
+    """Forgets every regex result remembered so far"""
+    _match_caches.clear()
+
+
+class CheckHistory:
+    """How often each column has had hard failures, and how long it takes
+    to check, over the checks run in this process
+
+    Used to order columns for fail-fast checks, so that the columns most
+    likely to fail for the least time spent are checked first.
+    """
+    def __init__(self):
+        # Column to [runs, runs with hard failures, seconds, rows checked]
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"<CheckHistory: {len(self._stats)} columns>"
+
+    def record(self, col, failed, seconds, rows):
+        """Records one check of a column
+
+        :param col: (str) The column checked
+        :param failed: (boolean) Whether it had a hard failure
+        :param seconds: (float) Time the check took
+        :param rows: (int) Number of rows checked
+        """
+        with self._lock:
+            stats = self._stats.setdefault(col, [0, 0, 0.0, 0])
+            stats[0] += 1
+            stats[1] += bool(failed)
+            stats[2] += seconds
+            stats[3] += rows
+
+    def likelihood(self, col):
+        """(float) Chance of a hard failure, starting from 1/2 if unseen"""
+        runs, failed, _, _ = self._stats.get(col, (0, 0, 0.0, 0))
+        return (failed + 1) / (runs + 2)
+
+    def cost(self, col):
+        """(float) Seconds per row, or None if it has not been timed"""
+        _, _, seconds, rows = self._stats.get(col, (0, 0, 0.0, 0))
+        return seconds / rows if rows else None
+
+    def order(self, cols):
+        """Orders columns from most to least likely to fail per second spent
+
+        Columns that have not been timed are assumed to cost the average of
+        the ones that have. Ties keep the order of `cols`.
+
+        :param cols: (iterable of str)
+        :return: (list of str)
+        """
+        cols = list(cols)
+        costs = {col: self.cost(col) for col in cols}
+        known = [cost for cost in costs.values() if cost]
+        default = sum(known) / len(known) if known else 1.0
+        return sorted(
+            cols, key=lambda col: -self.likelihood(col) / (costs[col] or default)
+        )
+
+
+_check_histories = {}
+
+
+def check_history(plan):
+    """Returns the process-wide `CheckHistory` of an expectation plan"""
+    key = plan.expectations_json if plan is not None else None
+    history = _check_histories.get(key)
+    if history is None:
+        history = _check_histories.setdefault(key, CheckHistory())
+    return history
+
+
+def clear_check_histories():
+    """Forgets every check recorded so far"""
+    _check_histories.clear()
 
 
 class Failure:
+    logger = logging.getLogger("Failure")
+
     def __init__(self, line, why, data):
-        self.logger = logging.getLogger(type(self).__name__)
         self.data = data
         self.is_soft = why.soft
         self._why = [why]
@@ -55,6 +285,170 @@ class Failure:
             self.is_soft = False
 
 
+class FailureStore:
+    """Columnar storage for the failures found on a column
+
+    Rather than one `Failure` per failing cell, the store keeps arrays of the
+    failing line numbers, a bitmask of which parameters failed on each line,
+    whether each line is a hard failure, and the data in the failing cell.
+    `Failure` objects are only created when the store is iterated over.
+
+    :param params: (tuple of `Parameter`) The parameters that can fail, where
+        bit `i` of a line's mask refers to `params[i]`
+    :param max_failures: (int, default None) Most failures to keep. Past it,
+        failures are only counted in `dropped_hard` and `dropped_soft`.
+    """
+    def __init__(self, params, max_failures=None):
+        self.params = tuple(params)
+        self.max_failures = max_failures
+        self.n_hard = 0
+        self.n_soft = 0
+        self.dropped_hard = 0
+        self.dropped_soft = 0
+        self._chunks = []
+        # Bumped whenever the failures change, so views know to look again
+        self.version = 0
+
+    def __repr__(self):
+        dropped = self.dropped_hard + self.dropped_soft
+        return f"<FailureStore: Hard {self.n_hard} - Soft {self.n_soft}" + \
+            (f" - Dropped {dropped}>" if dropped else ">")
+
+    @property
+    def total_hard(self):
+        """(int) Hard failures found, whether kept or dropped"""
+        return self.n_hard + self.dropped_hard
+
+    @property
+    def total_soft(self):
+        """(int) Soft failures found, whether kept or dropped"""
+        return self.n_soft + self.dropped_soft
+
+    def __len__(self):
+        return self.n_hard + self.n_soft
+
+    def __iter__(self):
+        return iter(FailureView(self))
+
+    def append(self, lines, masks, hard, data):
+        """Adds the failures found on a column, or a chunk of a column
+
+        :param lines: (`np.ndarray` of int) Line numbers that failed
+        :param masks: (`np.ndarray` of uint64) Bitmask of failed parameters
+        :param hard: (`np.ndarray` of bool) True where the failure is hard
+        :param data: (`np.ndarray` of object) The data on each failing line
+        """
+        if len(lines) == 0:
+            return
+        if self.max_failures is not None \
+                and len(self) + len(lines) > self.max_failures:
+            # Hard failures are kept over soft ones, in order of their lines
+            room = max(self.max_failures - len(self), 0)
+            keep = np.sort(np.argsort(~np.asarray(hard), kind='stable')[:room])
+            n_hard = int(np.count_nonzero(hard))
+            kept_hard = int(np.count_nonzero(np.asarray(hard)[keep]))
+            self.dropped_hard += n_hard - kept_hard
+            self.dropped_soft += len(lines) - n_hard - (len(keep) - kept_hard)
+            lines, masks = np.asarray(lines)[keep], np.asarray(masks)[keep]
+            hard, data = np.asarray(hard)[keep], np.asarray(data)[keep]
+            if len(lines) == 0:
+                return
+        n_hard = int(np.count_nonzero(hard))
+        self.n_hard += n_hard
+        self.n_soft += len(lines) - n_hard
+        self.version += 1
+        self._chunks.append((
+            np.asarray(lines, dtype=np.int64),
+            np.asarray(masks, dtype=np.uint64),
+            np.asarray(hard, dtype=bool),
+            np.asarray(data, dtype=object)
+        ))
+
+    def arrays(self):
+        """Returns the line, mask, hard and data arrays of every failure"""
+        if len(self._chunks) == 0:
+            return (
+                np.empty(0, dtype=np.int64), np.empty(0, dtype=np.uint64),
+                np.empty(0, dtype=bool), np.empty(0, dtype=object)
+            )
+        if len(self._chunks) > 1:
+            self._chunks = [
+                tuple(np.concatenate(arrs) for arrs in zip(*self._chunks))
+            ]
+        return self._chunks[0]
+
+    def sort(self):
+        """Puts the failures in order of their line numbers"""
+        lines, masks, hard, data = self.arrays()
+        order = np.argsort(lines, kind='stable')
+        self._chunks = [(lines[order], masks[order], hard[order], data[order])]
+        self.version += 1
+
+    def reasons(self, mask):
+        """Returns the `Parameter`s that are flagged in a line's bitmask"""
+        mask = int(mask)
+        return [p for i, p in enumerate(self.params) if mask >> i & 1]
+
+    def failure(self, line, mask, data):
+        """Creates the `Failure` for a single line in the store"""
+        why = self.reasons(mask)
+        f = Failure(line=int(line), why=why[0], data=data)
+        for param in why[1:]:
+            f.why = param
+        return f
+
+
+class FailureView:
+    """A lazy, read only sequence of the `Failure`s in a `FailureStore`
+
+    :param store: (`FailureStore`) The store to view
+    :param hard: (boolean, default None) If True only hard failures are
+        viewed, if False only soft failures, and if None all of them
+    """
+    def __init__(self, store, hard=None):
+        self.store = store
+        self.hard = hard
+        self._cached = None
+
+    def __repr__(self):
+        return f"<FailureView: {len(self)} failures>"
+
+    def __len__(self):
+        if self.hard is None:
+            return len(self.store)
+        return self.store.n_hard if self.hard else self.store.n_soft
+
+    def _arrays(self):
+        """Returns the store's arrays and the positions in them being viewed
+
+        Both are kept until the store changes, so that indexing the view
+        in a loop does not look for the positions every time.
+        """
+        if self._cached is None or self._cached[0] != self.store.version:
+            lines, masks, hard, data = self.store.arrays()
+            if self.hard is None:
+                positions = np.arange(len(lines))
+            else:
+                positions = np.flatnonzero(hard == self.hard)
+            self._cached = (self.store.version, lines, masks, data, positions)
+        return self._cached[1:]
+
+    def __iter__(self):
+        lines, masks, data, positions = self._arrays()
+        for i in positions:
+            yield self.store.failure(lines[i], masks[i], data[i])
+
+    def __getitem__(self, i):
+        lines, masks, data, positions = self._arrays()
+        if isinstance(i, slice):
+            return [
+                self.store.failure(lines[j], masks[j], data[j])
+                for j in positions[i]
+            ]
+        i = positions[i]
+        return self.store.failure(lines[i], masks[i], data[i])
+
+
 class MemExpectation():
     """An expectation that a column of data is expected to conform to
 
@@ -63,12 +457,40 @@ class MemExpectation():
         which reflect an expectation of what the data is to conform to
     """
     def  __init__(self, col, parameters, required=True):
+        self._apply_plan(compile_expectation(col, parameters, required))
+
+    @classmethod
+    def from_plan(cls, plan):
+        """Makes an expectation from an already compiled expectation
+
+        Nothing is validated or compiled again, and the parameters are shared
+        with `plan`.
+
+        :param plan: (`memsynth.plan.CompiledExpectation`)
+        :return: (`MemExpectation`)
+        """
+        exp = cls.__new__(cls)
+        exp._apply_plan(plan)
+        return exp
+
+    def _apply_plan(self, plan):
         self.logger = logging.getLogger(type(self).__name__)
-        self.col = col
-        self.parameters = set()
-        self._fails = []
-        self.required = required
-        self._form_parameters(parameters)
+        self.plan = plan
+        self.col = plan.col
+        self.required = plan.required
+        self.parameters = plan.parameters
+        for param_name, param in plan.params:
+            setattr(self, param_name, param)
+        self._param_list = plan.param_list
+        self._soft_bits = np.uint64(plan.soft_bits)
+        # Resolved once here rather than by name every time a column is checked
+        self._checks = tuple(
+            getattr(self, f"_check_{param_name}_vectorized")
+            for param_name in plan.checks
+        )
+        self._fails = FailureStore(self._param_list)
+        self._views = {}
+        self.is_an_expectation = True
 
     def __repr__(self):
         return f"<MemExpectation: {self.col} - Fails: {len(self.fails)} " \
@@ -76,7 +498,7 @@ class MemExpectation():
 
     @property
     def fails(self):
-        return [fail for fail in self._fails if not fail.is_soft]
+        return self._view(hard=True)
 
     @fails.setter
     def fails(self, x):
@@ -84,51 +506,29 @@ class MemExpectation():
 
     @property
     def soft_fails(self):
-        return [fail for fail in self._fails if fail.is_soft]
+        return self._view(hard=False)
 
     @soft_fails.setter
     def soft_fails(self, x):
         self.logger.warning(f"Attempting to add {x} to soft_fails property.")
 
+    def _view(self, hard):
+        # The view is reused while the store is, since it caches positions
+        view = self._views.get(hard)
+        if view is None or view.store is not self._fails:
+            view = self._views[hard] = FailureView(self._fails, hard=hard)
+        return view
+
     def is_hard_failure(self):
-        return len(self.fails) > 0
+        return self._fails.total_hard > 0
 
     def is_soft_failure(self):
-        return len(self.soft_fails) > 0 and not self.is_hard_failure()
-
-    def _form_parameters(self, params):
-        for param in params:
-            param_name = param.get('name')
-            self.logger.debug(f"Forming parameter '{param_name}'...")
-            if param_name not in ACCEPTABLE_PARAMS:
-                raise ex.MemExpectationFormationError(
-                    self.col, f"{param_name} is not a recognized col. "
-                    f"These are {ACCEPTABLE_PARAMS}"
-                )
-            self.parameters.add(param_name)
-            if param_name == 'regex':
-                self.logger.debug(f"Compiling regular expression '{param['value']}'")
-                param['value'] = re.compile(param['value'])
-            if hasattr(self, param_name):
-                if param.get('unique'):
-                    raise ex.MemExpectationFormationError(
-                        self.col,
-                        f"has multiple '{param_name}' unique parameters"
-                    )
-                else:
-                    getattr(self, param_name).append(Parameter(**param))
-            else:
-                if param_name in UNIQUE_PARAMS:
-                    self.logger.debug(f"Setting unique parameter '{param_name}'")
-                    setattr(self, param_name, Parameter(**param))
-                else:
-                    self.logger.debug(f"Setting parameter '{param_name}'")
-                    setattr(self, param_name, [Parameter(**param)])
-        if not self.parameters:
-            raise ex.MemExpectationFormationError(
-                self.col, "There is no data_type for column"
-            )
-        self.is_an_expectation = True
+        return self._fails.total_soft > 0 and not self.is_hard_failure()
+
+    @property
+    def related_columns(self):
+        """(list of str) Other columns that `relative_to` parameters refer to"""
+        return list(self.plan.related_columns)
 
     def _check_regex(self, data, i):
         if pd.isnull(data):
@@ -137,82 +537,284 @@ class MemExpectation():
             # For some reason Pandas delivers items from Object Series based on
             # assumed type, not as strings. Therefore, '4' is an integer.
             # We need to make sure we are working on strings
-            data = str(data)
-            for rx in getattr(self, 'regex'):
-                flags = 0 if not 'args' in rx else rx.args.get('flags', 0)
-                if rx.args and 'match' in rx.args:
-                    if rx.args['match'].lower() == "full":
-                        yield rx.value.fullmatch(data, flags) is not None, rx
-                    elif rx.args['match'].lower() == 'us_states':
-                        # re flag for IGNORECASE == 2
-                        yield uss_regex.fullmatch(data) is not None, rx
-                    else:
-                        yield rx.value.match(data, flags) is not None, rx
-                else:
-                    yield rx.value.match(data, flags) is not None, rx
+            data = [str(data)]
+            for rx, matcher in zip(getattr(self, 'regex'), self.plan.matchers):
+                yield bool(_matches(matcher, data)[0]), rx
 
     def _check_nullable(self, data, i):
         if not self.nullable.value:
             yield not pd.isnull(data), getattr(self, 'nullable')
 
-    def clear(self):
+    def clear(self, max_failures=None):
+        """Forgets the failures found so far
+
+        :param max_failures: (int, default None) Most failures to keep from
+            now on, see `FailureStore`
+        """
         if len(self._fails) > 0:
             self.logger.info("Clearing failures")
-        self._fails = []
+        self._fails = FailureStore(self._param_list, max_failures)
+
+    def _check_regex_vectorized(self, data, nulls, frame=None):
+        """Vectorized version of `_check_regex` run on a whole column at once
+
+        :param data: (`pd.Series`) Column of data with a positional index
+        :param nulls: (`np.ndarray` of bool) True where a cell of `data` is null
+        :param frame: (`pd.DataFrame`, default None) Unused
+        :return: yields a tuple of a boolean mask, which is True where a cell
+            passes, and the regex `Parameter` that was checked
+        """
+        # Null cells always pass the regex check (see `_check_regex`). Each
+        # distinct value is matched once, or taken from the `MatchCache` if
+        # it has been seen before, and the result spread to its rows. The
+        # categories of a categorical column are already its distinct values.
+        if isinstance(data.dtype, pd.CategoricalDtype):
+            codes = data.cat.codes.to_numpy()[~nulls]
+            uniques = data.cat.categories
+        else:
+            codes, uniques = pd.factorize(data[~nulls])
+        strs = [str(value) for value in uniques]
+        for rx, matcher in zip(getattr(self, 'regex'), self.plan.matchers):
+            passed = np.ones(len(data), dtype=bool)
+            if len(strs) > 0:
+                passed[~nulls] = match_cache(matcher).matches(matcher, strs)[codes]
+            yield passed, rx
+
+    def _check_nullable_vectorized(self, data, nulls, frame=None):
+        """Vectorized version of `_check_nullable` run on a whole column at once
+
+        :param data: (`pd.Series`) Column of data with a positional index
+        :param nulls: (`np.ndarray` of bool) True where a cell of `data` is null
+        :param frame: (`pd.DataFrame`, default None) Unused
+        :return: yields a tuple of a boolean mask, which is True where a cell
+            passes, and the nullable `Parameter`
+        """
+        if not self.nullable.value:
+            yield ~nulls, getattr(self, 'nullable')
 
-    def check(self, data):
+    def _check_relative_to_vectorized(self, data, nulls, frame=None):
+        """Checks the column against other columns of the membership list
+
+        Comparisons pass when either cell is null, leaving nulls to the
+        nullable parameter. Requirements fail when this column is null while
+        the other column is True (or False).
+
+        :param data: (`pd.Series`) Column of data with a positional index
+        :param nulls: (`np.ndarray` of bool) True where a cell of `data` is null
+        :param frame: (`pd.DataFrame`, default None) The other columns, with
+            the same positional index as `data`
+        :return: yields a tuple of a boolean mask, which is True where a cell
+            passes, and the relative_to `Parameter` that was checked
+        """
+        missing = [
+            other for other in self.related_columns
+            if frame is None or other not in frame.columns
+        ]
+        if missing:
+            self.logger.warning(
+                f"Skipping relative_to on '{self.col}' since the columns "
+                f"{missing} are not available"
+            )
+            return
+        for param in getattr(self, 'relative_to'):
+            passed = np.ones(len(data), dtype=bool)
+            for other, relation in param.value.items():
+                other_data = frame[other]
+                if relation in RELATIVE_REQUIREMENTS:
+                    required = other_data.eq(RELATIVE_REQUIREMENTS[relation])
+                    passed &= ~(required.to_numpy(dtype=bool, na_value=False) & nulls)
+                else:
+                    compare = RELATIVE_COMPARISONS[relation]
+                    either_null = nulls | other_data.isnull().to_numpy(dtype=bool)
+                    result = np.zeros(len(data), dtype=bool)
+                    result[~either_null] = compare(
+                        _category_values(other_data[~either_null]),
+                        _category_values(data[~either_null])
+                    ).to_numpy(dtype=bool)
+                    passed &= either_null | result
+            yield passed, param
+
+    def _log_failures(self, lines, masks, cells):
+        """Logs the failures found on the column in one batch
+
+        Emits one error for the lines with hard failures and one warning for
+        the lines with soft failures, each detailing no more than
+        `LOG_FAILURE_SAMPLE` lines. Nothing is formatted unless the level is
+        being logged. `MemSynther.report_failures` reports every failure.
+        """
+        for level, kind, bits in (
+            (logging.ERROR, "hard", ~self._soft_bits),
+            (logging.WARNING, "soft", self._soft_bits)
+        ):
+            if not self.logger.isEnabledFor(level):
+                continue
+            flagged = np.flatnonzero(masks & bits)
+            if len(flagged) == 0:
+                continue
+            details = "; ".join(
+                f"line {lines[i]} failed "
+                f"{[p.name for p in self._fails.reasons(masks[i] & bits)]} "
+                f"on '{cells[i]}'"
+                for i in flagged[:LOG_FAILURE_SAMPLE]
+            )
+            more = len(flagged) - LOG_FAILURE_SAMPLE
+            self.logger.log(
+                level, "Found %d lines with %s failures on column '%s': %s%s",
+                len(flagged), kind, self.col, details,
+                f"; and {more} more" if more > 0 else ""
+            )
+
+    def check(self, data, offset=0, clear=True, lines=None, frame=None,
+              instrumentation=NULL_INSTRUMENTATION, quiet=False,
+              fail_fast=False, max_failures=None):
         """Checks to see if the condition of the expectation are met
 
+        Each parameter is evaluated against the whole column at once, and
+        `Failure` objects are only created for the lines that do not pass.
+
         :param data: (`pd.Series`) Data to check parameters against
+        :param offset: (int, default 0) Line number of the first cell in
+            `data`, used when `data` is one chunk of a larger membership list
+        :param clear: (boolean, default True) If False, failures found are
+            added to the ones already recorded instead of replacing them
+        :param lines: (array of int, default None) Line number of every cell
+            in `data`, for when `data` is not a contiguous part of the
+            membership list. Takes the place of `offset`.
+        :param frame: (`pd.DataFrame`, default None) Rows of the membership
+            list that `data` comes from, which `relative_to` parameters
+            compare against. Without it, `relative_to` is skipped.
+        :param instrumentation: (`Instrumentation`) Records the time taken to
+            check the column and each parameter, and the failures found
+        :param quiet: (boolean, default False) If True, the failures found
+            are not logged
+        :param fail_fast: (boolean, default False) If True, no more
+            parameters are checked once one has a hard failure
+        :param max_failures: (int, default None) If given, no more than this
+            many failures are kept on the column. The rest are still counted.
 
         :return: (boolean)
         """
-        self.logger.info(f"Checking column '{self.col}'...")
-        self.clear()
-        parameters = set(ACCEPTABLE_PARAMS).intersection(self.parameters)
-        for i, cell in enumerate(data):
-            f = None
-            for param_name in parameters:
-                checkfn_str = "_check_" + param_name
-                if hasattr(self, checkfn_str):
-                    self.logger.debug(f"Running '{checkfn_str}' on '{data}'")
-                    # Some check functions will yield multiple checks (eg. _check_regex)
-                    for check, param in getattr(self, checkfn_str)(cell, i):
-                        self.logger.debug(f"On line '{i}' cell={cell}, check={check}")
-                        try:
-                            # If None, then another thing failed in the
-                            # check (eg. nullable)
-                            if check is None:
-                                continue
-                            else:
-                                assert check
-                        except AssertionError:
-                            if not f:
-                                f = Failure(line=i, why=param, data=cell)
-                                self._fails.append(f)
-                            else:
-                                f.why = param
-                            fmsg = f"Found a failure on line '{i}' running '{param}' on '{cell}'"
-                            if param.soft:
-                                self.logger.warning(fmsg)
-                            else:
-                                self.logger.error(fmsg)
-                        except:
-                            raise
+        self.logger.info("Checking column '%s'...", self.col)
+        if clear:
+            self.clear(max_failures)
+        elif max_failures is not None:
+            self._fails.max_failures = max_failures
+        if isinstance(data, pd.Series):
+            data = data.reset_index(drop=True)
+        else:
+            data = pd.Series(data, dtype=object)
+        nulls = data.isnull().to_numpy(dtype=bool)
+        if frame is not None:
+            frame = frame.reset_index(drop=True)
+
+        with instrumentation.stage(f"check.{self.col}", rows=len(data)):
+            masks = np.zeros(len(data), dtype=np.uint64)
+            hard = np.zeros(len(data), dtype=bool)
+            timed = instrumentation.enabled
+            for checkfn in self._checks:
+                self.logger.debug("Running '%s' on '%s'", checkfn.__name__, self.col)
+                start = time.perf_counter() if timed else None
+                for passed, param in checkfn(data, nulls, frame):
+                    if timed:
+                        instrumentation.record(
+                            f"check.{self.col}.{param.name}",
+                            time.perf_counter() - start, len(data)
+                        )
+                    failed = ~passed
+                    masks[failed] |= np.uint64(1 << self._param_list.index(param))
+                    if not param.soft:
+                        hard |= failed
+                    if timed:
+                        start = time.perf_counter()
+                if fail_fast and hard.any():
+                    break
+
+            failing = np.flatnonzero(masks)
+            cells = data.take(failing).to_numpy(dtype=object)
+            if lines is None:
+                lines = failing + offset
+            else:
+                lines = np.asarray(lines, dtype=np.int64)[failing]
+            self._fails.append(lines, masks[failing], hard[failing], cells)
+            n_hard = int(np.count_nonzero(hard[failing]))
+            instrumentation.count(f"failures.{self.col}.hard", n_hard)
+            instrumentation.count(f"failures.{self.col}.soft", len(failing) - n_hard)
+            if not quiet:
+                self._log_failures(lines, masks[failing], cells)
         return len(self._fails) == 0
 
 
+class CheckSnapshot:
+    """What a checked membership list looked like, for incremental checks
+
+    Holds a hash of every row keyed on `MEMBER_ID`, and the failures found on
+    each column keyed on `MEMBER_ID` rather than line number, so that the
+    failures of unchanged rows can be carried over to a newer membership list.
+
+    :param hashes: (`pd.Series`) Row hashes indexed by `MEMBER_ID`
+    :param failures: (dict) Maps each column to a tuple of `MEMBER_ID`,
+        parameter mask, hard flag and data arrays, like `FailureStore.arrays`
+    :param expectations_json: (str) The JSON the expectations were loaded from
+    """
+    def __init__(self, hashes, failures, expectations_json=None):
+        self.hashes = hashes
+        self.failures = failures
+        self.expectations_json = expectations_json
+
+    def __repr__(self):
+        return f"<CheckSnapshot: {len(self.hashes)} rows>"
+
+    def save(self, fname):
+        """Saves the snapshot to a file, to be loaded by `CheckSnapshot.load`"""
+        with open(fname, 'wb') as f:
+            pickle.dump(self, f)
+
+    @classmethod
+    def load(cls, fname):
+        """Loads a snapshot saved by `CheckSnapshot.save`"""
+        with open(fname, 'rb') as f:
+            return pickle.load(f)
+
+
 class MemSynther():
     """Core class of the MemSynth program.
 
     This class manages membership list files, coordinates with local and
     remote databases, and API's
+
+    :param name: (str, default None) Name of the membership list
+    :param instrumentation: (`memsynth.instrumentation.Instrumentation`,
+        default None) Records the timing of each stage of a run and the
+        failures found. If None, nothing is recorded.
+    :param quiet: (boolean, default False) If True, failures are not logged
+        as they are found, only by `report_failures`
     """
-    def __init__(self, name=None):
+    EXECUTORS = {
+        "thread": ThreadPoolExecutor,
+        "process": ProcessPoolExecutor,
+    }
+    # Loading method for each extension of membership file
+    LOADERS = {
+        ".xlsx": "load_from_excel",
+        ".xlsm": "load_from_excel",
+        ".xls": "load_from_excel",
+        ".csv": "load_from_csv",
+        ".parquet": "load_from_parquet",
+    }
+
+    def __init__(self, name=None, instrumentation=None, quiet=False):
         self.logger = logging.getLogger(type(self).__name__)
+        self.quiet = quiet
+        self.instrumentation = NULL_INSTRUMENTATION \
+            if instrumentation is None else instrumentation
         self.df = None
         self.name = name if name else f'object at {hex(id(self))}'
         self.expectations = {}
+        self.expectations_json = None
+        self.plan = None
+        self.conversion_failures = {}
+        # Columns a fail-fast check stopped before checking
+        self.skipped_columns = []
 
     def __repr__(self):
         name_field = f'- {self.name}'
@@ -259,27 +861,31 @@ class MemSynther():
     def load_expectations_from_json(self, fname):
         """Loads expectations from a JSON file
 
+        The expectations are compiled into an `ExpectationPlan` once per
+        process, and the plan is shared with every other `MemSynther` loading
+        the same JSON.
+
         :param fname: JSON file containing expectations
         :raises: `MemExpectationFormationError` if the JSON file is
             misconfigured
         :raises: `FileNotFoundError` if file is not found
         :return: None
         """
-        with open(fname, 'r') as f:
-            self.expectations = json.load(f)
-            acceptable_columns = self.expectations.keys()
-            #found_cols = self._acceptable_columns.copy()
-            for col, exps in self.expectations.items():
-                if col not in acceptable_columns:
-                    raise ex.MemExpectationFormationError(
-                        col, "is not a valid column."
-                    )
-                else:
-                    self.expectations[col] = MemExpectation(
-                        col, exps["parameters"], exps["required"]
-                    )
-            #       found_cols.remove(col)
-            # TODO: Might want to add a warning if a column has no expectations
+        self.load_expectations_from_plan(load_plan(fname))
+        # TODO: Might want to add a warning if a column has no expectations
+
+    def load_expectations_from_plan(self, plan):
+        """Loads expectations from an already compiled plan
+
+        :param plan: (`memsynth.plan.ExpectationPlan`)
+        :return: None
+        """
+        self.plan = plan
+        self.expectations_json = plan.expectations_json
+        self.expectations = {
+            col: MemExpectation.from_plan(compiled)
+            for col, compiled in plan.items()
+        }
 
     def _verify_memlist_format(self, df=None, softload=False):
         """Checks the format of the membership list
@@ -300,50 +906,54 @@ class MemSynther():
         self.logger.debug(f"Verifying memlist format on {self.name}")
         if df is None:
             df = self.df
-        expected_cols, not_required = set([]), set([])
-        for k, v in self.expectations.items():
-            if v.required:
-                expected_cols.add(k)
-            else:
-                not_required.add(k)
-        actual_cols = set(df.columns).difference(not_required)
-        if expected_cols != actual_cols:
-            if expected_cols.difference(actual_cols) == expected_cols:
-                raise ex.LoadMembershipListException(
-                    self,
-                    msg="None of the columns match. Are you sure this is a "
-                        "membership file?"
-                )
-            elif expected_cols.intersection(actual_cols) == expected_cols:
-                if not softload:
-                    raise ex.LoadMembershipListException(
-                        self,
-                        msg=f"The membership list appears to have added new "
-                        f"columns that need to be added. These columns are the"
-                        f" following {actual_cols.difference(expected_cols)}"
-                    )
+        with self.instrumentation.stage("verify", rows=len(df)):
+            expected_cols, not_required = set([]), set([])
+            for k, v in self.expectations.items():
+                if v.required:
+                    expected_cols.add(k)
                 else:
-                    return df
-            else:
-                if actual_cols.difference(expected_cols) == set():
+                    not_required.add(k)
+            actual_cols = set(df.columns).difference(not_required)
+            if expected_cols != actual_cols:
+                if expected_cols.difference(actual_cols) == expected_cols:
                     raise ex.LoadMembershipListException(
                         self,
-                        msg=f"The membership list appears to be missing the "
-                        f"following columns '{expected_cols.difference(actual_cols)}'"
+                        msg="None of the columns match. Are you sure this is a "
+                            "membership file?"
                     )
+                elif expected_cols.intersection(actual_cols) == expected_cols:
+                    if not softload:
+                        raise ex.LoadMembershipListException(
+                            self,
+                            msg=f"The membership list appears to have added new "
+                            f"columns that need to be added. These columns are the"
+                            f" following {actual_cols.difference(expected_cols)}"
+                        )
+                    else:
+                        return df
                 else:
-                    raise ex.LoadMembershipListException(
-                        self,
-                        msg=f"The membership list appears to be missing the "
-                        f"following columns '{expected_cols.difference(actual_cols)}'"
-                        f" and the membership list appears to have added new columns "
-                        f"that need to be added. These columns are the following "
-                        f"{actual_cols.difference(expected_cols)}"
-                    )
-        else:
-            return df
+                    if actual_cols.difference(expected_cols) == set():
+                        raise ex.LoadMembershipListException(
+                            self,
+                            msg=f"The membership list appears to be missing the "
+                            f"following columns '{expected_cols.difference(actual_cols)}'"
+                        )
+                    else:
+                        raise ex.LoadMembershipListException(
+                            self,
+                            msg=f"The membership list appears to be missing the "
+                            f"following columns '{expected_cols.difference(actual_cols)}'"
+                            f" and the membership list appears to have added new columns "
+                            f"that need to be added. These columns are the following "
+                            f"{actual_cols.difference(expected_cols)}"
+                        )
+            else:
+                return df
 
-    def check_membership_list_on_parameters(self, verify_format=False, strict=True):
+    def check_membership_list_on_parameters(self, verify_format=False,
+                                            strict=True, workers=None,
+                                            executor="thread", fail_fast=False,
+                                            max_failures_per_column=None):
         """Checks the data of a loaded membership list to verify integrity
 
         Checks the data in the membership dataframe against the configuration
@@ -353,6 +963,21 @@ class MemSynther():
             `_verify_memlist_format` before anything else in this method
         :param strict: (boolean, default True) Considers soft failures to be
             failures if True, ignores them if they are soft.
+        :param workers: (int, default None) If given, the columns are checked
+            concurrently by this many workers. If None, the columns are
+            checked one after another.
+        :param executor: (str, default "thread") Either "thread" or "process",
+            chooses the kind of pool `workers` run in. Process workers read
+            their columns from a `SharedRoster` instead of being sent them.
+        :param fail_fast: (boolean, default False) If True, checking stops at
+            the first hard failure. Columns are checked in the order of their
+            `CheckHistory`, most likely to fail first, and one block of
+            `CHUNK_SIZE` rows at a time. Columns left unchecked are listed in
+            `skipped_columns` and have no failures.
+        :param max_failures_per_column: (int, default None) If given, no more
+            than this many failures are kept on each column. The rest are
+            still counted, see `FailureStore`.
+        :raises: `ValueError` if `executor` is not a known kind of pool
         :return: (boolean) True, if there are no columns with failures. Will
             return False if one of the `MemExpectation` classes encounters a
             failure.
@@ -360,15 +985,160 @@ class MemSynther():
         if verify_format:
             self._verify_memlist_format(self.df)
 
+        if workers is None:
+            skipped = self._check_columns(
+                self.df, fail_fast=fail_fast, max_failures=max_failures_per_column
+            )
+        else:
+            if executor not in self.EXECUTORS:
+                raise ValueError(
+                    f"Unknown executor '{executor}', expected one of "
+                    f"{tuple(self.EXECUTORS)}"
+                )
+            self.logger.debug(
+                f"Checking columns with {workers} {executor} workers"
+            )
+            skipped = self._check_columns_in_pool(
+                workers, executor, fail_fast, max_failures_per_column
+            )
+        for col in skipped:
+            self.expectations[col].clear(max_failures_per_column)
+        self._skip(skipped)
+        return self._summarize_checks(strict)
+
+    def _check_columns(self, df, offset=0, clear=True, fail_fast=False,
+                       max_failures=None):
+        """Checks the columns of `df` one after another
+
+        :param df: (`pandas.DataFrame`) The membership list, or a chunk of it
+        :param offset: (int, default 0) Line number of the first row of `df`
+        :param clear: (boolean, default True) If False, failures found are
+            added to the ones already recorded
+        :param fail_fast: (boolean, default False) See
+            `check_membership_list_on_parameters`
+        :param max_failures: (int, default None) Most failures kept per column
+        :return: (list of str) Columns skipped after a hard failure
+        """
+        history = check_history(self.plan)
+        cols = history.order(self.expectations) if fail_fast \
+            else list(self.expectations)
+        for i, col in enumerate(cols):
+            exp = self.expectations[col]
+            start = time.perf_counter()
+            if fail_fast:
+                rows = self._check_in_blocks(exp, df, offset, clear, max_failures)
+            else:
+                exp.check(
+                    df[col], offset=offset, clear=clear, frame=df,
+                    instrumentation=self.instrumentation, quiet=self.quiet,
+                    max_failures=max_failures
+                )
+                rows = len(df)
+            history.record(
+                col, exp.is_hard_failure(), time.perf_counter() - start, rows
+            )
+            if fail_fast and exp.is_hard_failure():
+                return cols[i + 1:]
+        return []
+
+    def _check_in_blocks(self, exp, df, offset=0, clear=True, max_failures=None):
+        """Checks a column `CHUNK_SIZE` rows at a time until a hard failure
+
+        :return: (int) The number of rows checked
+        """
+        if clear:
+            exp.clear(max_failures)
+        data, frame = df[exp.col], self._related_frame(exp, df)
+        checked = 0
+        for start in range(0, len(df), CHUNK_SIZE):
+            stop = start + CHUNK_SIZE
+            exp.check(
+                data.iloc[start:stop], offset=offset + start, clear=False,
+                frame=frame.iloc[start:stop],
+                instrumentation=self.instrumentation, quiet=self.quiet,
+                fail_fast=True, max_failures=max_failures
+            )
+            checked = min(stop, len(df))
+            if exp.is_hard_failure():
+                break
+        return checked
+
+    def _check_columns_in_pool(self, workers, executor, fail_fast=False,
+                               max_failures=None):
+        """Checks the columns of `df` concurrently
+
+        With `fail_fast`, columns are submitted most likely to fail first,
+        and the ones not yet started when a hard failure comes back are
+        cancelled.
+
+        :return: (list of str) Columns skipped after a hard failure
+        """
+        instrumented = self.instrumentation.enabled
+        history = check_history(self.plan)
+        cols = history.order(self.expectations) if fail_fast \
+            else list(self.expectations)
+        skipped, stop = [], False
+        roster = self.share() if executor == "process" else None
+        try:
+            with self.EXECUTORS[executor](max_workers=workers) as pool:
+                futures = {
+                    col: pool.submit(
+                        _check_shared_expectation, exp, roster, instrumented,
+                        self.quiet, fail_fast, max_failures
+                    ) if roster is not None else pool.submit(
+                        _check_expectation, exp, self.df[col],
+                        self._related_frame(exp), instrumented, self.quiet,
+                        fail_fast, max_failures
+                    )
+                    for col, exp in ((col, self.expectations[col]) for col in cols)
+                }
+                for col, future in futures.items():
+                    if stop:
+                        future.cancel()
+                        skipped.append(col)
+                        continue
+                    # Process workers check a copy, so bring the failures home
+                    exp = self.expectations[col]
+                    exp._fails, report, seconds = future.result()
+                    if report is not None:
+                        self.instrumentation.merge(report)
+                    history.record(col, exp.is_hard_failure(), seconds, len(self.df))
+                    stop = fail_fast and exp.is_hard_failure()
+        finally:
+            if roster is not None:
+                roster.close()
+        return skipped
+
+    def _skip(self, skipped):
+        """Records the columns left unchecked by a fail-fast check"""
+        self.skipped_columns = list(skipped)
+        if skipped:
+            self.logger.info(
+                f"Stopped at the first hard failure, skipping {skipped}"
+            )
+
+    def _related_frame(self, expectation, df=None):
+        """The columns of `df` that an expectation's `relative_to` refers to"""
+        df = self.df if df is None else df
+        return df[[
+            col for col in expectation.related_columns if col in df.columns
+        ]]
+
+    def _summarize_checks(self, strict=True):
+        """Logs and returns the overall result of the expectations' checks
+
+        :param strict: (boolean, default True) Considers soft failures to be
+            failures if True, ignores them if they are soft.
+        :return: (boolean) True, if there are no columns with failures
+        """
         hardFailEncountered = False
         softFailEncountered = False
 
         for col, exp in self.expectations.items():
-            if not exp.check(self.df[col]):
-                if exp.is_hard_failure():
-                    hardFailEncountered = True
-                elif exp.is_soft_failure() and not hardFailEncountered:
-                    softFailEncountered = True
+            if exp.is_hard_failure():
+                hardFailEncountered = True
+            elif exp.is_soft_failure() and not hardFailEncountered:
+                softFailEncountered = True
         if hardFailEncountered:
             self.logger.error(
                 f"Check on membership list '{self.name}' has encountered failures"
@@ -385,64 +1155,535 @@ class MemSynther():
             )
             return True
 
+    def snapshot(self):
+        """Takes a `CheckSnapshot` of the checked membership list
 
-    def _load(self, df, softload=False):
-        df = self._verify_memlist_format(df, softload)
-        if hasattr(self, "expectations") and len(self.expectations.keys()) != 0:
-            for col, expectation in self.expectations.items():
-                dtype = expectation.data_type.value
-                if dtype.lower() in DATATYPE_MAP:
-                    dtype = DATATYPE_MAP[dtype.lower()]
-                # The following is very hacky, but nececessary for how Pandas
-                # (and ultimately Numpy) handle null values in Integer series
-                # More here: https://pandas.pydata.org/pandas-docs/version/0.24/whatsnew/v0.24.0.html#optional-integer-na-support
-                series_should_be_int = dtype.lower().startswith("int")
-                series_is_not_an_int = not hasattr(df[col].dtype, 'is_unsigned_integer')
-                if expectation.nullable and \
-                        (series_should_be_int  and series_is_not_an_int):
-                    df[col] = self._convert_npobject_series_with_nulls_to_int(df[col], dtype)
-                else:
-                    df[col] = df[col].astype(dtype, inplace=True)
-        return df
+        :return: (`CheckSnapshot`)
+        """
+        ids = self.df[MEMBER_ID].to_numpy()
+        failures = {}
+        for col, exp in self.expectations.items():
+            lines, masks, hard, data = exp._fails.arrays()
+            failures[col] = (ids[lines], masks, hard, data)
+        return CheckSnapshot(
+            hash_rows(self.df, MEMBER_ID), failures, self.expectations_json
+        )
 
-    def _convert_npobject_series_with_nulls_to_int(self, series, inttype="Int64"):
-        lst = [int(x) if not pd.isnull(x) else x for x in series.tolist()]
-        return pd.Series(lst, dtype=inttype.capitalize())
+    def check_membership_list_incrementally(self, previous, strict=True):
+        """Checks only the rows that changed since a previous check
 
-    def load_from_excel(self, flist, softload=False):
-        """Loads a membership list from an excel file
+        Rows are matched to the previous membership list on `MEMBER_ID` and
+        compared by a hash of the whole row. Rows that are new or have changed
+        are checked, while the failures of unchanged rows are carried over
+        from the previous check.
 
-        Function loads a membership list in xlsx format and runs a
-        verification function to make sure that the data in the file is
-        what the `MemSynther` is expecting.
+        :param previous: (`MemSynther` or `CheckSnapshot`) A previously checked
+            membership list, or a snapshot of one
+        :param strict: (boolean, default True) Considers soft failures to be
+            failures if True, ignores them if they are soft.
+        :return: (boolean) True, if there are no columns with failures
+        """
+        if isinstance(previous, MemSynther):
+            previous = previous.snapshot()
+        if previous.expectations_json != self.expectations_json:
+            self.logger.warning(
+                "Expectations have changed since the previous check, so "
+                "checking the whole membership list"
+            )
+            return self.check_membership_list_on_parameters(strict=strict)
 
-        :param flist: File name of the excel file with membership data
+        hashes = hash_rows(self.df, MEMBER_ID)
+        prev_hashes = previous.hashes[~previous.hashes.index.duplicated(keep=False)]
+        prev = prev_hashes.index.get_indexer(hashes.index)
+        unchanged = (prev >= 0) & ~hashes.index.duplicated(keep=False) & \
+            (prev_hashes.to_numpy()[prev] == hashes.to_numpy())
+        changed = np.flatnonzero(~unchanged)
+        unchanged_lines = np.flatnonzero(unchanged)
+        unchanged_ids = hashes.index[unchanged]
+        self.logger.info(
+            f"Checking {len(changed)} of {len(self.df)} rows of membership "
+            f"list '{self.name}' that are new or have changed"
+        )
+
+        for col, exp in self.expectations.items():
+            exp.clear()
+            ids, masks, hard, data = previous.failures[col]
+            # Carry over the failures of unchanged rows to their new lines
+            found = unchanged_ids.get_indexer(ids)
+            kept = found >= 0
+            exp._fails.append(
+                unchanged_lines[found[kept]], masks[kept], hard[kept], data[kept]
+            )
+            exp.check(
+                self.df[col].take(changed), clear=False, lines=changed,
+                frame=self._related_frame(exp).take(changed),
+                instrumentation=self.instrumentation, quiet=self.quiet
+            )
+            exp._fails.sort()
+        return self._summarize_checks(strict)
+
+    def diff(self, previous):
+        """Compares the membership list to a previous membership list
+
+        :param previous: (`MemSynther` or `pandas.DataFrame`) The previous
+            membership list
+        :return: (`memsynth.diff.RosterDiff`) The members added to, removed
+            from, and changed in this membership list since `previous`
+        """
+        if isinstance(previous, MemSynther):
+            previous = previous.df
+        return diff_rosters(previous, self.df, MEMBER_ID)
+
+    def find_duplicates(self, threshold=DUPLICATE_THRESHOLD):
+        """Finds members who appear more than once in the membership list
+
+        :param threshold: (float, default `DUPLICATE_THRESHOLD`) Lowest
+            similarity score, from 0 to 1, for two rows to be duplicates
+        :return: (`memsynth.dedupe.DuplicateReport`) The pairs of likely
+            duplicates, and the groups they cluster into
+        """
+        with self.instrumentation.stage("dedupe", rows=len(self.df)):
+            return find_duplicates(self.df, threshold, MEMBER_ID)
+
+    def _load(self, df, softload=False):
+        """Verifies a membership list and converts its columns' dtypes
+
+        Every column with an expectation is converted to the dtype its
+        `data_type` calls for in one vectorized, index preserving step.
+        Integers are loaded as nullable 'Int64', or narrower if asked for,
+        and booleans as 'boolean' if the column has nulls. String columns
+        with few distinct values are loaded as categoricals (see
+        `_categorize`). Values that cannot be converted are made null rather
+        than raising, and are kept in `conversion_failures`.
+
+        :param df: (`pandas.DataFrame`) The membership list as read
         :param softload: (boolean, default False) If true, then
             `LoadMembershipListException` is not raised on extra columns
-        :raises: `memsynth.exceptions.LoadMembershipListException` if the
-            data does not meet expectations.
-        :return: None
+        :return: (`pandas.DataFrame`) The converted membership list
         """
+        df = self._verify_memlist_format(df, softload)
+        self.conversion_failures = {}
+        converted = {}
+        for col, expectation in self.expectations.items():
+            if col not in df.columns:
+                continue
+            original = df[col]
+            plan = expectation.plan
+            with self.instrumentation.stage(f"load.{col}", rows=len(df)):
+                series, failed = self._convert(original, plan.dtype, plan.downcast)
+                if plan.auto_category:
+                    series = self._categorize(series)
+            if series is not original:
+                converted[col] = series
+            if failed.any():
+                self.conversion_failures[col] = original[failed]
+                if not self.quiet:
+                    self.logger.warning(
+                        f"{int(failed.sum())} values on column '{col}' could "
+                        f"not be converted to '{expectation.plan.dtype}'"
+                    )
+        return df.assign(**converted) if converted else df
+
+    def _convert(self, series, dtype, downcast=False):
+        """Converts a column to a dtype without raising on bad values
+
+        :param series: (`pandas.Series`) The column as read
+        :param dtype: (str) Its dtype from `DATATYPE_MAP`
+        :param downcast: (boolean, default False) If True, integers are
+            converted to the narrowest of `INTEGER_WIDTHS` that holds them
+        :return: (tuple) The converted `pandas.Series`, which is `series`
+            itself if it needed no conversion, and a boolean `numpy.ndarray`
+            that is True where a value could not be converted
+        """
+        nulls = series.isna().to_numpy()
+        kind = dtype.lower()
+        if kind.startswith("int"):
+            return self._convert_int(series, _nullable_int(dtype), downcast, nulls)
+        if kind.startswith("datetime"):
+            if series.dtype == dtype:
+                return series, np.zeros(len(series), dtype=bool)
+            if pd.api.types.is_datetime64_any_dtype(series.dtype):
+                return series.astype(dtype), np.zeros(len(series), dtype=bool)
+            # Each distinct value is parsed on its own, since a list often
+            # mixes date formats and pandas would otherwise guess a single
+            # format from the first value
+            codes, uniques = pd.factorize(series)
+            parsed = pd.to_datetime(
+                pd.Series(uniques, dtype=object), errors="coerce", format="mixed"
+            ).astype(dtype).to_numpy()
+            # Code -1, for nulls, takes the NaT appended at the end
+            dates = pd.Series(
+                np.append(parsed, np.datetime64("NaT"))[codes],
+                index=series.index, name=series.name
+            )
+            failed = dates.isna().to_numpy() & ~nulls
+            return dates, failed
+        if kind in ("bool", "boolean"):
+            if pd.api.types.is_bool_dtype(series.dtype) and not nulls.any():
+                return series.astype("bool"), np.zeros(len(series), dtype=bool)
+            words = series.astype(str).str.strip().str.lower()
+            is_true = words.isin(
+                [w for w, v in BOOLEAN_VALUES.items() if v]
+            ).to_numpy()
+            is_false = words.isin(
+                [w for w, v in BOOLEAN_VALUES.items() if not v]
+            ).to_numpy()
+            failed = ~(is_true | is_false | nulls)
+            # Values that are not recognizably true or false are read the way
+            # Python reads them, but still reported
+            truthy = series.astype(object).mask(nulls, False).astype(bool)
+            values = is_true | (failed & truthy.to_numpy())
+            if nulls.any():
+                return pd.Series(
+                    pd.array(values, dtype="boolean"), index=series.index
+                ).mask(nulls), failed
+            return pd.Series(values, index=series.index), failed
+        if series.dtype == dtype:
+            return series, np.zeros(len(series), dtype=bool)
+        try:
+            return series.astype(dtype), np.zeros(len(series), dtype=bool)
+        except (TypeError, ValueError):
+            return series, ~nulls
+
+    @staticmethod
+    def _convert_int(series, target, downcast, nulls):
+        """Converts a column to a nullable integer dtype, see `_convert`"""
+        if pd.api.types.is_integer_dtype(series.dtype):
+            numbers, failed = series, np.zeros(len(series), dtype=bool)
+        else:
+            numbers = pd.to_numeric(series, errors="coerce")
+            if pd.api.types.is_bool_dtype(numbers.dtype):
+                numbers = numbers.astype("float64")
+            failed = (numbers.isna().to_numpy() | (numbers % 1 != 0).to_numpy()) \
+                & ~nulls
+        info = np.iinfo(target.lower())
+        out_of_range = ((numbers < info.min) | (numbers > info.max)) \
+            .to_numpy(dtype=bool, na_value=False)
+        if failed.any() or out_of_range.any():
+            failed = failed | out_of_range
+            numbers = numbers.where(~failed)
+        if downcast:
+            low, high = numbers.min(), numbers.max()
+            for width in INTEGER_WIDTHS[:INTEGER_WIDTHS.index(target) + 1]:
+                info = np.iinfo(width.lower())
+                if pd.isna(low) or (info.min <= low and high <= info.max):
+                    target = width
+                    break
+        if numbers is series and series.dtype == target:
+            return series, failed
+        return numbers.astype(target), failed
+
+    @staticmethod
+    def _categorize(series):
+        """Makes a string column categorical if it has few distinct values
+
+        A column of `CATEGORY_MIN_ROWS` or more rows with no more than
+        `CATEGORY_MAX_RATIO` distinct values per row is stored as codes
+        into its distinct values, rather than as a Python str per row.
+
+        :param series: (`pandas.Series`) An 'object' column
+        :return: (`pandas.Series`) A categorical column, or `series` itself
+        """
+        if len(series) < CATEGORY_MIN_ROWS or series.dtype != object:
+            return series
+        codes, uniques = pd.factorize(series)
+        if len(uniques) > CATEGORY_MAX_RATIO * len(series):
+            return series
+        return pd.Series(
+            pd.Categorical.from_codes(codes, categories=uniques),
+            index=series.index, name=series.name
+        )
+
+    def _name_from_file(self, flist):
+        """Names an unnamed `MemSynther` after the membership file it reads"""
         if self.name.startswith("object at"):
             nname = os.path.split(flist)[1]
             self.logger.debug(
                 f"Chaging name of MemSynther '{self.name}' to '{nname}'"
             )
             self.name = nname
+
+    def _read_hints(self, columns):
+        """Works out how pandas should parse columns to match the expectations
+
+        Reading columns straight into their target dtypes saves `_load` from
+        converting object columns afterwards. Booleans are left to `_load`,
+        since their values in the membership list are not consistent, and so
+        are integers, which are read as text so that a bad value is reported
+        in `conversion_failures` instead of failing the whole read.
+
+        :param columns: (iterable of str) Columns in the membership file
+        :return: (tuple) The columns to read that have expectations, a dict
+            of dtypes for those columns, and a list of columns to parse as dates
+        """
+        usecols = [col for col in columns if col in self.expectations]
+        dtypes, dates = {}, []
+        for col in usecols:
+            dtype = self.expectations[col].plan.dtype.lower()
+            if dtype.startswith("int"):
+                dtypes[col] = "object"
+            elif dtype in ("object", "category", "string"):
+                dtypes[col] = dtype
+            elif dtype.startswith("datetime"):
+                dates.append(col)
+        return usecols, dtypes, dates
+
+    def _load_file(self, flist, read, softload=False, cache=None):
+        """Loads a membership list from a file with a reading function
+
+        :param flist: File name of the membership file
+        :param read: (callable) Takes `flist` and returns a `pandas.DataFrame`
+        :param softload: (boolean, default False) If true, then
+            `LoadMembershipListException` is not raised on extra columns
+        :param cache: (`memsynth.cache.RosterCache`, default None) If given,
+            the loaded membership list is taken from, or stored in, the cache
+        :raises: `memsynth.exceptions.LoadMembershipListException` if the
+            data does not meet expectations.
+        :return: None
+        """
+        self._name_from_file(flist)
+        key = None
+        if cache is not None:
+            if self.expectations_json is None:
+                self.logger.warning(
+                    "Not caching membership list since the expectations "
+                    "were not loaded from JSON"
+                )
+            else:
+                key = cache.key(flist, self.expectations_json, softload)
+                entry = cache.get_entry(key)
+                if entry is not None:
+                    self.df, conversion_failures = entry
+                    if conversion_failures is None:
+                        self.logger.warning(
+                            f"Conversion failures of '{flist}' are not in "
+                            f"its cache entry"
+                        )
+                    self.conversion_failures = conversion_failures or {}
+                    return
         try:
-            self.df = self._load(pd.read_excel(flist), softload)
+            start = time.perf_counter()
+            df = read(flist)
+            self.instrumentation.record(
+                "read", time.perf_counter() - start, len(df)
+            )
+            self.df = self._load(df, softload)
+            if key is not None:
+                cache.put(key, self.df, self.conversion_failures)
         except ex.LoadMembershipListException as lmle:
-            print(f"Encountered a problem loading membership list {flist}")
+            print(
+                f"Encountered a problem loading membership list {flist}",
+                file=sys.stderr
+            )
             self.df = None
             raise lmle
         except:
             print(
                 f"Encountered an unkonwn problem loading "
-                f"membership list {flist}"
+                f"membership list {flist}", file=sys.stderr
             )
             self.df = None
             raise
 
+    def load_from_excel(self, flist, softload=False, cache=None):
+        """Loads a membership list from an excel file
+
+        Function loads a membership list in xlsx format and runs a
+        verification function to make sure that the data in the file is
+        what the `MemSynther` is expecting.
+
+        :param flist: File name of the excel file with membership data
+        :param softload: (boolean, default False) If true, then
+            `LoadMembershipListException` is not raised on extra columns
+        :param cache: (`memsynth.cache.RosterCache`, default None) If given,
+            an unchanged file is loaded from the cache instead of parsed
+        :raises: `memsynth.exceptions.LoadMembershipListException` if the
+            data does not meet expectations.
+        :return: None
+        """
+        self._load_file(flist, pd.read_excel, softload, cache)
+
+    def load_from_csv(self, flist, softload=False, cache=None):
+        """Loads a membership list from a CSV file
+
+        Only the header is read before the format of the membership list is
+        verified. The columns with expectations are then parsed straight
+        into the dtypes that the expectations call for.
+
+        :param flist: File name of the CSV file with membership data
+        :param softload: (boolean, default False) If true, then
+            `LoadMembershipListException` is not raised on extra columns
+        :param cache: (`memsynth.cache.RosterCache`, default None) If given,
+            an unchanged file is loaded from the cache instead of parsed
+        :raises: `memsynth.exceptions.LoadMembershipListException` if the
+            data does not meet expectations.
+        :return: None
+        """
+        def read(flist):
+            header = pd.read_csv(flist, nrows=0)
+            self._verify_memlist_format(header, softload)
+            usecols, dtypes, dates = self._read_hints(header.columns)
+            return pd.read_csv(
+                flist, usecols=usecols, dtype=dtypes, parse_dates=dates
+            )
+
+        self._load_file(flist, read, softload, cache)
+
+    def load_from_parquet(self, flist, softload=False, cache=None):
+        """Loads a membership list from a Parquet file
+
+        Only the schema is read before the format of the membership list is
+        verified, and then only the columns with expectations are read.
+        Requires pyarrow.
+
+        :param flist: File name of the Parquet file with membership data
+        :param softload: (boolean, default False) If true, then
+            `LoadMembershipListException` is not raised on extra columns
+        :param cache: (`memsynth.cache.RosterCache`, default None) If given,
+            an unchanged file is loaded from the cache instead of parsed
+        :raises: `memsynth.exceptions.LoadMembershipListException` if the
+            data does not meet expectations.
+        :return: None
+        """
+        def read(flist):
+            import pyarrow.parquet as pq
+
+            columns = pq.ParquetFile(flist).schema_arrow.names
+            self._verify_memlist_format(pd.DataFrame(columns=columns), softload)
+            usecols, _, _ = self._read_hints(columns)
+            return pd.read_parquet(flist, columns=usecols)
+
+        self._load_file(flist, read, softload, cache)
+
+    def load_from_file(self, flist, softload=False, cache=None):
+        """Loads a membership list with the loader for its extension
+
+        :param flist: File name of the membership file, see `LOADERS`
+        :param softload: (boolean, default False) If true, then
+            `LoadMembershipListException` is not raised on extra columns
+        :param cache: (`memsynth.cache.RosterCache`, default None) If given,
+            an unchanged file is loaded from the cache instead of parsed
+        :raises: `memsynth.exceptions.LoadMembershipListException` if the
+            file has an unknown extension or the data does not meet
+            expectations.
+        :return: None
+        """
+        ext = os.path.splitext(flist)[1].lower()
+        if ext not in self.LOADERS:
+            raise ex.LoadMembershipListException(
+                self, fname=flist,
+                msg=f"Cannot load '{ext}' files, expected one of "
+                    f"{tuple(self.LOADERS)}"
+            )
+        getattr(self, self.LOADERS[ext])(flist, softload, cache)
+
+    def _read_chunks(self, flist, chunksize=CHUNK_SIZE):
+        """Reads a membership file as a series of `pandas.DataFrame` chunks
+
+        CSV files are read with `pandas.read_csv`, while xlsx files are read
+        row by row with openpyxl in read-only mode, so that only `chunksize`
+        rows are ever held in memory at once. Each chunk has an index that
+        starts at 0.
+
+        :param flist: File name of the CSV or xlsx file with membership data
+        :param chunksize: (int, default `CHUNK_SIZE`) Number of rows per chunk
+        :raises: `memsynth.exceptions.LoadMembershipListException` if the file
+            is not a CSV or xlsx file
+        :return: yields `pandas.DataFrame`
+        """
+        ext = os.path.splitext(flist)[1].lower()
+        if ext == ".csv":
+            for chunk in pd.read_csv(flist, chunksize=chunksize):
+                yield chunk.reset_index(drop=True)
+        elif ext in (".xlsx", ".xlsm"):
+            from openpyxl import load_workbook
+
+            wb = load_workbook(flist, read_only=True, data_only=True)
+            try:
+                rows = wb.worksheets[0].iter_rows(values_only=True)
+                columns = next(rows, ())
+                chunk = []
+                for row in rows:
+                    chunk.append(row)
+                    if len(chunk) == chunksize:
+                        yield pd.DataFrame(chunk, columns=columns)
+                        chunk = []
+                if chunk:
+                    yield pd.DataFrame(chunk, columns=columns)
+            finally:
+                wb.close()
+        else:
+            raise ex.LoadMembershipListException(
+                self, fname=flist,
+                msg=f"Cannot read '{ext}' files in chunks, expected a CSV "
+                    f"or xlsx file"
+            )
+
+    def check_membership_list_in_chunks(self, flist, chunksize=CHUNK_SIZE,
+                                        softload=False, strict=True,
+                                        fail_fast=False,
+                                        max_failures_per_column=None):
+        """Streams a membership file and checks it one chunk at a time
+
+        The membership list is never loaded as a whole. Each chunk of
+        `chunksize` rows is verified and converted by `_load` and then checked
+        by every `MemExpectation`, which keep the line numbers of their
+        failures relative to the whole file. `df` is left untouched.
+
+        :param flist: File name of the CSV or xlsx file with membership data
+        :param chunksize: (int, default `CHUNK_SIZE`) Number of rows per chunk
+        :param softload: (boolean, default False) If true, then
+            `LoadMembershipListException` is not raised on extra columns
+        :param strict: (boolean, default True) Considers soft failures to be
+            failures if True, ignores them if they are soft.
+        :param fail_fast: (boolean, default False) If True, no more chunks
+            are read after the first hard failure, see
+            `check_membership_list_on_parameters`. Columns left unchecked in
+            the last chunk are listed in `skipped_columns`.
+        :param max_failures_per_column: (int, default None) If given, no more
+            than this many failures are kept on each column
+        :raises: `memsynth.exceptions.LoadMembershipListException` if the
+            data does not meet expectations.
+        :return: (boolean) True, if there are no columns with failures
+        """
+        self._name_from_file(flist)
+        for exp in self.expectations.values():
+            exp.clear(max_failures_per_column)
+        skipped = []
+
+        offset = 0
+        conversion_failures = {}
+        chunks = self._read_chunks(flist, chunksize)
+        while True:
+            start = time.perf_counter()
+            chunk = next(chunks, None)
+            if chunk is None:
+                break
+            self.instrumentation.record(
+                "read", time.perf_counter() - start, len(chunk)
+            )
+            self.logger.debug(
+                f"Checking lines {offset} to {offset + len(chunk) - 1} of {flist}"
+            )
+            chunk = self._load(chunk, softload)
+            for col, failed in self.conversion_failures.items():
+                conversion_failures.setdefault(col, []).append(
+                    failed.set_axis(failed.index + offset)
+                )
+            skipped = self._check_columns(
+                chunk, offset, clear=False, fail_fast=fail_fast,
+                max_failures=max_failures_per_column
+            )
+            offset += len(chunk)
+            if fail_fast and any(
+                    exp.is_hard_failure() for exp in self.expectations.values()):
+                break
+        self.conversion_failures = {
+            col: pd.concat(failed) for col, failed in conversion_failures.items()
+        }
+        self._skip(skipped)
+        return self._summarize_checks(strict)
+
     def load_from_memory(self, mem, softload=False):
         """Loads a membership list from a variable in memory
 
@@ -458,7 +1699,7 @@ class MemSynther():
         :return: None
         """
         try:
-            if mem and hasattr(mem, "columns"):
+            if hasattr(mem, "columns"):
                 self.df = self._load(mem, softload)
             else:
                 self.df = self._load(pd.DataFrame(mem), softload=softload)
@@ -466,28 +1707,101 @@ class MemSynther():
             self.df = None
             raise ex.LoadMembershipListException(self, msg=str(e))
 
+    def export_failures(self, fname, format=None, include_soft=True):
+        """Streams the failures to a CSV, JSON Lines or Parquet file
+
+        See `memsynth.export.export_failures` for the records written.
+
+        :param fname: (str) File to write
+        :param format: (str, default None) 'csv', 'jsonl' or 'parquet'. If
+            None, the format is chosen by the extension of `fname`.
+        :param include_soft: (boolean, default True) If False, failed soft
+            constraints are left out
+        :raises: `ValueError` if the format is unknown
+        :return: None
+        """
+        export_failures(self.expectations, fname, format, include_soft)
+
+    def share(self, path=None):
+        """Writes the membership list for worker processes to memory-map
+
+        :param path: (str, default None) File to write. If None, a temporary
+            file is written, and removed when the handle is closed.
+        :return: (`memsynth.shared.SharedRoster`) A handle that is cheap to
+            send to workers, which load from it with `load_from_shared`
+        """
+        with self.instrumentation.stage("share", rows=len(self.df)):
+            return SharedRoster.write(self.df, path)
+
+    def load_from_shared(self, roster, columns=None):
+        """Loads the membership list, or some of its columns, from a
+        `memsynth.shared.SharedRoster`
+
+        The membership list was verified and converted before it was shared,
+        so it is not loaded through `_load` again.
+
+        :param roster: (`memsynth.shared.SharedRoster`)
+        :param columns: (list of str, default None) Columns to load. If None,
+            every column is loaded.
+        :return: None
+        """
+        self.df = roster.read(columns)
+
+    def save_to_store(self, store):
+        """Upserts the membership list into a local membership store
+
+        :param store: (`memsynth.store.MembershipStore`)
+        :return: (int) The number of members upserted
+        """
+        with self.instrumentation.stage("store", rows=len(self.df)):
+            return store.ingest(self.df)
+
+    def load_from_store(self, store, columns=None, where=None, params=(),
+                        **equals):
+        """Loads members from a local membership store
+
+        The members were verified and converted when they were stored, so
+        they are not loaded through `_load` again. See
+        `memsynth.store.MembershipStore.load` for the parameters.
+
+        :param store: (`memsynth.store.MembershipStore`)
+        :return: None
+        """
+        self.df = store.load(columns, where, params, **equals)
+
     def report_failures(self, report_soft_errors=True):
-        # Add handler for terminal to make sure that the
-        # console is logging errors
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(logging.INFO)
-        console_handler.setFormatter(logging.Formatter('%(levelname)s - %(message)s'))
-        logging.getLogger(__name__).addHandler(console_handler)
-
-        failures = self.return_failure_dict(include_soft=report_soft_errors)
-        for fail_column in failures.keys():
-            self.logger.info(
-                f"{len(failures[fail_column])} failures found on "
-                f"column '{fail_column}'"
+        # Add handler for terminal to make sure that the console is logging
+        # errors. The failures are logged by `self.logger`, which is shared by
+        # every `MemSynther`, so the handler is only added if it is not there
+        # already, and only for as long as the report takes.
+        console_handler = None
+        if not any(getattr(h, "_memsynth_console", False)
+                   for h in self.logger.handlers):
+            console_handler = logging.StreamHandler(sys.stdout)
+            console_handler.setLevel(logging.INFO)
+            console_handler.setFormatter(
+                logging.Formatter('%(levelname)s - %(message)s')
             )
-            for failure in failures[fail_column]:
-                self.logger.info(f"On line {failure.line}: ")
-                for param in failure.why:
-                    logfn = getattr(self.logger, 'warning')\
-                        if param.soft else getattr(self.logger, 'error')
-                    logfn(
-                        f"{'soft' if param.soft else 'HARD'} "
-                        f"failure on the '{param.name}' constraint, "
-                        f"value='{param.value}', with args='{param.args}' "
-                    )
-                self.logger.info(f"Data at line is {failure.data}")
+            console_handler._memsynth_console = True
+            self.logger.addHandler(console_handler)
+        try:
+            failures = self.return_failure_dict(include_soft=report_soft_errors)
+            for fail_column in failures.keys():
+                self.logger.info(
+                    f"{len(failures[fail_column])} failures found on "
+                    f"column '{fail_column}'"
+                )
+                for failure in failures[fail_column]:
+                    self.logger.info(f"On line {failure.line}: ")
+                    for param in failure.why:
+                        logfn = getattr(self.logger, 'warning')\
+                            if param.soft else getattr(self.logger, 'error')
+                        logfn(
+                            f"{'soft' if param.soft else 'HARD'} "
+                            f"failure on the '{param.name}' constraint, "
+                            f"value='{param.value}', with args='{param.args}' "
+                        )
+                    self.logger.info(f"Data at line is {failure.data}")
+        finally:
+            if console_handler is not None:
+                self.logger.removeHandler(console_handler)
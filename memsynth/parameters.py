@@ -1,4 +1,5 @@
 from collections import namedtuple
+import operator
 
 
 Parameter = namedtuple(
@@ -14,6 +15,14 @@ ACCEPTABLE_PARAMS = (
     "relative_to",
 )
 
+# Parameters checked against the data by `MemExpectation.check`, in order.
+# `data_type` is enforced when the membership list is loaded instead.
+CHECKED_PARAMS = (
+    "regex",
+    "nullable",
+    "relative_to",
+)
+
 UNIQUE_PARAMS = (
     "data_type",
     "nullable",
@@ -24,5 +33,41 @@ DATATYPE_MAP = {
     "object": "object",
     "integer": "int64",
     "date": "datetime64[ns]",
-    "boolean": "bool"
+    "boolean": "bool",
+    "category": "category",
+}
+
+# How a `string` column may be stored, given as the 'storage' argument of its
+# `data_type`. Without one, it is stored as 'object' or, when it has few
+# distinct values, as 'category'.
+STRING_STORAGE = ("object", "category", "string")
+
+# Widths of nullable integers, from narrowest, that an `integer` column with
+# a 'downcast' argument is stored as
+INTEGER_WIDTHS = ("Int8", "Int16", "Int32", "Int64")
+
+# Comparisons for the `relative_to` parameter. The value of a `relative_to`
+# parameter maps other columns to one of these, and reads as
+# "<other column> <comparison> <this column>"
+RELATIVE_COMPARISONS = {
+    "less_than": operator.lt,
+    "less_than_or_equal": operator.le,
+    "greater_than": operator.gt,
+    "greater_than_or_equal": operator.ge,
+    "equal": operator.eq,
+    "not_equal": operator.ne,
+}
+
+# Conditions for the `relative_to` parameter under which this column may not
+# be null, based on the value of the other column
+RELATIVE_REQUIREMENTS = {
+    "required_when_true": True,
+    "required_when_false": False,
+}
+
+# How the text of a `boolean` column is read when the membership list is loaded
+BOOLEAN_VALUES = {
+    "true": True, "t": True, "yes": True, "y": True, "1": True, "1.0": True,
+    "false": False, "f": False, "no": False, "n": False, "0": False,
+    "0.0": False, "": False,
 }
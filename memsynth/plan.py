@@ -0,0 +1,315 @@
+"""Compiled expectations, shared between `MemSynther`s
+
+Forming a `MemExpectation` means validating its parameters, compiling its
+regular expressions and working out which checks to run and what dtype its
+column is loaded as. `compile_plan` does all of that once per expectations
+JSON and keeps the resulting `ExpectationPlan` in a process-wide cache keyed
+on the JSON itself, so every `MemSynther` loading the same expectations, in
+this run or a later one in the same process, shares one immutable plan.
+
+"""
+from collections import namedtuple
+from collections.abc import Mapping
+from functools import lru_cache
+import json
+import logging
+import re
+from types import MappingProxyType
+
+from memsynth.config import uss_regex, US_STATES, PLAN_CACHE_SIZE
+import memsynth.exceptions as ex
+from memsynth.parameters import (
+    Parameter, ACCEPTABLE_PARAMS, UNIQUE_PARAMS, CHECKED_PARAMS, DATATYPE_MAP,
+    RELATIVE_COMPARISONS, RELATIVE_REQUIREMENTS, STRING_STORAGE
+)
+
+logger = logging.getLogger("ExpectationPlan")
+
+CompiledExpectation = namedtuple(
+    "CompiledExpectation",
+    ['col', 'required', 'parameters', 'params', 'param_list', 'soft_bits',
+     'patterns', 'matchers', 'checks', 'dtype', 'downcast', 'auto_category',
+     'related_columns'],
+)
+CompiledExpectation.__doc__ = """The immutable, compiled form of an expectation
+
+:param col: (str) Name of the column the expectation refers to
+:param required: (boolean) Whether the column is required
+:param parameters: (frozenset of str) Names of the parameters present
+:param params: (tuple) Pairs of parameter names and their `Parameter`, or
+    a tuple of `Parameter`s for parameters that are not unique
+:param param_list: (tuple of `Parameter`) Every parameter, in the order of
+    their bits in failure masks
+:param soft_bits: (int) Mask of the bits of soft parameters
+:param patterns: (tuple of compiled regexes) What each regex parameter is
+    matched with, with its 'match' argument already applied
+:param matchers: (tuple of `RegexMatcher`) The quickest way to evaluate
+    each of `patterns`
+:param checks: (tuple of str) Parameters that are checked, in the order
+    they are checked in
+:param dtype: (str) The dtype the column is loaded as
+:param downcast: (boolean) Whether an integer column is loaded as the
+    narrowest of `INTEGER_WIDTHS` that holds its values
+:param auto_category: (boolean) Whether a string column is loaded as a
+    categorical when it has few distinct values
+:param related_columns: (tuple of str) Other columns `relative_to`
+    parameters refer to
+"""
+
+RegexMatcher = namedtuple("RegexMatcher", ['kind', 'value'])
+RegexMatcher.__doc__ = """How a regex parameter is evaluated on a string
+
+:param kind: (str) One of `MATCHER_KINDS`
+:param value: What the string is tested against. For 'in' and 'in_upper', a
+    frozenset the string (or its upper case) must be in. For 'prefix', a
+    string it must start with. For 'regex', a compiled regex it must match.
+"""
+MATCHER_KINDS = ("in", "in_upper", "prefix", "regex")
+
+US_STATE_CODES = frozenset(code.upper() for code in US_STATES)
+
+_REGEX_SPECIAL = frozenset(".^$*+?{}[]\\|()")
+# Flags a regex parameter may be compiled with, as in its 'flags' argument
+_REGEX_FLAGS = int(
+    re.IGNORECASE | re.MULTILINE | re.DOTALL | re.VERBOSE | re.ASCII
+)
+
+
+def _fully_anchored(pattern):
+    """Returns a version of a compiled `pattern` that must match to the end
+
+    `Series.str.match` only anchors at the start of a string, so a trailing
+    `\\Z` gives the same result as `re.fullmatch` on every value.
+    """
+    return re.compile(f"(?:{pattern.pattern})\\Z", pattern.flags)
+
+
+def _match_pattern(rx):
+    """Works out the pattern a regex `Parameter` is matched with"""
+    match = rx.args.get('match', '').lower() if rx.args else ''
+    if match == 'full':
+        return _fully_anchored(rx.value)
+    elif match == 'us_states':
+        return _fully_anchored(uss_regex)
+    return rx.value
+
+
+def _classify_regex(rx):
+    """Picks the quickest `RegexMatcher` that gives the same result as the
+    pattern from `_match_pattern`
+
+    'us_states' becomes a set lookup, and patterns of plain text become a
+    prefix test, or a set lookup if anchored at the end or matched in full.
+    Patterns compiled with flags other than ASCII are left to `re`, since the
+    flags change what plain text matches.
+    """
+    match = rx.args.get('match', '').lower() if rx.args else ''
+    if match == 'us_states':
+        return RegexMatcher("in_upper", US_STATE_CODES)
+    source = rx.value.pattern
+    if isinstance(source, str) and not (rx.value.flags & _REGEX_FLAGS & ~re.ASCII):
+        literal = source[1:] if source.startswith('^') else source
+        # `$` also matches before a newline at the end of the string
+        ends = ("",) if match == 'full' else None
+        if literal.endswith('$') and not literal.endswith('\\$'):
+            literal = literal[:-1]
+            ends = ("",) if match == 'full' else ("", "\n")
+        if not _REGEX_SPECIAL.intersection(literal):
+            if ends is None:
+                return RegexMatcher("prefix", literal)
+            return RegexMatcher("in", frozenset(literal + end for end in ends))
+    return RegexMatcher("regex", _match_pattern(rx))
+
+
+def _regex_flags(col, args):
+    """Combines the 'flags' argument of a regex parameter into one flag
+
+    :raises: `MemExpectationFormationError` if a flag is not a `re` flag
+    """
+    flags = (args or {}).get('flags') or []
+    if isinstance(flags, int):
+        flags = [flags]
+    combined = 0
+    for flag in flags:
+        if not isinstance(flag, int) or isinstance(flag, bool) \
+                or flag & ~_REGEX_FLAGS:
+            raise ex.MemExpectationFormationError(
+                col, f"'{flag}' is not a regular expression flag"
+            )
+        combined |= flag
+    return combined
+
+
+def _verify_relative_to(col, value):
+    relations = set(RELATIVE_COMPARISONS).union(RELATIVE_REQUIREMENTS)
+    if not isinstance(value, dict) or not value:
+        raise ex.MemExpectationFormationError(
+            col, "relative_to needs a mapping of columns to relations"
+        )
+    for other, relation in value.items():
+        if relation not in relations:
+            raise ex.MemExpectationFormationError(
+                col, f"'{relation}' relative to '{other}' is not a "
+                f"recognized relation. These are {sorted(relations)}"
+            )
+
+
+def _resolve_dtype(col, data_type):
+    """Works out how a column is loaded from its `data_type` `Parameter`
+
+    :return: (tuple) The dtype, whether it is downcast, and whether it may be
+        made categorical. See `CompiledExpectation`.
+    """
+    if data_type is None:
+        return None, False, False
+    dtype = DATATYPE_MAP.get(data_type.value.lower(), data_type.value)
+    args = data_type.args or {}
+    storage = args.get('storage')
+    if storage is not None:
+        if dtype != "object" or storage not in STRING_STORAGE:
+            raise ex.MemExpectationFormationError(
+                col, f"'{storage}' is not a storage for '{data_type.value}'. "
+                f"String columns can be stored as {STRING_STORAGE}"
+            )
+        dtype = storage
+    downcast = bool(args.get('downcast'))
+    if downcast and not dtype.lower().startswith("int"):
+        raise ex.MemExpectationFormationError(
+            col, f"only integer columns can be downcast, not '{data_type.value}'"
+        )
+    return dtype, downcast, dtype == "object" and storage is None
+
+
+def compile_expectation(col, parameters, required=True):
+    """Compiles the parameters of an expectation
+
+    :param col: (str) Name of the column the expectation refers to
+    :param parameters: (iterable of dict) The parameters as found in the
+        expectations JSON. They are not modified.
+    :param required: (boolean, default True) Whether the column is required
+    :raises: `MemExpectationFormationError` if the parameters are misconfigured
+    :return: (`CompiledExpectation`)
+    """
+    params = {}
+    for param in parameters:
+        param_name = param.get('name')
+        logger.debug(f"Forming parameter '{param_name}'...")
+        if param_name not in ACCEPTABLE_PARAMS:
+            raise ex.MemExpectationFormationError(
+                col, f"{param_name} is not a recognized col. "
+                f"These are {ACCEPTABLE_PARAMS}"
+            )
+        param = dict(param)
+        if param_name == 'regex':
+            logger.debug(f"Compiling regular expression '{param['value']}'")
+            param['value'] = re.compile(
+                param['value'], _regex_flags(col, param.get('args'))
+            )
+        elif param_name == 'relative_to':
+            _verify_relative_to(col, param.get('value'))
+        if param_name in params:
+            if param.get('unique') or param_name in UNIQUE_PARAMS:
+                raise ex.MemExpectationFormationError(
+                    col, f"has multiple '{param_name}' unique parameters"
+                )
+            params[param_name].append(Parameter(**param))
+        elif param_name in UNIQUE_PARAMS:
+            params[param_name] = Parameter(**param)
+        else:
+            params[param_name] = [Parameter(**param)]
+    if not params:
+        raise ex.MemExpectationFormationError(
+            col, "There is no data_type for column"
+        )
+
+    # Every parameter gets a bit in the failure masks of `FailureStore`
+    param_list = []
+    for param_name in ACCEPTABLE_PARAMS:
+        if param_name in params:
+            if param_name in UNIQUE_PARAMS:
+                param_list.append(params[param_name])
+            else:
+                params[param_name] = tuple(params[param_name])
+                param_list.extend(params[param_name])
+    if len(param_list) > 64:
+        raise ex.MemExpectationFormationError(col, "has more than 64 parameters")
+
+    dtype, downcast, auto_category = _resolve_dtype(col, params.get('data_type'))
+    return CompiledExpectation(
+        col=col,
+        required=required,
+        parameters=frozenset(params),
+        params=tuple(params.items()),
+        param_list=tuple(param_list),
+        soft_bits=sum(1 << i for i, p in enumerate(param_list) if p.soft),
+        patterns=tuple(_match_pattern(rx) for rx in params.get('regex', ())),
+        matchers=tuple(_classify_regex(rx) for rx in params.get('regex', ())),
+        checks=tuple(name for name in CHECKED_PARAMS if name in params),
+        dtype=dtype,
+        downcast=downcast,
+        auto_category=auto_category,
+        related_columns=tuple(dict.fromkeys(
+            other for param in params.get('relative_to', ()) for other in param.value
+        )),
+    )
+
+
+class ExpectationPlan(Mapping):
+    """The compiled expectations of every column, as loaded from JSON
+
+    Maps column names to their `CompiledExpectation`. A plan is never
+    modified, so one can be shared by any number of `MemSynther`s.
+
+    :param expectations_json: (str) The JSON the expectations are compiled from
+    :param expectations: (dict) Column names to their `CompiledExpectation`
+    """
+    def __init__(self, expectations_json, expectations):
+        self.expectations_json = expectations_json
+        self._expectations = MappingProxyType(dict(expectations))
+
+    def __repr__(self):
+        return f"<ExpectationPlan: {len(self)} columns>"
+
+    def __getitem__(self, col):
+        return self._expectations[col]
+
+    def __iter__(self):
+        return iter(self._expectations)
+
+    def __len__(self):
+        return len(self._expectations)
+
+    def __reduce__(self):
+        # `MappingProxyType` does not pickle, so rebuild from a plain dict
+        return type(self), (self.expectations_json, dict(self._expectations))
+
+
+@lru_cache(maxsize=PLAN_CACHE_SIZE)
+def compile_plan(expectations_json):
+    """Compiles expectations JSON into a plan, or takes it from the cache
+
+    :param expectations_json: (str) The expectations, as JSON
+    :raises: `MemExpectationFormationError` if the JSON is misconfigured
+    :return: (`ExpectationPlan`)
+    """
+    logger.debug("Compiling an expectation plan")
+    expectations = {}
+    for col, exps in json.loads(expectations_json).items():
+        expectations[col] = compile_expectation(
+            col, exps["parameters"], exps["required"]
+        )
+    return ExpectationPlan(expectations_json, expectations)
+
+
+def load_plan(fname):
+    """Compiles the expectations in a JSON file, see `compile_plan`
+
+    :raises: `FileNotFoundError` if file is not found
+    """
+    with open(fname, 'r') as f:
+        return compile_plan(f.read())
+
+
+def clear_plan_cache():
+    """Forgets every plan compiled so far"""
+    compile_plan.cache_clear()
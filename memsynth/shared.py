@@ -0,0 +1,175 @@
+"""Membership lists shared with worker processes through memory-mapped files
+
+Sending a `pandas.DataFrame` to the workers of a `ProcessPoolExecutor`
+pickles it once per task, so every worker ends up holding its own copy of
+the whole membership list. `SharedRoster` writes the list once as an
+uncompressed Arrow IPC file, and only a small handle to it is pickled.
+Workers memory-map the file and read just the columns they need, so pages
+of other columns are never touched. Requires pyarrow.
+
+"""
+import logging
+import os
+import pickle
+import tempfile
+
+from memsynth.utils import LazyModule
+
+pd = LazyModule("pandas")
+
+logger = logging.getLogger("SharedRoster")
+
+# Schema metadata listing the columns whose values are stored pickled
+PICKLED_KEY = b"memsynth.pickled"
+
+
+def _to_arrow(df):
+    """Converts a membership list into a `pyarrow.Table`
+
+    Object columns that mix types, such as phone numbers read as both
+    numbers and text, cannot be Arrow arrays. Their values are pickled one
+    by one instead, so that they come back exactly as they were.
+
+    :return: (tuple) The table, and a tuple of the names of pickled columns
+    """
+    import pyarrow as pa
+
+    arrays, pickled = [], []
+    for col in df.columns:
+        try:
+            arrays.append(pa.Array.from_pandas(df[col]))
+        except (pa.ArrowTypeError, pa.ArrowInvalid):
+            pickled.append(col)
+            arrays.append(pa.array(
+                [pickle.dumps(value) for value in df[col]], type=pa.binary()
+            ))
+    table = pa.Table.from_arrays(arrays, names=[str(col) for col in df.columns])
+    table = table.replace_schema_metadata(
+        {PICKLED_KEY: "\0".join(pickled).encode("utf-8")}
+    )
+    return table, tuple(pickled)
+
+
+class SharedRoster:
+    """A handle to a membership list written to a memory-mappable file
+
+    Handles are cheap to pickle, so they are what is sent to workers in
+    place of the membership list. Make one with `SharedRoster.write`.
+
+    :param path: (str) The Arrow IPC file
+    :param dtypes: (dict) Every column to the str of the dtype it is read as,
+        which for categoricals is 'category[<dtype of the categories>]'
+    :param pickled: (tuple of str) Columns whose values are stored pickled
+    :param temporary: (boolean, default False) If True, the file is removed
+        when the handle is closed by the process that wrote it
+    """
+    EXTENSION = ".arrow"
+
+    def __init__(self, path, dtypes, pickled=(), temporary=False):
+        self.path = path
+        self.dtypes = dtypes
+        self.pickled = pickled
+        self.temporary = temporary
+        self._owner = os.getpid()
+
+    def __repr__(self):
+        return f"<SharedRoster: {self.path} - {len(self.dtypes)} columns>"
+
+    def __getstate__(self):
+        # Copies sent to workers never remove the file
+        return dict(self.__dict__, _owner=None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def _dtype(series):
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return f"category[{series.cat.categories.dtype}]"
+        return str(series.dtype)
+
+    @property
+    def columns(self):
+        """(list of str) The columns of the membership list"""
+        return list(self.dtypes)
+
+    @classmethod
+    def write(cls, df, path=None):
+        """Writes a membership list for other processes to read
+
+        :param df: (`pandas.DataFrame`) The membership list. Its index is
+            not kept.
+        :param path: (str, default None) File to write. If None, a temporary
+            file is written, and removed when the handle is closed.
+        :return: (`SharedRoster`)
+        """
+        import pyarrow as pa
+
+        temporary = path is None
+        if temporary:
+            fd, path = tempfile.mkstemp(prefix="memsynth-", suffix=cls.EXTENSION)
+            os.close(fd)
+        table, pickled = _to_arrow(df)
+        # Uncompressed, so that readers map the buffers rather than copy them
+        with pa.OSFile(path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        logger.debug(f"Wrote {len(df)} rows to '{path}' for sharing")
+        return cls(
+            path, {str(col): cls._dtype(df[col]) for col in df.columns},
+            pickled, temporary
+        )
+
+    def read(self, columns=None):
+        """Reads columns of the membership list from the memory-mapped file
+
+        Fixed width columns without nulls are left on the mapped pages where
+        pandas allows it. Others are converted back into the dtypes they
+        were written with.
+
+        :param columns: (list of str, default None) Columns to read. If
+            None, every column is read.
+        :raises: `KeyError` if a column is not in the membership list
+        :return: (`pandas.DataFrame`)
+        """
+        import pyarrow as pa
+
+        columns = self.columns if columns is None else list(columns)
+        missing = [col for col in columns if col not in self.dtypes]
+        if missing:
+            raise KeyError(f"{missing} are not columns of {self}")
+        with pa.memory_map(self.path, "r") as source:
+            table = pa.ipc.open_file(source).read_all().select(columns)
+            df = table.to_pandas(split_blocks=True)
+        for col in columns:
+            df[col] = self._restore(df[col], self.dtypes[col], col in self.pickled)
+        return df
+
+    @staticmethod
+    def _restore(series, dtype, pickled=False):
+        """Gives a column read from Arrow back the dtype it was written with"""
+        if pickled:
+            return pd.Series(
+                [pickle.loads(value) for value in series],
+                index=series.index, name=series.name, dtype=object
+            )
+        if dtype.startswith("category["):
+            categories = series.cat.categories
+            if str(categories.dtype) != dtype[len("category["):-1]:
+                return series.cat.rename_categories(
+                    categories.astype(dtype[len("category["):-1])
+                )
+            return series
+        if str(series.dtype) != dtype:
+            return series.astype(dtype)
+        return series
+
+    def close(self):
+        """Removes a temporary file, if this process wrote it"""
+        if self.temporary and self._owner == os.getpid() \
+                and os.path.exists(self.path):
+            os.remove(self.path)
+            logger.debug(f"Removed shared membership list '{self.path}'")
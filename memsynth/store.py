@@ -0,0 +1,218 @@
+"""A local, persistent store of membership lists
+
+`MembershipStore` keeps members in a SQLite table keyed on `MEMBER_ID`, so a
+validated membership list only has to be read from its file once. Later
+lists are upserted over it in batches, and subsets of members can be loaded
+straight back into a `pandas.DataFrame` using the indexes on the columns that
+are queried most.
+
+"""
+import logging
+import os
+import sqlite3
+
+from memsynth.config import MEMBER_ID, STORE_PATH, CHUNK_SIZE
+from memsynth.utils import LazyModule
+
+pd = LazyModule("pandas")
+
+TABLE = "members"
+# Records the dtype of every column in `TABLE`, so that it can be restored
+COLUMNS_TABLE = "member_columns"
+INDEXED_COLUMNS = ("Email", "Zip", "Memb_status")
+
+
+def _quote(name):
+    if '"' in name:
+        raise ValueError(f"Column names cannot contain '\"': {name}")
+    return f'"{name}"'
+
+
+def _affinity(dtype):
+    """The SQLite type a column of a pandas dtype is stored as
+
+    Object columns get no type, so that SQLite keeps each value as the type
+    it was given rather than turning numbers into text.
+    """
+    kind = getattr(dtype, "kind", "O")
+    if kind in "iub":
+        return "INTEGER"
+    if kind == "f":
+        return "REAL"
+    if kind == "M":
+        return "TEXT"
+    return ""
+
+
+class MembershipStore:
+    """Members of a chapter, stored in SQLite
+
+    The table grows a column for every new column of an ingested membership
+    list. Dates are stored as ISO 8601 text, and every column's dtype is
+    restored when members are loaded.
+
+    :param path: (str, default `STORE_PATH`) SQLite database file, or
+        ':memory:'
+    :param key: (str, default `MEMBER_ID`) Column identifying each member
+    """
+    def __init__(self, path=STORE_PATH, key=MEMBER_ID):
+        self.logger = logging.getLogger(type(self).__name__)
+        self.path = path
+        self.key = key
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {COLUMNS_TABLE} "
+            f"(name TEXT PRIMARY KEY, dtype TEXT NOT NULL)"
+        )
+
+    def __repr__(self):
+        return f"<MembershipStore: {self.path} - {len(self)} members>"
+
+    def __len__(self):
+        if not self.dtypes:
+            return 0
+        return self.conn.execute(f"SELECT COUNT(*) FROM {TABLE}").fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    @property
+    def dtypes(self):
+        """(dict) Every stored column to the dtype it is loaded as"""
+        return dict(self.conn.execute(
+            f"SELECT name, dtype FROM {COLUMNS_TABLE} ORDER BY rowid"
+        ).fetchall())
+
+    def _prepare_table(self, df):
+        """Creates the table and indexes, or adds columns new in `df`"""
+        known = self.dtypes
+        new = [col for col in df.columns if col not in known]
+        if not known:
+            if self.key not in df.columns:
+                raise ValueError(f"The membership list has no '{self.key}' column")
+            definitions = ", ".join(
+                f"{_quote(col)} {_affinity(df[col].dtype)}".rstrip()
+                + (" PRIMARY KEY" if col == self.key else "")
+                for col in df.columns
+            )
+            self.conn.execute(f"CREATE TABLE {TABLE} ({definitions})")
+        else:
+            for col in new:
+                self.conn.execute(
+                    f"ALTER TABLE {TABLE} ADD COLUMN "
+                    f"{_quote(col)} {_affinity(df[col].dtype)}".rstrip()
+                )
+        self.conn.executemany(
+            f"INSERT INTO {COLUMNS_TABLE} (name, dtype) VALUES (?, ?)",
+            [(col, str(df[col].dtype)) for col in new]
+        )
+        for col in INDEXED_COLUMNS:
+            if col in known or col in new:
+                self.conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS {_quote(f'ix_{TABLE}_{col}')} "
+                    f"ON {TABLE} ({_quote(col)})"
+                )
+
+    @staticmethod
+    def _rows(df):
+        """Converts a membership list into tuples that sqlite3 can bind"""
+        df = df.copy()
+        for col in df.columns:
+            if pd.api.types.is_datetime64_any_dtype(df[col].dtype):
+                df[col] = df[col].dt.strftime("%Y-%m-%dT%H:%M:%S")
+        df = df.astype(object).where(df.notna(), None)
+        for col in df.columns:
+            # numpy scalars are not bound by sqlite3, so unwrap them
+            df[col] = [
+                value.item() if hasattr(value, "item") else value
+                for value in df[col]
+            ]
+        return df.itertuples(index=False, name=None)
+
+    def ingest(self, df, batch_size=CHUNK_SIZE):
+        """Inserts new members and updates existing ones
+
+        Runs in one transaction, upserting `batch_size` members at a time.
+
+        :param df: (`pandas.DataFrame` or `memsynth.main.MemSynther`) The
+            membership list
+        :param batch_size: (int, default `CHUNK_SIZE`) Rows per `executemany`
+        :raises: `ValueError` if the key column is missing or not unique
+        :return: (int) The number of members upserted
+        """
+        if hasattr(df, "df"):
+            df = df.df
+        if self.key in df.columns and df[self.key].duplicated().any():
+            raise ValueError(f"'{self.key}' is not unique in the membership list")
+        columns = ", ".join(_quote(col) for col in df.columns)
+        updates = ", ".join(
+            f"{_quote(col)} = excluded.{_quote(col)}"
+            for col in df.columns if col != self.key
+        )
+        sql = f"INSERT INTO {TABLE} ({columns}) VALUES " \
+            f"({', '.join('?' * len(df.columns))}) " \
+            f"ON CONFLICT({_quote(self.key)}) DO " + \
+            (f"UPDATE SET {updates}" if updates else "NOTHING")
+        with self.conn:
+            self._prepare_table(df)
+            for start in range(0, len(df), batch_size):
+                self.conn.executemany(
+                    sql, self._rows(df.iloc[start:start + batch_size])
+                )
+        self.logger.info(f"Upserted {len(df)} members into '{self.path}'")
+        return len(df)
+
+    def load(self, columns=None, where=None, params=(), **equals):
+        """Loads members into a `pandas.DataFrame`
+
+        :param columns: (list of str, default None) Columns to load. If None,
+            every column is loaded.
+        :param where: (str, default None) An SQL condition on the members,
+            with '?' placeholders for `params`
+        :param params: (tuple, default ()) Values for the placeholders
+        :param equals: Columns that must equal a value, or be one of a list
+            of values, eg. `Zip="32801"` or `Memb_status=["M", "L"]`
+        :return: (`pandas.DataFrame`) In order of the key, with the dtypes
+            the columns were ingested with
+        """
+        dtypes = self.dtypes
+        if not dtypes:
+            return pd.DataFrame(columns=columns or [])
+        columns = list(dtypes) if columns is None else list(columns)
+        conditions = [f"({where})"] if where else []
+        params = list(params)
+        for col, value in equals.items():
+            if isinstance(value, (list, tuple, set)):
+                conditions.append(
+                    f"{_quote(col)} IN ({', '.join('?' * len(value))})"
+                )
+                params.extend(value)
+            else:
+                conditions.append(f"{_quote(col)} = ?")
+                params.append(value)
+        sql = f"SELECT {', '.join(_quote(col) for col in columns)} FROM {TABLE}"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY {_quote(self.key)}"
+        df = pd.read_sql_query(sql, self.conn, params=params)
+        for col in columns:
+            dtype = dtypes.get(col)
+            if dtype is None or str(df[col].dtype) == dtype:
+                continue
+            if dtype.startswith("datetime64"):
+                df[col] = pd.to_datetime(df[col]).astype(dtype)
+            elif dtype in ("bool", "boolean") and df[col].isna().any():
+                df[col] = df[col].astype("boolean")
+            elif dtype.startswith("int") and df[col].isna().any():
+                df[col] = df[col].astype("Int64")
+            else:
+                df[col] = df[col].astype(dtype)
+        return df
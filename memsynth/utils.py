@@ -1,9 +1,36 @@
+import importlib
 import os
 import logging.config
 
-import yaml
 
-import coloredlogs
+class LazyModule:
+    """A module that is only imported the first time one of its attributes
+    is used
+
+    Importing pandas, numpy, yaml and coloredlogs takes a good part of a
+    second, which is most of the run time of a short command or a worker
+    process that never touches them.
+
+    :param name: (str) Name of the module, eg. 'pandas'
+    """
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __repr__(self):
+        state = "imported" if self._module is not None else "not imported"
+        return f"<LazyModule: {self._name} - {state}>"
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+pd = LazyModule("pandas")
+
+_coloredlogs_installed = False
+
 
 def setup_logging(
     default_path='logging.yaml',
@@ -13,12 +40,22 @@ def setup_logging(
 ):
     """Setup logging configuration
 
+    coloredlogs is installed on the first call only, later calls just set
+    the level of the root logger.
+
     """
+    global _coloredlogs_installed
+    if _coloredlogs_installed:
+        logging.getLogger().setLevel(default_level)
+        return
+
     path = default_path
     value = os.getenv(env_key, None)
     if value:
         path = value
     if os.path.exists(path):
+        import yaml
+
         with open(path, 'rt') as f:
             config = yaml.safe_load(f.read())
         logging.config.dictConfig(config)
@@ -34,4 +71,18 @@ def setup_logging(
                                                  'bold;error=124;' \
                                                  'critical=background=red'
 
+    import coloredlogs
+
     coloredlogs.install(level=default_level)
+    _coloredlogs_installed = True
+
+
+def hash_rows(df, key):
+    """Hashes every row of a membership list
+
+    :param df: (`pandas.DataFrame`) Membership list
+    :param key: (str) Column that identifies each row
+    :return: (`pandas.Series`) uint64 hashes of each row, indexed by `key`
+    """
+    hashes = pd.util.hash_pandas_object(df, index=False)
+    return pd.Series(hashes.to_numpy(), index=pd.Index(df[key], name=key))
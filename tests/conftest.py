@@ -103,3 +103,27 @@ def address_partial_exp():
 @pytest.fixture
 def address_full_exp():
     return MemExpectation('Address', **ADDRESS_PARAMS_FULL_MATCH)
+
+XDATE_AFTER_JOIN_DATE = dict(
+    parameters=[
+        dict(name="data_type", value="date"),
+        dict(name="relative_to", value={"Join_Date": "less_than"})
+    ],
+    required=True
+)
+
+MOBILE_PHONE_UNLESS_DO_NOT_CALL = dict(
+    parameters=[
+        dict(name="data_type", value="string"),
+        dict(name="relative_to", value={"Do_Not_Call": "required_when_false"})
+    ],
+    required=True
+)
+
+@pytest.fixture
+def xdate_exp():
+    return MemExpectation('Xdate', **XDATE_AFTER_JOIN_DATE)
+
+@pytest.fixture
+def mobile_phone_exp():
+    return MemExpectation('Mobile_Phone', **MOBILE_PHONE_UNLESS_DO_NOT_CALL)
@@ -0,0 +1,82 @@
+import csv
+import json
+import os
+import shutil
+
+import pytest
+
+from memsynth.batch import find_rosters, validate_chapters, write_summary, main
+from memsynth.cli import EXIT_OK, EXIT_FAILED, EXIT_ERROR, main as cli_main
+try:
+    import tests.conftest as fixtures
+except:
+    import conftest as fixtures
+
+
+@pytest.fixture
+def roster_dir(tmp_path):
+    shutil.copy(fixtures.FAKE_MEM_LIST, tmp_path / "orlando.xlsx")
+    shutil.copy(fixtures.FAKE_IDEAL_MEM_LIST, tmp_path / "tampa.xlsx")
+    shutil.copy(fixtures.BAD_MEM_LIST, tmp_path / "miami.xlsx")
+    (tmp_path / "notes.txt").write_text("not a membership list")
+    return tmp_path
+
+def test_find_rosters_in_directory(roster_dir):
+    rosters = find_rosters(str(roster_dir))
+    assert list(rosters) == ["miami", "orlando", "tampa"]
+
+def test_find_rosters_in_manifest(roster_dir):
+    manifest = roster_dir / "manifest.json"
+    manifest.write_text(json.dumps({"Orlando": "orlando.xlsx"}))
+    rosters = find_rosters(str(manifest))
+    assert rosters == {"Orlando": os.path.join(str(roster_dir), "orlando.xlsx")}
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_validate_chapters(roster_dir, workers):
+    results = validate_chapters(
+        find_rosters(str(roster_dir)), fixtures.PARAM_JSON_FILE, workers=workers
+    )
+    by_chapter = {result.chapter: result for result in results}
+    assert by_chapter["miami"].error is not None
+    assert not by_chapter["miami"].passed
+    orlando = by_chapter["orlando"]
+    assert not orlando.passed and orlando.error is None
+    assert set(orlando.failures) == fixtures.FAIL_COLS | {fixtures.SOFT_FAIL_COL}
+    assert orlando.rows > 0
+    assert by_chapter["tampa"].passed
+
+def test_write_summary(roster_dir, tmp_path):
+    rosters = find_rosters(str(roster_dir))
+    results = validate_chapters(rosters, fixtures.PARAM_JSON_FILE, workers=0)
+    summary = tmp_path / "summary.csv"
+    write_summary(results, str(summary))
+    with open(summary) as f:
+        rows = {row["chapter"]: row for row in csv.DictReader(f)}
+    assert rows["tampa"]["passed"] == "True"
+    assert rows["orlando"]["failed_columns"].split() == sorted(
+        fixtures.FAIL_COLS | {fixtures.SOFT_FAIL_COL}
+    )
+
+    summary = tmp_path / "summary.json"
+    write_summary(results, str(summary))
+    with open(summary) as f:
+        assert [c["chapter"] for c in json.load(f)] == list(rosters)
+
+def test_main_exits_non_zero_on_failures(roster_dir, capsys):
+    assert main([str(roster_dir), "-e", fixtures.PARAM_JSON_FILE, "-w", "0"]) == \
+        EXIT_ERROR
+    assert "orlando" in capsys.readouterr().out
+    os.remove(roster_dir / "miami.xlsx")
+    assert main([str(roster_dir), "-e", fixtures.PARAM_JSON_FILE, "-w", "0"]) == \
+        EXIT_FAILED
+
+@pytest.mark.parametrize("strict", [False, True])
+def test_main_matches_the_validate_command(tmp_path, capsys, strict):
+    shutil.copy(fixtures.FAKE_LESS_THAN_IDEAL_MEM_LIST, tmp_path / "tampa.xlsx")
+    flags = ["-e", fixtures.PARAM_JSON_FILE, "-w", "0"] + \
+        (["--strict"] if strict else [])
+    status = main([str(tmp_path)] + flags)
+    batch_out = capsys.readouterr().out
+    assert status == (EXIT_FAILED if strict else EXIT_OK)
+    assert cli_main(["validate", str(tmp_path)] + flags) == status
+    assert capsys.readouterr().out == batch_out
@@ -0,0 +1,57 @@
+import io
+
+import pandas as pd
+
+from benchmarks.roster import generate_roster, DIRTY_VALUES
+from benchmarks.run import compare, run
+from memsynth import config
+from memsynth.main import MemSynther
+try:
+    import tests.conftest as fixtures
+except:
+    import conftest as fixtures
+
+
+def _checked(raw):
+    msy = MemSynther()
+    msy.load_expectations_from_json(fixtures.PARAM_JSON_FILE)
+    msy.load_from_memory(raw)
+    return msy, msy.check_membership_list_on_parameters()
+
+def test_generated_roster_is_seeded():
+    pd.testing.assert_frame_equal(generate_roster(50, 0.5), generate_roster(50, 0.5))
+    assert not generate_roster(50, seed=1).equals(generate_roster(50, seed=2))
+
+def test_clean_generated_roster_passes():
+    raw = generate_roster(200)
+    assert list(raw.columns) == config.EXPECTED_FORMAT_MEM_LIST["columns"]
+    _, passed = _checked(raw)
+    assert passed
+
+def test_fully_dirty_generated_roster_fails_every_dirty_column():
+    msy, passed = _checked(generate_roster(20, dirty_rate=1.0))
+    assert not passed
+    for col in list(DIRTY_VALUES) + ["Xdate"]:
+        assert len(msy.expectations[col]._fails) == 20
+
+def test_benchmark_run_and_compare():
+    results = run(sizes=[20], memory=True, excel_max_rows=0, out=io.StringIO())
+    stages = results["results"]["20"]
+    assert {"load_from_csv", "_load", "check", "report_failures"}.issubset(stages)
+    assert all(r["peak_mb"] is not None for r in stages.values())
+
+    slower = {"results": {"20": {
+        stage: dict(r, seconds=r["seconds"] + 1) for stage, r in stages.items()
+    }}}
+    assert compare(results, results, out=io.StringIO()) == []
+    assert len(compare(slower, results, out=io.StringIO())) == len(stages)
+
+def test_compare_notes_a_baseline_from_other_versions():
+    results = run(sizes=[20], excel_max_rows=0, out=io.StringIO())
+    out = io.StringIO()
+    compare(results, results, out=out)
+    assert "recorded on" not in out.getvalue()
+    older = dict(results, environment=dict(results["environment"], pandas="1.5.3"))
+    out = io.StringIO()
+    compare(results, older, out=out)
+    assert f"pandas 1.5.3 (now {pd.__version__})" in out.getvalue()
@@ -0,0 +1,84 @@
+import os
+
+import pandas as pd
+import pytest
+
+from memsynth.cache import RosterCache
+from memsynth.main import MemSynther
+try:
+    import tests.conftest as fixtures
+except:
+    import conftest as fixtures
+
+
+@pytest.fixture
+def roster_cache(tmp_path):
+    return RosterCache(directory=str(tmp_path / "cache"))
+
+def _new_memsynther():
+    msy = MemSynther()
+    msy.load_expectations_from_json(fixtures.PARAM_JSON_FILE)
+    return msy
+
+@pytest.mark.usefixtures("roster_cache")
+def test_cached_load_skips_parsing(roster_cache, monkeypatch):
+    first = _new_memsynther()
+    first.load_from_excel(fixtures.FAKE_MEM_LIST, cache=roster_cache)
+    assert roster_cache.size > 0
+
+    def read_excel(*args, **kwargs):
+        raise AssertionError("The cached membership list was parsed again")
+
+    monkeypatch.setattr(pd, "read_excel", read_excel)
+    second = _new_memsynther()
+    second.load_from_excel(fixtures.FAKE_MEM_LIST, cache=roster_cache)
+    pd.testing.assert_frame_equal(first.df, second.df)
+    assert second.name == "fakeodsa.xlsx"
+
+@pytest.mark.usefixtures("roster_cache")
+def test_cache_key_depends_on_file_and_expectations(roster_cache, tmp_path):
+    msy = _new_memsynther()
+    key = roster_cache.key(fixtures.FAKE_MEM_LIST, msy.expectations_json)
+    assert key == roster_cache.key(fixtures.FAKE_MEM_LIST, msy.expectations_json)
+    assert key != roster_cache.key(fixtures.FAKE_IDEAL_MEM_LIST, msy.expectations_json)
+    assert key != roster_cache.key(fixtures.FAKE_MEM_LIST, msy.expectations_json + " ")
+    assert key != roster_cache.key(
+        fixtures.FAKE_MEM_LIST, msy.expectations_json, softload=True
+    )
+
+@pytest.mark.usefixtures("roster_cache")
+def test_cached_load_keeps_conversion_failures(roster_cache):
+    first = _new_memsynther()
+    first.load_from_excel(fixtures.FAKE_MEM_LIST, cache=roster_cache)
+    assert first.conversion_failures
+
+    reused = _new_memsynther()
+    reused.load_from_excel(fixtures.FAKE_IDEAL_MEM_LIST)
+    reused.load_from_excel(fixtures.FAKE_MEM_LIST, cache=roster_cache)
+    assert list(reused.conversion_failures) == list(first.conversion_failures)
+    for col, failed in first.conversion_failures.items():
+        pd.testing.assert_series_equal(reused.conversion_failures[col], failed)
+
+@pytest.mark.usefixtures("roster_cache")
+def test_cache_invalidate(roster_cache):
+    msy = _new_memsynther()
+    msy.load_from_excel(fixtures.FAKE_MEM_LIST, cache=roster_cache)
+    msy.load_from_excel(fixtures.FAKE_IDEAL_MEM_LIST, cache=roster_cache)
+    key = roster_cache.key(fixtures.FAKE_MEM_LIST, msy.expectations_json)
+    roster_cache.invalidate(key)
+    assert roster_cache.get(key) is None
+    assert len(os.listdir(roster_cache.directory)) == 1
+    roster_cache.invalidate()
+    assert roster_cache.size == 0
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    msy = _new_memsynther()
+    roster_cache = RosterCache(directory=str(tmp_path / "cache"))
+    msy.load_from_excel(fixtures.FAKE_MEM_LIST, cache=roster_cache)
+    old_key = roster_cache.key(fixtures.FAKE_MEM_LIST, msy.expectations_json)
+    os.utime(roster_cache._path(old_key), (0, 0))
+
+    roster_cache.max_bytes = roster_cache.size + 1
+    msy.load_from_excel(fixtures.FAKE_IDEAL_MEM_LIST, cache=roster_cache)
+    assert roster_cache.get(old_key) is None
+    assert roster_cache.size <= roster_cache.max_bytes
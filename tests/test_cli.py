@@ -0,0 +1,72 @@
+import json
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from memsynth.cli import main, expand_paths, EXIT_OK, EXIT_FAILED, EXIT_ERROR
+from memsynth.main import MemSynther
+try:
+    import tests.conftest as fixtures
+except:
+    import conftest as fixtures
+
+
+@pytest.fixture
+def roster_dir(tmp_path):
+    shutil.copy(fixtures.FAKE_MEM_LIST, tmp_path / "orlando.xlsx")
+    shutil.copy(fixtures.FAKE_IDEAL_MEM_LIST, tmp_path / "tampa.xlsx")
+    (tmp_path / "notes.txt").write_text("not a membership list")
+    return tmp_path
+
+def test_expand_paths(roster_dir):
+    orlando = os.path.join(str(roster_dir), "orlando.xlsx")
+    tampa = os.path.join(str(roster_dir), "tampa.xlsx")
+    assert expand_paths([str(roster_dir)], MemSynther.LOADERS) == [orlando, tampa]
+    assert expand_paths(
+        [str(roster_dir / "t*.xlsx"), tampa], MemSynther.LOADERS
+    ) == [tampa]
+    with pytest.raises(FileNotFoundError):
+        expand_paths([str(roster_dir / "*.csv")], MemSynther.LOADERS)
+
+def test_validate_exit_codes(roster_dir):
+    tampa = str(roster_dir / "tampa.xlsx")
+    orlando = str(roster_dir / "orlando.xlsx")
+    assert main(["validate", tampa, "-e", fixtures.PARAM_JSON_FILE]) == EXIT_OK
+    assert main(["validate", orlando, "-e", fixtures.PARAM_JSON_FILE]) == EXIT_FAILED
+    shutil.copy(fixtures.BAD_MEM_LIST, roster_dir / "miami.xlsx")
+    assert main([
+        "validate", str(roster_dir), "-e", fixtures.PARAM_JSON_FILE, "-w", "0"
+    ]) == EXIT_ERROR
+    assert main([
+        "validate", str(roster_dir / "nope.csv"), "-e", fixtures.PARAM_JSON_FILE
+    ]) == EXIT_ERROR
+
+def test_validate_json(roster_dir, capsys):
+    assert main([
+        "validate", str(roster_dir / "*.xlsx"), "-e", fixtures.PARAM_JSON_FILE,
+        "-w", "0", "--format", "json"
+    ]) == EXIT_FAILED
+    results = {r["chapter"]: r for r in json.loads(capsys.readouterr().out)}
+    assert results["tampa"]["passed"]
+    assert set(results["orlando"]["failures"]) == \
+        fixtures.FAIL_COLS | {fixtures.SOFT_FAIL_COL}
+
+def test_diff(roster_dir, capsys):
+    assert main([
+        "diff", str(roster_dir / "orlando.xlsx"), str(roster_dir / "tampa.xlsx"),
+        "-e", fixtures.PARAM_JSON_FILE, "--format", "json"
+    ]) == EXIT_FAILED
+    out = json.loads(capsys.readouterr().out)
+    assert not out["added"] and not out["removed"]
+    assert "last_name" in {change["column"] for change in out["changed"]}
+
+def test_convert(roster_dir, tmp_path):
+    out_dir = tmp_path / "converted"
+    assert main([
+        "convert", str(roster_dir / "orlando.xlsx"), "--to", "csv",
+        "-o", str(out_dir), "-e", fixtures.PARAM_JSON_FILE
+    ]) == EXIT_OK
+    df = pd.read_csv(out_dir / "orlando.csv")
+    assert len(df) == len(pd.read_excel(fixtures.FAKE_MEM_LIST))
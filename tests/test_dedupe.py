@@ -0,0 +1,38 @@
+import pandas as pd
+import pytest
+
+from memsynth.dedupe import find_duplicates, candidate_pairs, blocking_keys, \
+    normalize_roster
+
+
+@pytest.fixture
+def roster():
+    return pd.DataFrame({
+        "AK_ID": [1, 2, 3, 4, 5],
+        "first_name": ["Rosa", "Karl", "Rosa", "Emma", "Rose"],
+        "last_name": ["Luxemburg", "Marx", "Luxemburg", "Goldman", "Luxembourg"],
+        "Email": ["rosa@example.org", "karl@example.org", "ROSA@example.org ",
+                  "emma@example.org", None],
+        "Mobile_Phone": ["407-444-0909", None, None, "407-721-7359", 4074440909.0],
+        "Address_Line_1": ["6123 Noble Ave", "4932 Data Dr", "6123 Noble Ave.",
+                           "87 Nope Ln", "6123 Noble Avenue"],
+        "Zip": ["32801-1234", "32803", "32801", "32804", "32801"],
+    })
+
+def test_candidates_only_share_blocks(roster):
+    pairs = candidate_pairs(blocking_keys(normalize_roster(roster)))
+    assert pairs[(0, 2)] == {"email", "name_zip"}
+    assert pairs[(0, 4)] == {"phone"}
+    assert all(1 not in pair and 3 not in pair for pair in pairs)
+
+def test_find_duplicates_groups_members(roster):
+    report = find_duplicates(roster, threshold=0.8)
+    assert list(report) == [[0, 2, 4]]
+    assert set(report.groups["AK_ID"]) == {1, 3, 5}
+    assert (report.pairs["score"] >= 0.8).all()
+
+def test_find_duplicates_skips_huge_blocks(roster):
+    assert not find_duplicates(roster, max_block=1)
+
+def test_memsynther_finds_no_duplicates_in_ideal_list(memsynther_ideallist):
+    assert not memsynther_ideallist.find_duplicates()
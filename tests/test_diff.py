@@ -0,0 +1,41 @@
+import pandas as pd
+import pytest
+
+from memsynth.diff import diff_rosters
+
+
+@pytest.mark.usefixtures("memsynther", "memsynther_ideallist")
+def test_diff_finds_changed_columns(memsynther, memsynther_ideallist):
+    diff = memsynther_ideallist.diff(memsynther)
+    assert diff.added.empty and diff.removed.empty
+    changed_cols = set(diff.changed.columns[diff.changed.any()])
+    assert {"last_name", "Home_Phone", "Mobile_Phone"}.issubset(changed_cols)
+    assert "Email" not in changed_cols
+
+    changes = diff.changes("last_name")
+    assert len(changes) == 1
+    row = changes.iloc[0]
+    assert row.AK_ID == 4845 and pd.isnull(row.old) and row.new == "Lilith"
+
+@pytest.mark.usefixtures("memsynther")
+def test_diff_finds_added_and_removed_members(memsynther):
+    old = memsynther.df.copy()
+    new = memsynther.df.drop(index=0)
+    new = pd.concat([new, old.iloc[[0]].assign(AK_ID=99999)], ignore_index=True)
+    new.AK_ID = new.AK_ID.astype('Int64')
+    diff = diff_rosters(old, new)
+    assert list(diff.added.index) == [99999]
+    assert list(diff.removed.index) == [12345]
+    assert diff.changed.empty
+    assert diff.changes().empty
+
+@pytest.mark.usefixtures("memsynther")
+def test_diff_of_identical_lists_is_empty(memsynther):
+    assert not memsynther.diff(memsynther.df.copy())
+
+@pytest.mark.usefixtures("memsynther")
+def test_diff_requires_unique_member_ids(memsynther):
+    dup = pd.concat([memsynther.df, memsynther.df.iloc[[0]]], ignore_index=True)
+    with pytest.raises(ValueError) as ex:
+        diff_rosters(memsynther.df, dup)
+    assert "'AK_ID' is not unique in the newer membership list" in str(ex.value)
@@ -1,8 +1,9 @@
 from numpy import nan
+import pandas as pd
 import pytest
 
 from memsynth import exceptions
-from memsynth.main import MemExpectation
+from memsynth.main import MemExpectation, MatchCache, match_cache, clear_match_caches
 
 try:
     import tests.conftest as fixtures
@@ -93,3 +94,134 @@ def test_nullable_fail_properly(correct_ak_id_exp):
     assert not chk and "nullable" in [
         n.name for f in correct_ak_id_exp.fails for n in f.why
     ]
+
+
+def _scalar_failures(exp, data):
+    """Reference results from the per-cell `_check_*` generators"""
+    failures = {}
+    for i, cell in enumerate(data):
+        for param_name in ("regex", "nullable"):
+            if param_name in exp.parameters:
+                for check, param in getattr(exp, "_check_" + param_name)(cell, i):
+                    if check is not None and not check:
+                        failures.setdefault(i, []).append(param.name)
+    return failures
+
+@pytest.mark.parametrize(
+    'exp_fixture, data', [
+        ('correct_ak_id_exp', fixtures.AK_ID_INCORRECT_DATA + [nan, 42]),
+        ('address_full_exp', fixtures.ADDRESSES + [nan, 1234]),
+        ('address_partial_exp', fixtures.ADDRESSES + [nan])
+    ]
+)
+def test_vectorized_check_matches_per_cell_checks(request, exp_fixture, data):
+    exp = request.getfixturevalue(exp_fixture)
+    exp.check(data)
+    found = {f.line: [w.name for w in f.why] for f in exp._fails}
+    assert found == _scalar_failures(exp, data)
+    assert all(f.data is data[f.line] for f in exp._fails)
+
+@pytest.mark.usefixtures("address_full_exp")
+def test_failure_store_counts_hard_and_soft_failures(address_full_exp):
+    NUMBER_OF_NULLS = 2
+    address_full_exp.check(fixtures.ADDRESSES + [nan]*NUMBER_OF_NULLS)
+    store = address_full_exp._fails
+    assert store.n_hard == NUMBER_OF_NULLS
+    assert store.n_soft == fixtures.ADDRESSES_SOFT_FAILS_FULL_MATCH
+    assert len(store) == NUMBER_OF_NULLS + fixtures.ADDRESSES_SOFT_FAILS_FULL_MATCH
+    assert address_full_exp.is_hard_failure()
+    assert not address_full_exp.is_soft_failure()
+
+@pytest.mark.usefixtures("address_full_exp")
+def test_failure_store_builds_failures_lazily(address_full_exp):
+    address_full_exp.check(fixtures.ADDRESSES + [nan])
+    soft_fails = address_full_exp.soft_fails
+    assert soft_fails[0].line == list(soft_fails)[0].line
+    assert all(f.is_soft and f.reasons == "regex" for f in soft_fails)
+    assert [f.line for f in address_full_exp.fails] == [len(fixtures.ADDRESSES)]
+
+@pytest.mark.usefixtures("correct_ak_id_exp")
+def test_failure_store_keeps_failures_across_chunks(correct_ak_id_exp):
+    data = fixtures.AK_ID_INCORRECT_DATA
+    correct_ak_id_exp.check(data[:2])
+    correct_ak_id_exp.check(data[2:], offset=2, clear=False)
+    chunked = [f.line for f in correct_ak_id_exp.fails]
+    correct_ak_id_exp.check(data)
+    assert chunked == [f.line for f in correct_ak_id_exp.fails] == [1, 4]
+
+@pytest.mark.usefixtures("correct_ak_id_exp")
+def test_failure_view_indexes_and_slices(correct_ak_id_exp):
+    correct_ak_id_exp.check(fixtures.AK_ID_INCORRECT_DATA)
+    fails = correct_ak_id_exp.fails
+    assert [f.line for f in fails[:2]] == [1, 4]
+    assert [f.line for f in fails[::-1]] == [4, 1]
+    assert fails[-1].line == 4 and fails[1:5] and not fails[5:]
+    assert [fails[i].line for i in range(len(fails))] == [1, 4]
+    with pytest.raises(IndexError):
+        fails[2]
+    correct_ak_id_exp.check(fixtures.AK_ID_INCORRECT_DATA[:2])
+    assert [f.line for f in correct_ak_id_exp.fails[:]] == [1]
+
+@pytest.mark.usefixtures("xdate_exp")
+def test_relative_to_comparison(xdate_exp):
+    frame = pd.DataFrame({
+        "Join_Date": pd.to_datetime(["2018-02-23", "2019-05-01", None, "2017-01-01"]),
+        "Xdate": pd.to_datetime(["2019-02-23", "2019-01-01", "2019-01-01", None]),
+    })
+    assert not xdate_exp.check(frame.Xdate, frame=frame)
+    assert [(f.line, f.reasons) for f in xdate_exp.fails] == [(1, "relative_to")]
+
+@pytest.mark.usefixtures("mobile_phone_exp")
+def test_relative_to_requirement(mobile_phone_exp):
+    frame = pd.DataFrame({
+        "Do_Not_Call": [False, True, False],
+        "Mobile_Phone": ["407-444-0909", nan, nan],
+    })
+    assert not mobile_phone_exp.check(frame.Mobile_Phone, frame=frame)
+    assert [f.line for f in mobile_phone_exp.fails] == [2]
+
+def test_relative_to_requirement_with_nulls_in_other_column(mobile_phone_exp):
+    frame = pd.DataFrame({
+        "Do_Not_Call": pd.array([False, None, True, False], dtype="boolean"),
+        "Mobile_Phone": ["407-444-0909", nan, nan, nan],
+    })
+    assert not mobile_phone_exp.check(frame.Mobile_Phone, frame=frame)
+    assert [f.line for f in mobile_phone_exp.fails] == [3]
+
+@pytest.mark.usefixtures("xdate_exp")
+def test_relative_to_is_skipped_without_other_columns(xdate_exp, caplog):
+    assert xdate_exp.check(pd.to_datetime(["2019-02-23"]))
+    assert "Skipping relative_to on 'Xdate'" in caplog.text
+
+def test_relative_to_with_unknown_relation():
+    with pytest.raises(exceptions.MemExpectationFormationError) as ex:
+        MemExpectation("Xdate", parameters=[
+            dict(name="data_type", value="date"),
+            dict(name="relative_to", value={"Join_Date": "before-ish"})
+        ])
+    assert "'before-ish' relative to 'Join_Date' is not a recognized" in str(ex.value)
+
+@pytest.mark.usefixtures("address_partial_exp")
+def test_regex_results_are_remembered_across_checks(address_partial_exp):
+    clear_match_caches()
+    matcher = address_partial_exp.plan.matchers[0]
+    address_partial_exp.check(fixtures.ADDRESSES * 3)
+    cache = match_cache(matcher)
+    assert (cache.misses, cache.hits) == (len(fixtures.ADDRESSES), 0)
+    # A second expectation from the same plan, eg. the next chunk or run
+    planned = MemExpectation.from_plan(address_partial_exp.plan)
+    planned.check(fixtures.ADDRESSES)
+    assert cache.hits == len(fixtures.ADDRESSES)
+    assert len(planned.soft_fails) == fixtures.ADDRESSES_SOFT_FAILS_PARTIAL_MATCH
+
+@pytest.mark.usefixtures("address_partial_exp")
+def test_match_cache_evicts_least_recently_used(address_partial_exp):
+    matcher = address_partial_exp.plan.matchers[0]
+    cache = MatchCache(maxsize=2)
+    assert list(cache.matches(matcher, ["6123 NOBLE AVE", "P.O. Box 7621"])) == \
+        [True, False]
+    cache.matches(matcher, ["4932 Data Dr"])
+    assert len(cache) == 2
+    assert list(cache.matches(matcher, ["4932 Data Dr", "P.O. Box 7621"])) == \
+        [True, False]
+    assert cache.misses == 3
@@ -0,0 +1,57 @@
+import csv
+import json
+
+import pandas as pd
+import pytest
+
+from memsynth.export import iter_failure_batches, FAILURE_FIELDS
+try:
+    import tests.conftest as fixtures
+except:
+    import conftest as fixtures
+
+
+@pytest.fixture
+def checked(memsynther):
+    memsynther.check_membership_list_on_parameters()
+    return memsynther
+
+def test_batches_match_failures(checked):
+    records = [
+        dict(zip(FAILURE_FIELDS, record))
+        for batch in iter_failure_batches(checked.expectations, batch_size=2)
+        for record in zip(*(batch[field] for field in FAILURE_FIELDS))
+    ]
+    hard = [r for r in records if not r["soft"]]
+    assert len(hard) == fixtures.NUM_HARD_FAILS
+    assert {r["column"] for r in hard} == fixtures.FAIL_COLS
+    soft = [r for r in records if r["soft"]]
+    assert {r["column"] for r in soft} == {fixtures.SOFT_FAIL_COL}
+    assert soft[0]["constraint"] == "regex"
+    assert soft[0]["value"] == "Bldg 4"
+
+def test_batches_without_soft(checked):
+    columns = {
+        col for batch in iter_failure_batches(checked.expectations, False)
+        for col in batch["column"]
+    }
+    assert columns == fixtures.FAIL_COLS
+
+@pytest.mark.parametrize("ext", [".csv", ".jsonl", ".parquet"])
+def test_export_failures(checked, tmp_path, ext):
+    fname = str(tmp_path / f"failures{ext}")
+    checked.export_failures(fname)
+    if ext == ".csv":
+        with open(fname) as f:
+            rows = list(csv.DictReader(f))
+    elif ext == ".jsonl":
+        with open(fname) as f:
+            rows = [json.loads(line) for line in f]
+    else:
+        rows = pd.read_parquet(fname).to_dict(orient="records")
+    assert len(rows) == fixtures.NUM_HARD_FAILS + 1
+    assert set(rows[0]) == set(FAILURE_FIELDS)
+
+def test_export_failures_unknown_format(checked, tmp_path):
+    with pytest.raises(ValueError):
+        checked.export_failures(str(tmp_path / "failures.txt"))
@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from memsynth.instrumentation import Instrumentation, NULL_INSTRUMENTATION
+from memsynth.main import MemSynther
+try:
+    import tests.conftest as fixtures
+except:
+    import conftest as fixtures
+
+
+@pytest.fixture
+def instrumented_memsynther():
+    msy = MemSynther(instrumentation=Instrumentation())
+    msy.load_expectations_from_json(fixtures.PARAM_JSON_FILE)
+    msy.load_from_excel(fixtures.FAKE_MEM_LIST)
+    return msy
+
+@pytest.mark.usefixtures("instrumented_memsynther")
+def test_instrumentation_records_every_stage(instrumented_memsynther):
+    instrumented_memsynther.check_membership_list_on_parameters()
+    report = instrumented_memsynther.instrumentation.report()
+    stages = report["stages"]
+    assert stages["read"]["rows"] == 3 and stages["verify"]["calls"] == 1
+    for col in instrumented_memsynther.expectations:
+        assert f"load.{col}" in stages and f"check.{col}" in stages
+    assert stages["check.Email.regex"]["rows"] == 3
+    assert stages["check.Email"]["rows_per_sec"] > 0
+    assert json.loads(instrumented_memsynther.instrumentation.to_json()) == report
+
+@pytest.mark.parametrize('workers, executor', [(None, 'thread'), (2, 'process')])
+@pytest.mark.usefixtures("instrumented_memsynther")
+def test_instrumentation_counts_failures(instrumented_memsynther, workers, executor):
+    instrumented_memsynther.check_membership_list_on_parameters(
+        workers=workers, executor=executor
+    )
+    counters = instrumented_memsynther.instrumentation.report()["counters"]
+    hard = {
+        name.split(".")[1]: n for name, n in counters.items()
+        if name.endswith(".hard")
+    }
+    assert set(hard) == fixtures.FAIL_COLS
+    assert sum(hard.values()) == fixtures.NUM_HARD_FAILS
+    assert counters["failures.Address_Line_2.soft"] == 1
+
+def test_instrumentation_hooks():
+    stages, counts = [], []
+    instrumentation = Instrumentation(
+        on_stage=lambda *args: stages.append(args),
+        on_count=lambda *args: counts.append(args)
+    )
+    with instrumentation.stage("read", rows=10):
+        pass
+    instrumentation.count("failures.Email.hard", 2)
+    instrumentation.count("failures.Email.soft", 0)
+    assert [(name, rows) for name, _, rows in stages] == [("read", 10)]
+    assert counts == [("failures.Email.hard", 2)]
+    instrumentation.reset()
+    assert instrumentation.report() == {"stages": {}, "counters": {}}
+
+@pytest.mark.usefixtures("memsynther")
+def test_instrumentation_is_off_by_default(memsynther):
+    memsynther.check_membership_list_on_parameters()
+    assert memsynther.instrumentation is NULL_INSTRUMENTATION
+    assert NULL_INSTRUMENTATION.report() == {"stages": {}, "counters": {}}
@@ -1,7 +1,9 @@
+import json
 import pytest
 import pandas as pd
 
 from memsynth import exceptions, config
+from memsynth.main import MemSynther
 try:
     import tests.conftest as fixtures
 except:
@@ -50,10 +52,10 @@ def test_wrong_number_of_cols(memsynther, col, add_or_del):
         if add_or_del == 'add':
             memsynther.df[col] = [[]] * len(memsynther.df)
         elif add_or_del == 'del':
-            memsynther.df.drop(col, 1, inplace=True)
+            memsynther.df.drop(columns=col, inplace=True)
         else:
             memsynther.df[col[1]] = [[]] * len(memsynther.df)
-            memsynther.df.drop(col[0], 1, inplace=True)
+            memsynther.df.drop(columns=col[0], inplace=True)
 
         memsynther._verify_memlist_format()
 
@@ -80,6 +82,160 @@ def test_softload_verify_memlist_format(memsynther):
 
 @pytest.mark.usefixtures("memsynther")
 def test_non_required_parameters_dont_raise_errors(memsynther):
-    memsynther.df.drop("State", 1, inplace=True)
+    memsynther.df.drop(columns="State", inplace=True)
     df = memsynther._verify_memlist_format()
-    assert hasattr(df, 'columns')
\ No newline at end of file
+    assert hasattr(df, 'columns')
+
+@pytest.fixture
+def fake_mem_list_csv(tmp_path):
+    fname = str(tmp_path / "fakeodsa.csv")
+    pd.read_excel(fixtures.FAKE_MEM_LIST).to_csv(fname, index=False)
+    return fname
+
+@pytest.fixture
+def fake_mem_list_parquet(tmp_path):
+    fname = str(tmp_path / "fakeodsa.parquet")
+    df = pd.read_excel(fixtures.FAKE_MEM_LIST)
+    # Parquet needs a single type per column, so store objects as strings
+    for col in df.columns[df.dtypes == object]:
+        df[col] = df[col].map(lambda x: x if pd.isnull(x) else str(x))
+    df.to_parquet(fname)
+    return fname
+
+@pytest.mark.usefixtures("memsynther")
+def test_load_from_csv_matches_load_from_excel(memsynther, fake_mem_list_csv):
+    msy = MemSynther()
+    msy.load_expectations_from_json(fixtures.PARAM_JSON_FILE)
+    msy.load_from_csv(fake_mem_list_csv)
+    assert msy.name == "fakeodsa.csv"
+    assert list(msy.df.columns) == list(memsynther.df.columns)
+    assert msy.df.AK_ID.dtype == 'Int64'
+    assert msy.df.Xdate.dtype == "datetime64[ns]"
+    assert msy.df.first_name.dtype == 'object'
+    assert msy.check_membership_list_on_parameters() == False
+    assert set(msy.return_failure_dict()) == fixtures.FAIL_COLS
+
+def test_load_from_csv_projects_extra_columns_on_softload(fake_mem_list_csv):
+    df = pd.read_csv(fake_mem_list_csv)
+    df['extraneousCol'] = 1
+    df.to_csv(fake_mem_list_csv, index=False)
+    msy = MemSynther()
+    msy.load_expectations_from_json(fixtures.PARAM_JSON_FILE)
+    with pytest.raises(exceptions.LoadMembershipListException) as ex:
+        msy.load_from_csv(fake_mem_list_csv)
+    assert "added new columns" in str(ex.value)
+    msy.load_from_csv(fake_mem_list_csv, softload=True)
+    assert "extraneousCol" not in msy.df.columns
+
+def test_load_from_parquet(fake_mem_list_parquet):
+    pytest.importorskip("pyarrow")
+    msy = MemSynther()
+    msy.load_expectations_from_json(fixtures.PARAM_JSON_FILE)
+    msy.load_from_parquet(fake_mem_list_parquet)
+    assert msy.df.AK_ID.dtype == 'Int64'
+    assert len(msy.df) == len(pd.read_excel(fixtures.FAKE_MEM_LIST))
+    assert msy.check_membership_list_on_parameters() == False
+    assert set(msy.return_failure_dict()) == fixtures.FAIL_COLS
+
+@pytest.mark.parametrize("fname", ["fake_mem_list_csv", "fake_mem_list_parquet"])
+def test_load_from_file_picks_loader_by_extension(fname, request):
+    flist = request.getfixturevalue(fname)
+    msy = MemSynther()
+    msy.load_expectations_from_json(fixtures.PARAM_JSON_FILE)
+    msy.load_from_file(flist)
+    assert msy.df.AK_ID.dtype == 'Int64'
+    with pytest.raises(exceptions.LoadMembershipListException):
+        msy.load_from_file(fixtures.PARAM_JSON_FILE)
+
+def test_load_converts_without_raising_and_reports_failures(tmp_path):
+    raw = pd.read_excel(fixtures.FAKE_MEM_LIST)
+    raw.index = [10, 20, 30]
+    raw["AK_ID"] = ["12345", "not an id", 4845.5]
+    raw["Do_Not_Call"] = ["FALSE", "yes", 0]
+    raw["Xdate"] = ["2/23/2019", "someday", None]
+    msy = MemSynther(quiet=True)
+    msy.load_expectations_from_json(fixtures.PARAM_JSON_FILE)
+    msy.load_from_memory(raw)
+    assert list(msy.df.index) == [10, 20, 30]
+    assert msy.df.AK_ID.dtype == 'Int64'
+    assert msy.df.AK_ID.isna().tolist() == [False, True, True]
+    assert msy.df.Do_Not_Call.tolist() == [False, True, False]
+    assert msy.df.Xdate.dtype == "datetime64[ns]"
+    assert list(msy.conversion_failures["AK_ID"].index) == [20, 30]
+    assert list(msy.conversion_failures["Xdate"].index) == [20]
+    assert "Do_Not_Call" not in msy.conversion_failures
+
+    # Reading a CSV reports the same values instead of raising
+    fname = str(tmp_path / "fakeodsa.csv")
+    raw.assign(AK_ID=["12345", "12x", "4845.5"]).to_csv(fname, index=False)
+    msy.load_from_csv(fname)
+    assert msy.df.AK_ID.dtype == 'Int64'
+    assert msy.df.AK_ID.isna().tolist() == [False, True, True]
+    assert msy.conversion_failures["AK_ID"].tolist() == ["12x", "4845.5"]
+    assert msy.conversion_failures["Xdate"].tolist() == ["someday"]
+
+def test_load_parses_dates_in_mixed_formats():
+    raw = pd.read_excel(fixtures.FAKE_MEM_LIST)
+    raw["Xdate"] = ["2/23/2019", "2019-05-01", "March 3, 2018"]
+    msy = MemSynther(quiet=True)
+    msy.load_expectations_from_json(fixtures.PARAM_JSON_FILE)
+    msy.load_from_memory(raw)
+    assert msy.df.Xdate.tolist() == [
+        pd.Timestamp("2019-02-23"), pd.Timestamp("2019-05-01"),
+        pd.Timestamp("2018-03-03")
+    ]
+    assert "Xdate" not in msy.conversion_failures
+
+def _with_data_type_args(tmp_path, **args):
+    """Writes the test expectations with arguments on some data_types"""
+    with open(fixtures.PARAM_JSON_FILE) as f:
+        expectations = json.load(f)
+    for col, col_args in args.items():
+        for param in expectations[col]["parameters"]:
+            if param["name"] == "data_type":
+                param["args"] = col_args
+    fname = tmp_path / "params.json"
+    fname.write_text(json.dumps(expectations))
+    return str(fname)
+
+def test_load_honors_storage_and_downcast(tmp_path):
+    msy = MemSynther(quiet=True)
+    msy.load_expectations_from_json(_with_data_type_args(
+        tmp_path, AK_ID={"downcast": True}, City={"storage": "category"},
+        Email={"storage": "string"}, State={"storage": "object"},
+    ))
+    msy.load_from_excel(fixtures.FAKE_MEM_LIST)
+    assert msy.df.AK_ID.dtype == "Int16"
+    assert msy.df.City.dtype == "category"
+    assert msy.df.Email.dtype == "string"
+    assert msy.df.State.dtype == object
+    assert msy.check_membership_list_on_parameters() == False
+    assert set(msy.return_failure_dict()) == fixtures.FAIL_COLS
+
+def test_load_rejects_storage_of_non_strings(tmp_path):
+    fname = _with_data_type_args(tmp_path, AK_ID={"storage": "category"})
+    with pytest.raises(exceptions.MemExpectationFormationError):
+        MemSynther().load_expectations_from_json(fname)
+
+def test_load_makes_low_cardinality_strings_categorical(monkeypatch):
+    raw = pd.read_excel(fixtures.FAKE_MEM_LIST)
+    raw = raw.loc[raw.index.repeat(config.CATEGORY_MIN_ROWS)].reset_index(drop=True)
+    raw["AK_ID"] = range(len(raw))
+    raw["Email"] = [f"member{i}@example.org" for i in range(len(raw))]
+    msy = MemSynther(quiet=True)
+    msy.load_expectations_from_json(fixtures.PARAM_JSON_FILE)
+    msy.load_from_memory(raw.copy())
+    assert msy.df.State.dtype == "category"
+    assert msy.df.Email.dtype == object
+    assert msy.df.memory_usage(deep=True).sum() < raw.memory_usage(deep=True).sum()
+
+    msy.check_membership_list_on_parameters()
+    monkeypatch.setattr("memsynth.main.CATEGORY_MIN_ROWS", len(raw) + 1)
+    plain = MemSynther(quiet=True)
+    plain.load_expectations_from_json(fixtures.PARAM_JSON_FILE)
+    plain.load_from_memory(raw.copy())
+    assert plain.df.State.dtype == object
+    plain.check_membership_list_on_parameters()
+    for col, expectation in msy.expectations.items():
+        assert [f.line for f in expectation._fails] == \
+            [f.line for f in plain.expectations[col]._fails]
@@ -2,9 +2,12 @@ import itertools
 import logging
 
 from numpy import nan
+import pandas as pd
 import pytest
 
 from memsynth import exceptions, config
+from memsynth.main import CheckHistory, CheckSnapshot, MemExpectation, MemSynther, \
+    check_history, clear_check_histories
 try:
     import tests.conftest as fixtures
 except:
@@ -149,3 +152,228 @@ def test_report_failures_return_proper_msgs(memsynther, caplog, repsoft):
         assert "1 failures found on column 'Address_Line_2'" in logd_msgs
     else:
         assert "1 failures found on column 'Address_Line_2'" not in logd_msgs
+
+@pytest.mark.usefixtures("memsynther")
+def test_report_failures_prints_to_console_once(memsynther, capsys):
+    memsynther.check_membership_list_on_parameters()
+    memsynther.report_failures()
+    memsynther.report_failures()
+    out = capsys.readouterr().out
+    assert out.count("ERROR - HARD failure on the 'nullable' constraint") == 2
+    # The handler is only there while reporting
+    assert not any(
+        getattr(h, "_memsynth_console", False) for h in memsynther.logger.handlers
+    )
+
+@pytest.mark.parametrize('executor', ['thread', 'process'])
+@pytest.mark.usefixtures("memsynther")
+def test_parallel_check_matches_serial_check(memsynther, executor):
+    assert memsynther.check_membership_list_on_parameters() == False
+    serial = {
+        col: [(f.line, f.reasons) for f in fails]
+        for col, fails in memsynther.return_failure_dict(include_soft=True).items()
+    }
+    assert memsynther.check_membership_list_on_parameters(
+        workers=4, executor=executor
+    ) == False
+    parallel = {
+        col: [(f.line, f.reasons) for f in fails]
+        for col, fails in memsynther.return_failure_dict(include_soft=True).items()
+    }
+    assert parallel == serial
+
+@pytest.mark.usefixtures("memsynther")
+def test_parallel_check_rejects_unknown_executor(memsynther):
+    with pytest.raises(ValueError) as ex:
+        memsynther.check_membership_list_on_parameters(workers=2, executor="gpu")
+    assert "Unknown executor 'gpu'" in str(ex.value)
+
+def _failure_lines(memsynther):
+    return {
+        (col, f.line, f.reasons)
+        for col, f in memsynther.get_failures(include_soft=True)
+    }
+
+@pytest.mark.parametrize('chunksize', [1, 2, 10])
+@pytest.mark.usefixtures("memsynther")
+def test_chunked_xlsx_check_matches_whole_list_check(memsynther, chunksize):
+    memsynther.check_membership_list_on_parameters()
+    expected = _failure_lines(memsynther)
+
+    streamed = MemSynther()
+    streamed.load_expectations_from_json(fixtures.PARAM_JSON_FILE)
+    assert streamed.check_membership_list_in_chunks(
+        fixtures.FAKE_MEM_LIST, chunksize=chunksize
+    ) == False
+    assert streamed.df is None
+    assert _failure_lines(streamed) == expected
+
+@pytest.mark.usefixtures("memsynther")
+def test_chunked_csv_check_keeps_global_line_numbers(memsynther, tmp_path):
+    fname = str(tmp_path / "fakeodsa.csv")
+    pd.read_excel(fixtures.FAKE_MEM_LIST).to_csv(fname, index=False)
+    memsynther.check_membership_list_on_parameters()
+    expected = _failure_lines(memsynther)
+
+    streamed = MemSynther()
+    streamed.load_expectations_from_json(fixtures.PARAM_JSON_FILE)
+    assert streamed.check_membership_list_in_chunks(fname, chunksize=1) == False
+    assert streamed.name == "fakeodsa.csv"
+    assert _failure_lines(streamed) == expected
+
+def test_chunked_check_rejects_unknown_file_type():
+    msy = MemSynther()
+    msy.load_expectations_from_json(fixtures.PARAM_JSON_FILE)
+    with pytest.raises(exceptions.LoadMembershipListException) as ex:
+        msy.check_membership_list_in_chunks(fixtures.PARAM_JSON_FILE)
+    assert "Cannot read '.json' files in chunks" in str(ex.value)
+
+def _hard_failing_columns(msy):
+    return [col for col, exp in msy.expectations.items() if exp.is_hard_failure()]
+
+@pytest.mark.parametrize('workers', [None, 1])
+@pytest.mark.usefixtures("memsynther")
+def test_fail_fast_stops_at_first_hard_failure(memsynther, workers):
+    clear_check_histories()
+    memsynther.check_membership_list_on_parameters()
+    expected = _failure_lines(memsynther)
+    assert memsynther.skipped_columns == []
+
+    assert memsynther.check_membership_list_on_parameters(
+        fail_fast=True, workers=workers
+    ) == False
+    failing = _hard_failing_columns(memsynther)
+    assert len(failing) == 1
+    assert memsynther.skipped_columns
+    assert failing[0] not in memsynther.skipped_columns
+    assert all(
+        len(memsynther.expectations[col]._fails) == 0
+        for col in memsynther.skipped_columns
+    )
+    assert _failure_lines(memsynther) <= expected
+
+@pytest.mark.usefixtures("memsynther_ideallist")
+def test_fail_fast_checks_every_column_of_passing_list(memsynther_ideallist):
+    assert memsynther_ideallist.check_membership_list_on_parameters(fail_fast=True)
+    assert memsynther_ideallist.skipped_columns == []
+
+@pytest.mark.parametrize('executor', ['thread', 'process'])
+@pytest.mark.usefixtures("memsynther")
+def test_parallel_check_records_check_history(memsynther, executor):
+    clear_check_histories()
+    memsynther.check_membership_list_on_parameters(workers=2, executor=executor)
+    history = check_history(memsynther.plan)
+    for col in memsynther.expectations:
+        assert history.cost(col) is not None
+    failing = set(_hard_failing_columns(memsynther))
+    assert failing == fixtures.FAIL_COLS
+    for col in memsynther.expectations:
+        assert history.likelihood(col) == (2 / 3 if col in failing else 1 / 3)
+
+def test_check_history_orders_likely_and_cheap_columns_first():
+    history = CheckHistory()
+    history.record("Email", True, 1.0, 100)
+    history.record("Zip", True, 0.1, 100)
+    history.record("State", False, 0.1, 100)
+    assert history.order(["State", "Email", "Zip", "City"]) == \
+        ["Zip", "State", "City", "Email"]
+
+@pytest.mark.usefixtures("memsynther")
+def test_failure_cap_keeps_counting(memsynther):
+    memsynther.check_membership_list_on_parameters()
+    totals = {
+        col: (exp._fails.total_hard, exp._fails.total_soft)
+        for col, exp in memsynther.expectations.items()
+    }
+    assert memsynther.check_membership_list_on_parameters(
+        max_failures_per_column=1
+    ) == False
+    for col, exp in memsynther.expectations.items():
+        assert len(exp._fails) <= 1
+        assert (exp._fails.total_hard, exp._fails.total_soft) == totals[col]
+        # Hard failures are kept over soft ones
+        assert exp.is_hard_failure() == (len(exp.fails) == 1)
+
+@pytest.mark.usefixtures("memsynther")
+def test_chunked_check_fails_fast(memsynther):
+    streamed = MemSynther()
+    streamed.load_expectations_from_json(fixtures.PARAM_JSON_FILE)
+    assert streamed.check_membership_list_in_chunks(
+        fixtures.FAKE_MEM_LIST, chunksize=1, fail_fast=True
+    ) == False
+    assert len(_hard_failing_columns(streamed)) == 1
+
+@pytest.mark.usefixtures("memsynther")
+def test_incremental_check_only_checks_changed_rows(memsynther, monkeypatch, tmp_path):
+    memsynther.check_membership_list_on_parameters()
+    fname = str(tmp_path / "snapshot.pkl")
+    memsynther.snapshot().save(fname)
+
+    msy = MemSynther()
+    msy.load_expectations_from_json(fixtures.PARAM_JSON_FILE)
+    msy.load_from_excel(fixtures.FAKE_MEM_LIST)
+    # Fix one member's home phone, and move another member to the top
+    msy.df.at[0, 'Home_Phone'] = '410-564-4639'
+    msy.df = msy.df.iloc[[2, 0, 1]].reset_index(drop=True)
+
+    checked = []
+    original_check = MemExpectation.check
+    def check(exp, data, *args, **kwargs):
+        checked.append(len(data))
+        return original_check(exp, data, *args, **kwargs)
+    monkeypatch.setattr(MemExpectation, "check", check)
+
+    snapshot = CheckSnapshot.load(fname)
+    assert msy.check_membership_list_incrementally(snapshot) == False
+    assert set(checked) == {1}
+    incremental = _failure_lines(msy)
+
+    monkeypatch.setattr(MemExpectation, "check", original_check)
+    msy.check_membership_list_on_parameters()
+    assert incremental == _failure_lines(msy)
+    assert ('Home_Phone', 0, 'regex') in incremental
+    assert len(msy.return_failure_dict()['Home_Phone']) == 1
+
+@pytest.mark.usefixtures("memsynther")
+def test_incremental_check_with_changed_expectations_checks_everything(memsynther):
+    memsynther.check_membership_list_on_parameters()
+    snapshot = memsynther.snapshot()
+    snapshot.expectations_json = "{}"
+    assert memsynther.check_membership_list_incrementally(snapshot) == False
+    assert len(memsynther.return_failure_dict()) == len(fixtures.FAIL_COLS)
+
+@pytest.mark.parametrize('workers', [None, 2])
+@pytest.mark.usefixtures("memsynther_ideallist")
+def test_relative_to_fails_when_xdate_is_before_join_date(memsynther_ideallist, workers):
+    memsynther_ideallist.df.at[1, "Xdate"] = pd.Timestamp("2000-01-01")
+    assert memsynther_ideallist.check_membership_list_on_parameters(
+        workers=workers
+    ) == False
+    fails = memsynther_ideallist.return_failure_dict()
+    assert list(fails) == ["Xdate"]
+    assert [(f.line, f.reasons) for f in fails["Xdate"]] == [(1, "relative_to")]
+
+@pytest.mark.usefixtures("memsynther")
+def test_check_logs_failures_in_one_batch_per_column(memsynther, caplog):
+    caplog.set_level(logging.INFO)
+    memsynther.check_membership_list_on_parameters()
+    failure_logs = [
+        rec for rec in caplog.records
+        if rec.name == "MemExpectation" and rec.levelno >= logging.WARNING
+    ]
+    assert sorted(rec.getMessage().split("'")[1] for rec in failure_logs) == \
+        sorted(fixtures.FAIL_COLS | {fixtures.SOFT_FAIL_COL})
+    home_phone = [r.getMessage() for r in failure_logs if "'Home_Phone'" in r.getMessage()]
+    assert home_phone[0].startswith("Found 2 lines with hard failures")
+
+def test_quiet_check_does_not_log_failures(caplog):
+    msy = MemSynther(quiet=True)
+    msy.load_expectations_from_json(fixtures.PARAM_JSON_FILE)
+    msy.load_from_excel(fixtures.FAKE_MEM_LIST)
+    caplog.set_level(logging.INFO)
+    assert msy.check_membership_list_on_parameters() == False
+    assert not [
+        rec for rec in caplog.records
+        if rec.name == "MemExpectation" and rec.levelno >= logging.WARNING
+    ]
+    assert len(msy.return_failure_dict()) == len(fixtures.FAIL_COLS)
@@ -0,0 +1,112 @@
+import copy
+import pickle
+import re
+
+import pytest
+
+import memsynth.exceptions as ex
+from memsynth.main import MemExpectation, MemSynther, _matches
+from memsynth.plan import compile_expectation, compile_plan, load_plan
+try:
+    import tests.conftest as fixtures
+except:
+    import conftest as fixtures
+
+
+def test_plans_are_shared_by_memsynthers():
+    first, second = MemSynther(), MemSynther()
+    first.load_expectations_from_json(fixtures.PARAM_JSON_FILE)
+    second.load_expectations_from_json(fixtures.PARAM_JSON_FILE)
+    assert first.plan is second.plan
+    assert first.plan is load_plan(fixtures.PARAM_JSON_FILE)
+    # Failures are still kept apart
+    assert first.expectations["Email"] is not second.expectations["Email"]
+    assert first.expectations["Email"].plan is second.expectations["Email"].plan
+
+def test_plans_are_keyed_on_json_content():
+    with open(fixtures.PARAM_JSON_FILE) as f:
+        expectations_json = f.read()
+    assert compile_plan(expectations_json) is compile_plan(expectations_json)
+    assert compile_plan(expectations_json + "\n") is not compile_plan(expectations_json)
+
+def test_compiling_does_not_modify_parameters():
+    params = copy.deepcopy(fixtures.ADDRESS_PARAMS_FULL_MATCH)
+    params["parameters"][2]["value"] = params["parameters"][2]["value"].pattern
+    plan = compile_expectation("Address", **params)
+    assert isinstance(params["parameters"][2]["value"], str)
+    assert plan.checks == ("regex", "nullable")
+    assert plan.dtype == "object"
+    assert plan.patterns[0].pattern.endswith("\\Z")
+
+def test_expectations_from_plan_check_like_formed_ones():
+    formed = MemExpectation("Address", **fixtures.ADDRESS_PARAMS_PARTIAL_MATCH)
+    planned = MemExpectation.from_plan(formed.plan)
+    formed.check(fixtures.ADDRESSES)
+    planned.check(fixtures.ADDRESSES)
+    assert [f.line for f in planned.soft_fails] == [f.line for f in formed.soft_fails]
+    assert len(planned.soft_fails) == fixtures.ADDRESSES_SOFT_FAILS_PARTIAL_MATCH
+
+def test_repeated_unique_parameters_raise_errors():
+    params = fixtures.ADDRESS_PARAMS["parameters"] + [dict(name="nullable", value=True)]
+    with pytest.raises(ex.MemExpectationFormationError, match="multiple 'nullable'"):
+        compile_expectation("Address", params)
+
+@pytest.mark.usefixtures("memsynther")
+def test_plans_survive_pickling(memsynther):
+    plan = pickle.loads(pickle.dumps(memsynther.plan))
+    assert plan.expectations_json == memsynther.plan.expectations_json
+    assert plan["Email"] == memsynther.plan["Email"]
+    exp = pickle.loads(pickle.dumps(memsynther.expectations["Email"]))
+    assert exp.check(memsynther.df["Email"]) == \
+        memsynther.expectations["Email"].check(memsynther.df["Email"])
+
+@pytest.mark.parametrize("pattern, args, kind", [
+    ("United States", None, "prefix"),
+    ("^annual$", None, "in"),
+    ("annual", {"match": "full"}, "in"),
+    ("", {"match": "us_states"}, "in_upper"),
+    ("^\\d{5}$", None, "regex"),
+])
+def test_regexes_are_classified_and_match_like_patterns(pattern, args, kind):
+    plan = compile_expectation("Col", [
+        dict(name="data_type", value="string"),
+        dict(name="regex", value=pattern, args=args),
+    ])
+    assert plan.matchers[0].kind == kind
+    strs = ["United States", "United", "annual", "annual\n", "annually",
+            "FL", "fl", "Fla", "32801", "", "12345\n"]
+    assert list(_matches(plan.matchers[0], strs)) == \
+        [plan.patterns[0].match(s) is not None for s in strs]
+
+def test_regex_flags_are_compiled_in():
+    plan = compile_expectation("Col", [
+        dict(name="data_type", value="string"),
+        dict(name="regex", value="unit [a-z]+", args={"flags": [2]}),
+    ])
+    assert plan.patterns[0].flags & re.IGNORECASE
+    assert plan.matchers[0].kind == "regex"
+    assert list(_matches(plan.matchers[0], ["UNIT B", "apt b"])) == [True, False]
+
+@pytest.mark.parametrize("flag", [
+    re.IGNORECASE, re.MULTILINE, re.DOTALL, re.VERBOSE, re.ASCII
+])
+@pytest.mark.parametrize("pattern, args", [
+    ("unit a", None), ("abc$", None), ("^abc", None), ("abc", {"match": "full"}),
+])
+def test_regexes_with_flags_match_like_patterns(flag, pattern, args):
+    plan = compile_expectation("Col", [
+        dict(name="data_type", value="string"),
+        dict(name="regex", value=pattern, args=dict(args or {}, flags=[int(flag)])),
+    ])
+    strs = ["unit a", "unita", "UNIT A", "abc", "ABC", "abc\n", "abc\nx",
+            "abcd", "x\nabc", ""]
+    assert list(_matches(plan.matchers[0], strs)) == \
+        [plan.patterns[0].match(s) is not None for s in strs]
+
+@pytest.mark.parametrize("flags", [["i"], [True], [1 << 20]])
+def test_unknown_regex_flags_raise_errors(flags):
+    with pytest.raises(ex.MemExpectationFormationError, match="not a regular"):
+        compile_expectation("Col", [
+            dict(name="data_type", value="string"),
+            dict(name="regex", value="unit", args={"flags": flags}),
+        ])
@@ -0,0 +1,53 @@
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pytest
+
+from memsynth.main import MemSynther
+from memsynth.shared import SharedRoster
+
+pytest.importorskip("pyarrow")
+
+
+def _lines_per_zip(roster):
+    msy = MemSynther()
+    msy.load_from_shared(roster, columns=["Zip"])
+    return list(msy.df.columns), len(msy.df)
+
+def test_shared_roster_round_trips_dtypes_and_values(memsynther, tmp_path):
+    with memsynther.share(str(tmp_path / "roster.arrow")) as roster:
+        df = roster.read()
+    assert roster.pickled == ("Home_Phone",)
+    assert list(df.columns) == list(memsynther.df.columns)
+    for col in df.columns:
+        expected = memsynther.df[col].reset_index(drop=True)
+        assert df[col].dtype == expected.dtype
+        assert df[col].equals(expected)
+    assert os.path.exists(roster.path)
+
+def test_shared_roster_reads_columns_in_workers(memsynther):
+    roster = memsynther.share()
+    assert len(pickle.dumps(roster)) < 1024
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        assert pool.submit(_lines_per_zip, roster).result() == \
+            (["Zip"], len(memsynther.df))
+    # Unpickled copies do not remove the file of the process that wrote it
+    pickle.loads(pickle.dumps(roster)).close()
+    assert os.path.exists(roster.path)
+    roster.close()
+    assert not os.path.exists(roster.path)
+
+def test_shared_roster_keeps_categoricals():
+    # Categories of object dtype, as `MemSynther._categorize` makes them
+    df = pd.DataFrame({"State": pd.Categorical.from_codes(
+        [0, -1, 1, 0], categories=pd.Index(["FL", "GA"], dtype=object)
+    )})
+    with SharedRoster.write(df) as roster:
+        read = roster.read()["State"]
+        with pytest.raises(KeyError):
+            roster.read(["Zip"])
+    assert read.dtype == "category"
+    assert read.cat.categories.dtype == object
+    assert read.equals(df["State"])
@@ -0,0 +1,46 @@
+import subprocess
+import sys
+
+import pytest
+
+from memsynth.config import ROOT_DIR
+from memsynth.utils import LazyModule
+
+HEAVY_MODULES = ("pandas", "numpy", "yaml", "coloredlogs")
+# Most time, in milliseconds, importing a module may take
+IMPORT_BUDGET_MS = 100
+
+
+def _import_in_subprocess(module, *flags):
+    return subprocess.run(
+        [sys.executable, *flags, "-c",
+         f"import sys, {module}; print(' '.join(sorted(sys.modules)))"],
+        cwd=ROOT_DIR, capture_output=True, text=True, check=True
+    )
+
+@pytest.mark.parametrize("module", [
+    "memsynth.main", "memsynth.batch", "memsynth.cli", "memsynth.plan",
+    "memsynth.cache", "memsynth.diff", "memsynth.utils"
+])
+def test_import_does_not_load_heavy_modules(module):
+    loaded = set(_import_in_subprocess(module).stdout.split())
+    assert loaded.isdisjoint(HEAVY_MODULES)
+
+@pytest.mark.parametrize("module", ["memsynth.cli", "memsynth.plan"])
+def test_import_time_budget(module):
+    # Import once so that the timed run reads compiled bytecode
+    _import_in_subprocess(module)
+    stderr = _import_in_subprocess(module, "-X", "importtime").stderr
+    for line in stderr.splitlines():
+        _, cumulative_us, name = line.split("|")
+        if name.strip() == module:
+            assert int(cumulative_us) / 1000 < IMPORT_BUDGET_MS
+            break
+    else:
+        pytest.fail(f"'{module}' was not imported")
+
+def test_lazy_module_imports_on_first_use():
+    json = LazyModule("json")
+    assert "not imported" in repr(json)
+    assert json.loads("[1]") == [1]
+    assert "not imported" not in repr(json)
@@ -0,0 +1,62 @@
+import pandas as pd
+import pytest
+
+from memsynth.main import MemSynther
+from memsynth.store import MembershipStore
+try:
+    import tests.conftest as fixtures
+except:
+    import conftest as fixtures
+
+
+@pytest.fixture
+def store(tmp_path):
+    with MembershipStore(str(tmp_path / "members.sqlite3")) as store:
+        yield store
+
+def test_ingest_and_load_round_trip(memsynther, store):
+    assert memsynther.save_to_store(store) == len(memsynther.df)
+    df = store.load().set_index("AK_ID")
+    expected = memsynther.df.set_index("AK_ID").loc[df.index]
+    assert dict(df.dtypes) == dict(expected.dtypes)
+    for col in ("first_name", "Zip", "Do_Not_Call", "Xdate", "DSA_ID"):
+        assert df[col].equals(expected[col])
+
+def test_ingest_upserts_on_key(memsynther, store):
+    store.ingest(memsynther.df)
+    changed = memsynther.df.iloc[:1].copy()
+    changed["Email"] = "rosa@example.org"
+    new = memsynther.df.iloc[:1].copy()
+    new["AK_ID"] = pd.array([99999], dtype="Int64")
+    store.ingest(pd.concat([changed, new], ignore_index=True))
+    assert len(store) == len(memsynther.df) + 1
+    loaded = store.load(columns=["AK_ID"], Email="rosa@example.org")
+    assert loaded["AK_ID"].tolist() == [changed["AK_ID"].iloc[0]]
+
+def test_load_filters_and_indexes(memsynther, store):
+    store.ingest(memsynther.df)
+    indexes = {row[0] for row in store.conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index'"
+    )}
+    assert {"ix_members_Email", "ix_members_Zip", "ix_members_Memb_status"} <= indexes
+    zips = memsynther.df["Zip"].tolist()[:2]
+    assert sorted(store.load(Zip=zips)["Zip"]) == sorted(zips)
+    assert len(store.load(where='"AK_ID" > ?', params=(10000,))) == \
+        int((memsynther.df["AK_ID"] > 10000).sum())
+
+def test_load_is_in_order_of_the_key(store):
+    store.ingest(pd.DataFrame({"AK_ID": ["z", "y", "x"], "Zip": ["1", "2", "3"]}))
+    assert store.load()["AK_ID"].tolist() == ["x", "y", "z"]
+    assert store.load(columns=["Zip"])["Zip"].tolist() == ["3", "2", "1"]
+
+def test_memsynther_loads_from_store(memsynther, store):
+    memsynther.save_to_store(store)
+    msy = MemSynther()
+    msy.load_expectations_from_json(fixtures.PARAM_JSON_FILE)
+    msy.load_from_store(store)
+    assert msy.check_membership_list_on_parameters() == False
+    assert set(msy.return_failure_dict()) == fixtures.FAIL_COLS
+
+def test_ingest_rejects_repeated_keys(memsynther, store):
+    with pytest.raises(ValueError):
+        store.ingest(pd.concat([memsynther.df, memsynther.df]))